@@ -1,71 +1,76 @@
 import datetime
+import fnmatch
+import hashlib
+import json
 import logging
+import os
+import tempfile
+import time
 import typing
-from collections import defaultdict, deque
+from collections import defaultdict
+from functools import partial
 from io import BytesIO
 
 import discord
 from discord.ext import commands, tasks
 
-from discord_system_observer_bot.gpuinfo import get_gpu_info
-from discord_system_observer_bot.statsobserver import collect_stats as _collect_stats
-from discord_system_observer_bot.statsobserver import stats2rows
-from discord_system_observer_bot.statsobserver import plot_rows
+from discord_system_observer_bot.export import export_history, parse_format
+from discord_system_observer_bot.export import group_files
+from discord_system_observer_bot.export import DISCORD_UPLOAD_LIMIT
+from discord_system_observer_bot.history import AGGREGATES as HISTORY_AGGREGATES
+from discord_system_observer_bot.memory import MemoryTracer, deep_sizeof
+from discord_system_observer_bot.memory import get_process_memory
+from discord_system_observer_bot.procwatch import ProcessWatch, ProcessWatcher
+from discord_system_observer_bot.report import write_report_file
+from discord_system_observer_bot.profiler import MAX_PROFILE_SECONDS
+from discord_system_observer_bot.profiler import dump_profile, make_profile_rows
+from discord_system_observer_bot.profiler import profile_loop
+from discord_system_observer_bot.providers import ProvidersSetType
+from discord_system_observer_bot.sampler import SubSampler, split_aggregate_name
+from discord_system_observer_bot.snapshot import SystemSnapshot, take_snapshot
+from discord_system_observer_bot.statsobserver import plot_heatmap, plot_rows
+from discord_system_observer_bot.statsobserver import HEATMAP_METRICS
+from discord_system_observer_bot.statsobserver import has_extra_deps_plot
 from discord_system_observer_bot.statsobserver import (
-    has_extra_deps_gpu,
-    has_extra_deps_plot,
-)
-from discord_system_observer_bot.statsobserver import (
-    make_observable_limits,
+    make_watch_limits,
+    LimitEvent,
     LimitTypesSetType,
-    NotifyBadCounterManager,
+    ObservableLimit,
 )
 from discord_system_observer_bot.sysinfo import get_local_machine_name
-from discord_system_observer_bot.sysinfo import get_cpu_info, get_disk_info
-from discord_system_observer_bot.utils import make_table, dump_dict_kv
+from discord_system_observer_bot.targets import ObservationTarget
+from discord_system_observer_bot.targets import make_cgroup_target, make_history
+from discord_system_observer_bot.utils import make_sparkline, make_table, dump_dict_kv
+from discord_system_observer_bot.utils import parse_timerange
+from discord_system_observer_bot.watchdog import LoopWatchdog
+from discord_system_observer_bot.windowrules import WindowRule
 
 
 LOGGER = logging.getLogger(__name__)
 
 
-# ---------------------------------------------------------------------------
-
-
-# Hack, will not allow multiple instances to be run in threads
-# Well, should previously have been the same, as the local_machine_name
-#   is always the same.
+#: maximum length of an embed field value
+DISCORD_EMBED_FIELD_LIMIT = 1024
 
+#: live dashboard update intervals (seconds)
+MIN_DASHBOARD_INTERVAL = 10.0
+MAX_DASHBOARD_INTERVAL = 300.0
 
-_LOCAL_MACHINE_NAME = get_local_machine_name()
-
-
-def get_name() -> str:
-    """Gets the locally stored "machine" name.
-
-    Returns
-    -------
-    str
-        name of the machine the bot runs on
-    """
-    return _LOCAL_MACHINE_NAME
-
+#: number of buckets (characters) of text sparklines
+SPARKLINE_WIDTH = 40
 
-def set_name(name: str) -> None:
-    """Set the local "machine" name.
 
-    Parameters
-    ----------
-    name : str
-        the name of the machine/system the bot runs on
-    """
-    global _LOCAL_MACHINE_NAME  # pylint: disable=global-statement
-    # NOTE: using global here is the easiest solution
-    #       compared to creating a class for storing and accessing
-    #       a single variable ...
-    _LOCAL_MACHINE_NAME = name
+# ---------------------------------------------------------------------------
 
 
-# ---------------------------------------------------------------------------
+def _iter_sysinfo(
+    snapshot: SystemSnapshot, cpu: bool = True, disk: bool = True, gpu: bool = True
+) -> typing.Iterator[typing.Tuple[str, typing.Optional[str]]]:
+    # sections of providers other than the built-in ones are always shown
+    enabled = {"cpu": cpu, "disk": disk, "gpu": gpu}
+    for provider_name, (title, text) in snapshot.info.items():
+        if enabled.get(provider_name, True):
+            yield title, text
 
 
 def make_sysinfo_message(
@@ -73,37 +78,36 @@ def make_sysinfo_message(
     disk: bool = True,
     gpu: bool = True,
     name: typing.Optional[str] = None,
+    snapshot: typing.Optional[SystemSnapshot] = None,
 ) -> str:
     if name is None:
-        name = get_name()
+        name = get_local_machine_name()
+    if snapshot is None:
+        snapshot = take_snapshot()
     message = f"**Status of `{name}`**\n"
-    message += f"Date: `{datetime.datetime.now()}`\n\n"
+    message += f"Date: `{snapshot.date}`\n\n"
 
-    if cpu:
-        message += "System information:"
-        ret = get_cpu_info()
+    for title, ret in _iter_sysinfo(snapshot, cpu=cpu, disk=disk, gpu=gpu):
+        message += f"{title}:"
         if ret is not None:
             message += "\n" + ret + "\n"
         else:
             message += " N/A\n"
 
-    if disk:
-        message += "Disk information:"
-        ret = get_disk_info()
-        if ret is not None:
-            message += "\n" + ret + "\n"
-        else:
-            message += " N/A\n"
+    return message
 
-    if gpu and has_extra_deps_gpu():
-        message += "GPU information:"
-        ret = get_gpu_info()
-        if ret is not None:
-            message += "\n" + ret + "\n"
-        else:
-            message += " N/A\n"
 
-    return message
+def make_sysinfo_fields(
+    snapshot: SystemSnapshot,
+    cpu: bool = True,
+    disk: bool = True,
+    gpu: bool = True,
+) -> typing.List[typing.Tuple[str, str]]:
+    """Returns (name, value) embed fields for the system information."""
+    return [
+        (title, text or "N/A")
+        for title, text in _iter_sysinfo(snapshot, cpu=cpu, disk=disk, gpu=gpu)
+    ]
 
 
 def make_sysinfo_embed(
@@ -111,27 +115,23 @@ def make_sysinfo_embed(
     disk: bool = True,
     gpu: bool = True,
     name: typing.Optional[str] = None,
+    snapshot: typing.Optional[SystemSnapshot] = None,
+    fields: typing.Optional[typing.List[typing.Tuple[str, str]]] = None,
 ) -> discord.Embed:
     if name is None:
-        name = get_name()
+        name = get_local_machine_name()
+    if snapshot is None:
+        snapshot = take_snapshot()
+    if fields is None:
+        fields = make_sysinfo_fields(snapshot, cpu=cpu, disk=disk, gpu=gpu)
     embed = discord.Embed(title=f"System Status of `{name}`")
 
     # embed.set_thumbnail(url="")  # TODO: add "private" logo (maybe as an config option ...)
 
-    if cpu:
-        embed.add_field(
-            name="System information", value=get_cpu_info() or "N/A", inline=False
-        )
-    if disk:
-        embed.add_field(
-            name="Disk information", value=get_disk_info() or "N/A", inline=False
-        )
-    if gpu:
-        embed.add_field(
-            name="GPU information", value=get_gpu_info() or "N/A", inline=False
-        )
+    for field_name, field_value in fields:
+        embed.add_field(name=field_name, value=field_value, inline=False)
 
-    embed.set_footer(text=f"Date: {datetime.datetime.now()}")
+    embed.set_footer(text=f"Date: {snapshot.date}")
 
     return embed
 
@@ -140,19 +140,18 @@ def make_sysinfo_embed(
 
 
 class SelfOrAllName:
-    """Discord Type Converter. Checks whether the local machine
-    name is star '*' or the actual name. If not raise BadArgument
-    to abort subcommand execution."""
+    """Discord Type Converter. Checks whether the name is star '*'
+    or the name of one of the observed targets (the local machine
+    or e. g. a container). If not raise BadArgument to abort
+    subcommand execution."""
 
     def __init__(self, name: str):
         self._name = name
 
     @classmethod
-    async def convert(
-        cls, ctx, argument: str  # pylint: disable=unused-argument
-    ) -> "SelfOrAllName":
-        if argument not in ("*", get_name()):
-            raise commands.BadArgument("Not the local machine name or wildcard!")
+    async def convert(cls, ctx, argument: str) -> "SelfOrAllName":
+        if argument != "*" and argument not in ctx.bot.targets:
+            raise commands.BadArgument("Not an observed target name or wildcard!")
         return cls(argument)
 
     @property
@@ -163,6 +162,15 @@ class SelfOrAllName:
         return self._name
 
 
+def get_selected_targets(ctx, bot: "ObserverBot") -> typing.List[ObservationTarget]:
+    """Targets selected by the name argument of the command group (see
+    :class:`SelfOrAllName`), all targets if not invoked via a group."""
+    targets = getattr(ctx, "selected_targets", None)
+    if targets is None:
+        targets = list(bot.targets.values())
+    return targets
+
+
 # ---------------------------------------------------------------------------
 
 
@@ -170,66 +178,128 @@ class SystemResourceObserverCog(commands.Cog, name="System Resource Observer"):
     def __init__(self, bot: "ObserverBot", limits_types: LimitTypesSetType = None):
         self.bot = bot
 
-        self.limits = dict()
-        self.bad_checker = NotifyBadCounterManager()
         self.stats = defaultdict(int)
+        self._profiling = False
+
+        # runs as often as the most urgent limits, see AdaptiveCheckScheduler
+        # pylint: disable=no-member
+        self.observe_system.change_interval(seconds=bot.min_check_interval)
 
         self.init_limits(limits_types=limits_types)
 
     def init_limits(self, limits_types: LimitTypesSetType = None):
         # TODO: pack them in an optional file (like Flask configs) and try to load else nothing.
-        self.limits.update(make_observable_limits(include=limits_types))
+        for target in self.bot.targets.values():
+            target.init_limits(limits_types=limits_types)
 
     def reset_notifications(self):
-        self.bad_checker.reset()
+        for target in self.bot.targets.values():
+            target.bad_checker.reset()
+            target.scheduler.reset()
+
+    def add_watch(
+        self, target: str, max_rss_gb: typing.Optional[float] = None
+    ) -> ProcessWatch:
+        # processes are watched on the host
+        self.remove_watch(target)
+        watch = self.bot.watcher.add(target, max_rss_gb=max_rss_gb)
+        self.bot.host_target.limits.update(make_watch_limits(self.bot.watcher, watch))
+        return watch
+
+    def remove_watch(self, target: str) -> typing.Optional[ProcessWatch]:
+        host = self.bot.host_target
+        watch = self.bot.watcher.remove(target)
+        if watch is not None:
+            for lid in make_watch_limits(self.bot.watcher, watch).keys():
+                host.limits.pop(lid, None)
+                host.bad_checker.reset(lid)
+                host.scheduler.reset(lid)
+        return watch
 
     @tasks.loop(minutes=5.0)
     async def observe_system(self):
         LOGGER.debug("Running observe system task loop ...")
+        self.stats["num_checks"] += 1
+
+        # only limits that are due (copy, limits may be changed by commands)
+        now = time.monotonic()
+        due_checks = [
+            (target, name, limit)
+            for target in list(self.bot.targets.values())
+            for name, limit in list(target.limits.items())
+            if target.scheduler.is_due(name, now)
+        ]
+        if not due_checks:
+            return
+
+        # watch limits only read the last update (process table, nvidia-smi)
+        if self.bot.watcher.watches:
+            await self.bot.loop.run_in_executor(None, self.bot.watcher.update)
 
         async with self.bot.get_channel(self.bot.channel_id).typing():
-            # perform checks
-            for name, limit in self.limits.items():
+            for target, name, limit in due_checks:
                 try:
-                    await self.run_single_check(name, limit)
+                    await self.run_single_check(target, name, limit)
                 except Exception as ex:  # pylint: disable=broad-except
                     LOGGER.debug(
-                        f"Failed to evaulate check: {limit.name}, reason: {ex}"
+                        f"Failed to evaulate check: {limit.name}"
+                        f" @{target.name}, reason: {ex}"
                     )
 
-            self.stats["num_checks"] += 1
+            self.stats["num_limit_checks"] += len(due_checks)
 
-    async def run_single_check(self, name, limit):
-        LOGGER.debug(f"Running check: {limit.name}")
+    async def run_single_check(self, target: ObservationTarget, name, limit):
+        LOGGER.debug(f"Running check: {limit.name} @{target.name}")
 
         cur_value = limit.fn_retrieve()
         is_ok = limit.fn_check(cur_value, limit.threshold)
+        # badness is per time, not per check (intervals vary)
+        weight = target.scheduler.weight(name)
+        target.scheduler.update(name, cur_value, limit, is_ok)
 
         if not is_ok:
             # check of limit was "bad", now check if we have to notify someone
-            self.stats["num_limits_reached"] += 1
-            self.stats[f"num_limits_reached:{name}:{limit.name}"] += 1
+            target.counters["num_limits_reached"] += 1
+            target.counters[f"num_limits_reached:{name}:{limit.name}"] += 1
 
             # increase badness
-            self.bad_checker.increase_counter(name, limit)
-            if self.bad_checker.should_notify(name, limit):
+            target.bad_checker.increase_counter(name, limit, weight=weight)
+            if target.bad_checker.should_notify(name, limit):
                 # check if already notified (that limit reached)
                 # even if shortly recovered but not completely, e. g. 3->2->3 >= 3 (thres) <= 0 (not completely reset)
                 await self.send(
                     limit.message.format(
                         cur_value=cur_value, threshold=limit.threshold, unit=limit.unit
                     )
-                    + f" @`{self.bot.local_machine_name}`"
+                    + f" @`{target.name}`"
+                )
+                target.bad_checker.mark_notified(name)
+                target.counters["num_limits_notified"] += 1
+                target.events.append(
+                    LimitEvent(
+                        time.time(),
+                        "alert",
+                        limit.name,
+                        value=cur_value,
+                        threshold=limit.threshold,
+                        unit=limit.unit,
+                    )
                 )
-                self.bad_checker.mark_notified(name)
-                self.stats["num_limits_notified"] += 1
         else:
-            if self.bad_checker.decrease_counter(name):
+            if target.bad_checker.decrease_counter(name, weight=weight):
                 # get one-time True if changed from non-normal to normal
-                await self.send(
-                    f"*{limit.name} has recovered*" f" @`{self.bot.local_machine_name}`"
+                await self.send(f"*{limit.name} has recovered*" f" @`{target.name}`")
+                target.counters["num_normal_notified"] += 1
+                target.events.append(
+                    LimitEvent(
+                        time.time(),
+                        "recovery",
+                        limit.name,
+                        value=cur_value,
+                        threshold=limit.threshold,
+                        unit=limit.unit,
+                    )
                 )
-                self.stats["num_normal_notified"] += 1
 
     @observe_system.before_loop
     async def before_observe_start(self):
@@ -250,9 +320,10 @@ class SystemResourceObserverCog(commands.Cog, name="System Resource Observer"):
     ):
         """Management commands, like start/stop/status ...
 
-        Optionally supply the name of the local machine to filter
-        command execution. Beware for machine names that are the
-        same as sub command names."""
+        Optionally supply the name of the local machine (or of an
+        observed container) to filter command execution. Beware for
+        machine names that are the same as sub command names."""
+        ctx.selected_targets = self.bot.select_targets(str(name))
         # if ctx.invoked_subcommand is None:
         # on invalid name fall back to default ("*"), but no sub-command
         # await ctx.send(f"Name provided: {name}")
@@ -269,7 +340,10 @@ class SystemResourceObserverCog(commands.Cog, name="System Resource Observer"):
     @observer_cmd.command(name="start")
     @commands.cooldown(1.0, 10.0)
     async def observer_start(self, ctx):
-        """Starts the background system observer loop."""
+        """Starts the background system observer loop. The loop checks all
+        targets, so only the machine name (or none) is accepted."""
+        if not await self._check_loop_selection(ctx):
+            return
         # NOTE: check for is_running() only added in version 1.4.0
         if self.observe_system.get_task() is None:  # pylint: disable=no-member
             self.observe_system.start()  # pylint: disable=no-member
@@ -281,14 +355,28 @@ class SystemResourceObserverCog(commands.Cog, name="System Resource Observer"):
     @observer_cmd.command(name="stop")
     @commands.cooldown(1.0, 10.0)
     async def observer_stop(self, ctx):
-        """Stops the background system observer."""
+        """Stops the background system observer. The loop checks all
+        targets, so only the machine name (or none) is accepted."""
+        if not await self._check_loop_selection(ctx):
+            return
         self.observe_system.cancel()  # pylint: disable=no-member
         self.reset_notifications()
         await ctx.send(f"Observer stopped @`{self.bot.local_machine_name}`")
 
-    def _header_for(self, name: str) -> str:
+    async def _check_loop_selection(self, ctx) -> bool:
+        """Whether the host is selected, a single (container) target can't
+        be started or stopped on its own."""
+        if self.bot.host_target in get_selected_targets(ctx, self.bot):
+            return True
+        await ctx.send(
+            "The observer loop checks all targets, use the machine name"
+            f" `{self.bot.local_machine_name}` (or none) to start/stop it."
+        )
+        return False
+
+    def _header_for(self, name: str, target: ObservationTarget) -> str:
         return (
-            f"**{name} for** `{self.bot.local_machine_name}`"  # pylint: disable=no-member
+            f"**{name} for** `{target.name}`"  # pylint: disable=no-member
             f""" [`{"running" if self.observe_system.next_iteration is not None else "stopped"}`]"""
             "\n"
         )
@@ -312,88 +400,338 @@ class SystemResourceObserverCog(commands.Cog, name="System Resource Observer"):
             # if stopped, then ``next_iteration`` is None
             next_time = "?"
 
-        message = "".join(
-            [
-                self._header_for("Observer status"),
-                dump_dict_kv(self.stats, wrap_markdown=True),
-                f"\nNext check in `{next_time}`",
-            ]
-        )
+        for target in get_selected_targets(ctx, self.bot):
+            message = "".join(
+                [
+                    self._header_for("Observer status", target),
+                    dump_dict_kv({**self.stats, **target.counters}, wrap_markdown=True),
+                    f"\nNext check in `{next_time}`",
+                ]
+            )
 
-        await ctx.send(message)
+            await ctx.send(message)
 
     @observer_cmd.command(name="dump-badness")
     @commands.cooldown(1.0, 10.0)
     async def observer_dump_badness(self, ctx):
         """Dump current badness values."""
 
-        if not self.bad_checker.bad_counters:
-            await ctx.send(f"N/A [`{self.bot.local_machine_name}`] [`not-started`]")
+        for target in get_selected_targets(ctx, self.bot):
+            bad_checker = target.bad_checker
+            if not bad_checker.bad_counters:
+                await ctx.send(f"N/A [`{target.name}`] [`not-started`]")
+                continue
+
+            message = "".join(
+                [
+                    self._header_for("Badness values", target),
+                    # dump_dict_kv(bad_checker.bad_counters, wrap_markdown=True),
+                    make_table(
+                        [
+                            (
+                                v.name,
+                                bad_checker.bad_counters[k],
+                                v.badness_inc,
+                                v.badness_dec,
+                                v.badness_threshold,
+                                bad_checker.notified[k],
+                            )
+                            for k, v in target.limits.items()
+                        ],
+                        ("name", "badness", "inc", "dec", "max", "notified"),
+                        alignments=("<", ">", ">", ">", ">", ">"),
+                        wrap_markdown=True,
+                        header_separator=True,
+                        column_separators=False,
+                    ),
+                ]
+            )
+
+            await ctx.send(message)
+
+    @commands.command(name="watch")
+    @commands.cooldown(1.0, 5.0)
+    async def watch_cmd(
+        self,
+        ctx,
+        target: typing.Optional[str] = None,
+        max_rss_gb: typing.Optional[float] = None,
+    ):
+        """Watches processes and alerts if they exit or grow too large.
+
+        target: pid or name/command line (glob) pattern,
+        without target, the watched processes are listed
+        max_rss_gb: optional memory limit (all matched processes)"""
+        if target is not None:
+            watch = self.add_watch(target, max_rss_gb=max_rss_gb)
+            await ctx.send(
+                f"Watching `{watch.target}` @`{self.bot.local_machine_name}`"
+            )
             return
 
-        message = "".join(
-            [
-                self._header_for("Badness values"),
-                # dump_dict_kv(self.bad_checker.bad_counters, wrap_markdown=True),
-                make_table(
-                    [
-                        (
-                            v.name,
-                            self.bad_checker.bad_counters[k],
-                            v.badness_inc,
-                            v.badness_dec,
-                            v.badness_threshold,
-                            self.bad_checker.notified[k],
-                        )
-                        for k, v in self.limits.items()
-                    ],
-                    ("name", "badness", "inc", "dec", "max", "notified"),
-                    alignments=("<", ">", ">", ">", ">", ">"),
-                    wrap_markdown=True,
-                    header_separator=True,
-                    column_separators=False,
-                ),
-            ]
-        )
+        if not self.bot.watcher.watches:
+            await ctx.send(f"No watched processes @`{self.bot.local_machine_name}`")
+            return
 
+        stats = await self.bot.loop.run_in_executor(None, self.bot.watcher.update)
+        rows = list()
+        for key, watch in self.bot.watcher.watches.items():
+            wstats = stats.get(key, dict())
+            rows.append(
+                (
+                    watch.target,
+                    int(wstats.get("proc_count", 0)),
+                    round(wstats.get("proc_rss_mb", 0.0)),
+                    round(wstats.get("proc_cpu_perc", 0.0), 1),
+                    int(wstats.get("proc_threads", 0)),
+                    int(wstats.get("proc_fds", 0)),
+                    round(wstats.get("proc_gpu_mem_mb", 0.0)),
+                    watch.max_rss_gb,
+                )
+            )
+        message = f"**Watched processes** @`{self.bot.local_machine_name}`\n" + (
+            make_table(
+                rows,
+                ("target", "#", "RSS MB", "CPU %", "thr", "fds", "GPU MB", "max GB"),
+                alignments=("<", ">", ">", ">", ">", ">", ">", ">"),
+                wrap_markdown=True,
+                header_separator=True,
+                column_separators=False,
+            )
+        )
         await ctx.send(message)
 
+    @commands.command(name="unwatch")
+    @commands.cooldown(1.0, 5.0)
+    async def unwatch_cmd(self, ctx, target: str):
+        """Stops watching processes (same target as for watch)."""
+        if self.remove_watch(target) is None:
+            await ctx.send(
+                f"`{target}` is not watched @`{self.bot.local_machine_name}`"
+            )
+            return
+        await ctx.send(f"Stopped watching `{target}` @`{self.bot.local_machine_name}`")
+
     @observer_cmd.command(name="dump-limits")
     @commands.cooldown(1.0, 10.0)
     async def observer_dump_limits(self, ctx):
         """Write out limits."""
+        for target in get_selected_targets(ctx, self.bot):
+            snapshot = await target.snapshots.get()
+
+            message = "".join(
+                [
+                    self._header_for("Limits", target),
+                    make_table(
+                        [
+                            (
+                                limit.name,
+                                # lid, "id"
+                                snapshot.limit_values.get(lid),
+                                limit.threshold,
+                                limit.unit,
+                                target.bad_checker.threshold_reached(lid, limit),
+                                target.bad_checker.notified[lid],
+                                f"{target.scheduler.interval(lid):.0f}s",
+                            )
+                            for lid, limit in target.limits.items()
+                        ],
+                        (
+                            "name",
+                            "current",
+                            "threshold",
+                            "unit",
+                            "exceed?",
+                            "notified",
+                            "every",
+                        ),
+                        alignments=("<", ">", ">", "<", ">", ">", ">"),
+                        wrap_markdown=True,
+                        header_separator=True,
+                        column_separators=False,
+                    ),
+                ]
+            )
+
+            await ctx.send(message)
 
-        def _get_safe_current(limit):
-            try:
-                return limit.fn_retrieve()
-            except:  # pylint: disable=bare-except
-                return None
+    @observer_cmd.command(name="stalls")
+    @commands.cooldown(1.0, 10.0)
+    async def observer_stalls(self, ctx, num: int = 10):
+        """Shows the last event loop stalls (blocking calls)."""
+        watchdog = self.bot.watchdog
+        if watchdog is None:
+            await ctx.send(f"N/A [`{self.bot.local_machine_name}`] [`no-watchdog`]")
+            return
 
+        stalls = list(watchdog.stalls)[-max(1, num) :]
         message = "".join(
             [
-                self._header_for("Limits"),
+                f"**Event loop stalls for** `{self.bot.local_machine_name}`\n",
+                dump_dict_kv(watchdog.status(), wrap_markdown=True),
+                "\n",
+            ]
+        )
+        if not stalls:
+            await ctx.send(message + "No stalls recorded.")
+            return
+
+        rows = [
+            (
+                stall.date.strftime("%Y-%m-%d %H:%M:%S"),
+                f"{stall.lag:.2f}",
+                stall.function,
+            )
+            for stall in reversed(stalls)
+        ]
+        # innermost frames are last, keep those if the stack is too long
+        stack_lines = stalls[-1].stack.splitlines()
+        while len(stack_lines) > 1 and sum(map(len, stack_lines)) > 1000:
+            stack_lines.pop(0)
+        stack = "\n".join(stack_lines)[-1000:]
+        stack = f"\nLast stack:\n```\n{stack}\n```"
+
+        # as many (most recent) stalls as fit into a message
+        num_rows = len(rows)
+        while True:
+            table = make_table(
+                rows[:num_rows],
+                ("time", "lag (s)", "function"),
+                alignments=("<", ">", "<"),
+                wrap_markdown=True,
+                header_separator=True,
+                column_separators=False,
+            )
+            if len(message) + len(table) + len(stack) <= 2000 or num_rows <= 1:
+                break
+            num_rows -= 1
+
+        await ctx.send(message + table + stack)
+
+    @observer_cmd.command(name="profile")
+    @commands.cooldown(1.0, 30.0)
+    async def observer_profile(self, ctx, seconds: float = 30.0, top: int = 15):
+        """Profiles the bot (all loops and commands) for some seconds."""
+        if self._profiling:
+            await ctx.send(f"Profiler already running @`{self.bot.local_machine_name}`")
+            return
+
+        seconds = min(max(seconds, 1.0), MAX_PROFILE_SECONDS)
+        await ctx.send(
+            f"Profiling for {seconds:.0f}s @`{self.bot.local_machine_name}` ..."
+        )
+
+        self._profiling = True
+        try:
+            profiler = await profile_loop(seconds)
+        except ValueError as ex:
+            await ctx.send(f"Profiler not available: {ex}")
+            return
+        finally:
+            self._profiling = False
+
+        rows = make_profile_rows(profiler, top=max(1, min(top, 50)))
+        message = "".join(
+            [
+                f"**Profile ({seconds:.0f}s) for** `{self.bot.local_machine_name}`\n",
                 make_table(
-                    [
-                        (
-                            limit.name,
-                            # lid, "id"
-                            _get_safe_current(limit),
-                            limit.threshold,
-                            limit.unit,
-                            self.bad_checker.threshold_reached(lid, limit),
-                            self.bad_checker.notified[lid],
-                        )
-                        for lid, limit in self.limits.items()
-                    ],
-                    ("name", "current", "threshold", "unit", "exceed?", "notified"),
-                    alignments=("<", ">", ">", "<", ">", ">"),
+                    rows,
+                    ("function", "calls", "tottime", "cumtime"),
+                    alignments=("<", ">", ">", ">"),
                     wrap_markdown=True,
                     header_separator=True,
                     column_separators=False,
                 ),
             ]
         )
+        if len(message) > 2000:
+            # keep as many rows as fit
+            message = message[:1990].rpartition("\n")[0] + "\n...\n```"
+
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        dfile = discord.File(
+            BytesIO(dump_profile(profiler)),
+            filename=f"profile-{self.bot.local_machine_name}-{timestamp:%Y%m%d-%H%M%S}.pstats",
+        )
+        await ctx.send(message, file=dfile)
+
+    @observer_cmd.command(name="memory")
+    @commands.cooldown(1.0, 10.0)
+    async def observer_memory(self, ctx, action: str = "show", top: int = 10):
+        """Shows memory usage of the bot, by structure and (if traced)
+        by allocation site compared to the baseline.
+
+        Actions: "show", "baseline" (start tracing, reset baseline),
+        "stop" (stop tracing)"""
+        tracer = self.bot.memory_tracer
+        if action == "baseline":
+            await self.bot.loop.run_in_executor(None, tracer.start)
+            await ctx.send(f"Memory baseline taken @`{self.bot.local_machine_name}`")
+            return
+        if action == "stop":
+            tracer.stop()
+            await ctx.send(f"Memory tracing stopped @`{self.bot.local_machine_name}`")
+            return
+
+        # pylint: disable=protected-access
+        targets = list(self.bot.targets.values())
+        structures = {
+            "collector_stats": [target.history for target in targets],
+            "observer_badness": [target.bad_checker for target in targets],
+            "observer_limits": [target.limits for target in targets],
+            "observer_events": [target.events for target in targets],
+            "snapshot_cache": [target.snapshots for target in targets],
+            "process_watches": self.bot.watcher,
+            # copies, the client changes them while walking in a thread
+            "discord_messages": list(self.bot._connection._messages or ()),
+            "discord_users": dict(self.bot._connection._users),
+            "discord_guilds": dict(self.bot._connection._guilds),
+        }
+        # pylint: enable=protected-access
+        # may walk many objects, do not block the event loop
+        sizes = await self.bot.loop.run_in_executor(
+            None, lambda: {name: deep_sizeof(obj) for name, obj in structures.items()}
+        )
+        status = {
+            **get_process_memory(),
+            **{f"{name}_kb": round(size / 1024, 1) for name, size in sizes.items()},
+        }
+        status["collector_stats_samples"] = sum(
+            len(target.history) for target in targets
+        )
 
+        parts = [
+            f"**Memory for** `{self.bot.local_machine_name}`\n",
+            dump_dict_kv(status, wrap_markdown=True),
+        ]
+        if tracer.is_tracing:
+            rows = await self.bot.loop.run_in_executor(
+                None, partial(tracer.diff, top=max(1, min(top, 25)))
+            )
+            parts.extend(
+                [
+                    "\n",
+                    dump_dict_kv(tracer.traced_memory(), wrap_markdown=True),
+                    "\nGrowth since baseline:\n",
+                    make_table(
+                        rows,
+                        ("location", "diff KiB", "size KiB", "diff count"),
+                        alignments=("<", ">", ">", ">"),
+                        wrap_markdown=True,
+                        header_separator=True,
+                        column_separators=False,
+                    ),
+                ]
+            )
+        else:
+            parts.append(
+                f"\nTracing is off, start with "
+                f"`{self.bot.command_prefix}observer memory baseline`"
+            )
+
+        message = "".join(parts)
+        if len(message) > 2000:
+            message = message[:1990].rpartition("\n")[0] + "\n...\n```"
         await ctx.send(message)
 
 
@@ -404,40 +742,60 @@ class SystemStatsCollectorCog(commands.Cog, name="System Statistics Collector"):
     def __init__(self, bot: "ObserverBot"):
         self.bot = bot
 
-        # for a total of a week
-        #   10 / 60 how often per minute,
-        #     times minutes in hour, hours in day, days in week
-        num = 10 / 60 * 60 * 24 * 7
-        self.stats = deque(maxlen=round(num))
+        # high-frequency sampling (of the host) between collector runs
+        self.sampler: typing.Optional[SubSampler] = None
 
     @tasks.loop(minutes=5.0)
     async def collect_stats(self):
         LOGGER.debug("Running collect system stats task loop ...")
 
+        if self.bot.watcher.watches:
+            await self.bot.loop.run_in_executor(None, self.bot.watcher.update)
+
         async with self.bot.get_channel(self.bot.channel_id).typing():
-            # collect stats
-            try:
-                cur_stats = _collect_stats(include=("cpu", "disk", "gpu"))
-                if self.stats:
-                    cur_stats["_id"] = self.stats[-1]["_id"] + 1
-                self.stats.append(cur_stats)
-            except Exception as ex:  # pylint: disable=broad-except
-                LOGGER.debug(f"Failed to collect stats, reason: {ex}")
+            # collect stats, a single pass over all targets
+            for target in list(self.bot.targets.values()):
+                try:
+                    cur_stats = target.collect_stats()
+                    if target is self.bot.host_target:
+                        if self.sampler is not None:
+                            cur_stats.update(self.sampler.drain())
+                        cur_stats.update(self.bot.watcher.collect_stats())
+                    target.append_stats(cur_stats)
+                except Exception as ex:  # pylint: disable=broad-except
+                    LOGGER.debug(
+                        f"Failed to collect stats @{target.name}, reason: {ex}"
+                    )
 
     @collect_stats.before_loop
     async def before_collect_stats_start(self):
         LOGGER.debug("Wait for observer bot to be ready ...")
         await self.bot.wait_until_ready()
 
+        # threads can't be restarted, so create a new one
+        self.sampler = SubSampler(self.bot.host_target.make_probes())
+        self.sampler.start()
+
+    @collect_stats.after_loop
+    async def after_collect_stats_stop(self):
+        if self.sampler is not None:
+            self.sampler.stop()
+
+    def cog_unload(self):
+        self.collect_stats.cancel()  # pylint: disable=no-member
+        if self.sampler is not None:
+            self.sampler.stop()
+
     @commands.group(name="collector", invoke_without_command=False)
     async def collector_cmd(
         self, ctx, name: typing.Optional[SelfOrAllName] = SelfOrAllName("*"),
     ):
         """Management commands, like start/stop/status ...
 
-        Optionally supply the name of the local machine to filter
-        command execution. Beware for machine names that are the
-        same as sub command names."""
+        Optionally supply the name of the local machine (or of an
+        observed container) to filter command execution. Beware for
+        machine names that are the same as sub command names."""
+        ctx.selected_targets = self.bot.select_targets(str(name))
 
     @collector_cmd.command(name="start")
     @commands.cooldown(1.0, 10.0)
@@ -458,26 +816,87 @@ class SystemStatsCollectorCog(commands.Cog, name="System Statistics Collector"):
         self.collect_stats.cancel()  # pylint: disable=no-member
         await ctx.send(f"Collector stopped @`{self.bot.local_machine_name}`")
 
+    @collector_cmd.command(name="status")
+    @commands.cooldown(1.0, 10.0)
+    async def collector_status(self, ctx):
+        """Displays statistics about collected data and the sampler."""
+        for target in get_selected_targets(ctx, self.bot):
+            await self._send_status(ctx, target)
+
+    async def _send_status(self, ctx, target: ObservationTarget):
+        history = target.history
+        status = {
+            "num_samples": len(history),
+            "history_memory_kb": round(history.nbytes / 1024, 1),
+        }
+        if history.max_bytes is not None:
+            status["history_budget_kb"] = round(history.max_bytes / 1024, 1)
+            status["history_downsampled_x"] = 2 ** history.max_chunk_level
+        if history:
+            status["oldest_sample"] = str(
+                datetime.datetime.utcfromtimestamp(history.first_timestamp)
+            )
+            status["newest_sample"] = str(
+                datetime.datetime.utcfromtimestamp(history.last_timestamp)
+            )
+        if self.sampler is not None and target is self.bot.host_target:
+            status.update(self.sampler.status())
+
+        # pylint: disable=no-member
+        running = self.collect_stats.next_iteration is not None
+        # pylint: enable=no-member
+        message = "".join(
+            [
+                f"**Collector status for** `{target.name}`",
+                f""" [`{"running" if running else "stopped"}`]\n""",
+                dump_dict_kv(status, wrap_markdown=True),
+            ]
+        )
+
+        await ctx.send(message)
+
     @collector_cmd.command(name="plot")
     @commands.cooldown(1.0, 10.0)
-    async def collector_plot(self, ctx):
-        """Plots collected stats."""
-        if not self.stats:
-            await ctx.send(f"N/A @`{self.bot.local_machine_name}`")
+    async def collector_plot(self, ctx, mode: str = "lines"):
+        """Plots collected stats.
+
+        mode: "lines" (default, a plot per metric) or "heatmap"
+        (utilisation per CPU core over time)"""
+        if mode not in ("lines", "heatmap"):
+            await ctx.send(f"Unknown plot mode `{mode}`, use `lines` or `heatmap`.")
             return
 
-        if not has_extra_deps_plot():
-            await ctx.send(
-                f"N/A (missing plotting dependencies) @`{self.bot.local_machine_name}`"
-            )
+        for target in get_selected_targets(ctx, self.bot):
+            await self._send_plot(ctx, target, mode)
+
+    async def _send_plot(self, ctx, target: ObservationTarget, mode: str):
+        history = target.history
+        if not history:
+            await ctx.send(f"N/A @`{target.name}`")
             return
 
-        series = stats2rows(self.stats)
+        if mode == "heatmap" and not has_extra_deps_plot():
+            await ctx.send(f"N/A (missing plotting dependencies) @`{target.name}`")
+            return
 
-        plot_bytes = plot_rows(series, as_data_uri=False)
+        if mode == "heatmap":
+            cores, matrix = history.matrix("cpu_core_perc")
+            plot_bytes = plot_heatmap(
+                list(history.iter_timestamps()),
+                cores,
+                matrix,
+                title="cpu_core_perc",
+                as_data_uri=False,
+            )
+        else:
+            series = history.rows()
+
+            plot_bytes = plot_rows(
+                series, as_data_uri=False, ylims=history.value_range()
+            )
 
         if plot_bytes is None:
-            await ctx.send(f"N/A (empty plot?) @`{self.bot.local_machine_name}`")
+            await ctx.send(f"N/A (empty plot?) @`{target.name}`")
             return
 
         dfile = discord.File(
@@ -485,7 +904,498 @@ class SystemStatsCollectorCog(commands.Cog, name="System Statistics Collector"):
             filename=f"plot-{datetime.datetime.now(datetime.timezone.utc)}.png",
         )
 
-        await ctx.send(f"Plot @`{self.bot.local_machine_name}`", file=dfile)
+        await ctx.send(f"Plot @`{target.name}`", file=dfile)
+
+    @collector_cmd.command(name="query")
+    @commands.cooldown(1.0, 5.0)
+    async def collector_query(
+        self, ctx, metric: str, agg: str = "last", *, timerange: str = ""
+    ):
+        """Aggregates collected stats over a time range.
+
+        metric: name or glob pattern, e. g. "mem_util_perc" or "gpu_temp:*"
+        agg: one of min/max/avg/p95/last
+        timerange: e. g. "6h", "@03:00", "03:00..05:00" (UTC), "2d..1d",
+        default: all collected stats"""
+        if agg not in HISTORY_AGGREGATES:
+            await ctx.send(
+                f"Unknown aggregate `{agg}`, use one of: "
+                f"{', '.join(HISTORY_AGGREGATES)} @`{self.bot.local_machine_name}`"
+            )
+            return
+
+        try:
+            start, end = parse_timerange(timerange)
+        except ValueError as ex:
+            await ctx.send(f"{ex} @`{self.bot.local_machine_name}`")
+            return
+
+        for target in get_selected_targets(ctx, self.bot):
+            await self._send_query(ctx, target, metric, agg, start, end)
+
+    async def _send_query(
+        self,
+        ctx,
+        target: ObservationTarget,
+        metric: str,
+        agg: str,
+        start: typing.Optional[float],
+        end: typing.Optional[float],
+    ):
+        history = target.history
+        names = fnmatch.filter(history.names, metric)
+        if not history or not names:
+            await ctx.send(f"N/A @`{target.name}`")
+            return
+
+        lo, hi = history.window(start, end)
+        if lo >= hi:
+            await ctx.send(f"N/A (no samples in range) @`{target.name}`")
+            return
+
+        def _fmt_ts(timestamp):
+            return datetime.datetime.utcfromtimestamp(timestamp).strftime(
+                "%Y-%m-%d %H:%M"
+            )
+
+        rows = [
+            (name, history.aggregate(name, agg, start=start, end=end)) for name in names
+        ]
+        message = "".join(
+            [
+                f"**{agg} of `{metric}` for** `{target.name}`\n",
+                f"`{_fmt_ts(history[lo]['_datetime'])}` - ",
+                f"`{_fmt_ts(history[hi - 1]['_datetime'])}` UTC",
+                f" ({hi - lo} samples)\n",
+                make_table(
+                    [
+                        (name, round(value, 2) if value is not None else None)
+                        for name, value in rows
+                    ],
+                    ("metric", agg),
+                    alignments=("<", ">"),
+                    wrap_markdown=True,
+                    header_separator=True,
+                    column_separators=False,
+                ),
+            ]
+        )
+
+        await ctx.send(message)
+
+    @collector_cmd.command(name="spark")
+    @commands.cooldown(1.0, 5.0)
+    async def collector_spark(self, ctx, metric: str = "*", *, timerange: str = ""):
+        """Shows trends of collected stats as text sparklines.
+
+        metric: name or glob pattern, e. g. "mem_util_perc" or "gpu_*",
+        default: all metrics (without per core and sub-sampled ones)
+        timerange: e. g. "6h", "03:00..05:00" (UTC), "2d..1d",
+        default: all collected stats"""
+        try:
+            start, end = parse_timerange(timerange)
+        except ValueError as ex:
+            await ctx.send(f"{ex} @`{self.bot.local_machine_name}`")
+            return
+
+        for target in get_selected_targets(ctx, self.bot):
+            await self._send_spark(ctx, target, metric, start, end)
+
+    async def _send_spark(
+        self,
+        ctx,
+        target: ObservationTarget,
+        metric: str,
+        start: typing.Optional[float],
+        end: typing.Optional[float],
+    ):
+        history = target.history
+        names = fnmatch.filter(history.names, metric)
+        if metric == "*":
+            names = [
+                name
+                for name in names
+                if name.partition(":")[0] not in HEATMAP_METRICS
+                and split_aggregate_name(name)[1] is None
+            ]
+        lo, hi = history.window(start, end)
+        if not names or lo >= hi:
+            await ctx.send(f"N/A @`{target.name}`")
+            return
+
+        rows = list()
+        for name in names:
+            summary = history.summary(name, lo, hi)
+            if summary is None:
+                continue
+            rows.append(
+                (
+                    name,
+                    make_sparkline(
+                        history.buckets(name, SPARKLINE_WIDTH, lo, hi),
+                        vmin=summary[0],
+                        vmax=summary[1],
+                    ),
+                    round(summary[0], 1),
+                    round(summary[1], 1),
+                    round(history.aggregate(name, "last", start, end), 1),
+                )
+            )
+
+        header = f"**Trends for** `{target.name}` ({hi - lo} samples)\n"
+        # as many metrics as fit into a message
+        num_rows = len(rows)
+        while True:
+            table = make_table(
+                rows[:num_rows],
+                ("metric", "trend", "min", "max", "last"),
+                alignments=("<", "<", ">", ">", ">"),
+                wrap_markdown=True,
+                header_separator=False,
+                column_separators=False,
+            )
+            if num_rows < len(rows):
+                table += f"\n... and {len(rows) - num_rows} more"
+            if len(header) + len(table) <= 2000 or num_rows <= 1:
+                break
+            num_rows -= 1
+
+        await ctx.send(header + table)
+
+    @collector_cmd.command(name="report")
+    @commands.cooldown(1.0, 60.0)
+    async def collector_report(self, ctx, *, timerange: str = ""):
+        """Sends a HTML report with charts, statistics and alerts.
+
+        timerange: e. g. "6h", "2020-05-01..", "2d..1d",
+        default: all collected stats"""
+        try:
+            start, end = parse_timerange(timerange)
+        except ValueError as ex:
+            await ctx.send(f"{ex} @`{self.bot.local_machine_name}`")
+            return
+
+        for target in get_selected_targets(ctx, self.bot):
+            await self._send_report(ctx, target, start, end)
+
+    async def _send_report(
+        self,
+        ctx,
+        target: ObservationTarget,
+        start: typing.Optional[float],
+        end: typing.Optional[float],
+    ):
+        lo, hi = target.history.window(start, end)
+        if lo >= hi:
+            await ctx.send(f"N/A @`{target.name}`")
+            return
+
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        filename = f"report-{target.name}-{timestamp:%Y%m%d-%H%M%S}.html"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, filename)
+            # rendering runs in background threads, on a consistent copy
+            await self.bot.loop.run_in_executor(
+                None,
+                partial(
+                    write_report_file,
+                    path,
+                    target.history.snapshot(),
+                    events=list(target.events),
+                    title=f"System report for {target.name}",
+                    lo=lo,
+                    hi=hi,
+                ),
+            )
+
+            if os.path.getsize(path) > DISCORD_UPLOAD_LIMIT:
+                await ctx.send(
+                    f"N/A (report too large, use a shorter range) @`{target.name}`"
+                )
+                return
+
+            await ctx.send(
+                f"Report of {hi - lo} samples @`{target.name}`",
+                file=discord.File(path, filename=filename),
+            )
+
+    @collector_cmd.command(name="export")
+    @commands.cooldown(1.0, 30.0)
+    async def collector_export(self, ctx, fmt: str = "csv", *, timerange: str = ""):
+        """Exports collected stats as compressed file(s).
+
+        fmt: csv, ndjson or npz, optionally with compression (gz/zst),
+        e. g. "csv.gz" or "ndjson.zst", default: csv with best compression
+        timerange: e. g. "6h", "03:00..05:00" (UTC), "2d..1d", default: all
+
+        Large exports are split into multiple files or down-sampled
+        to fit Discord upload limits."""
+        try:
+            fmt, compression = parse_format(fmt)
+            start, end = parse_timerange(timerange)
+        except ValueError as ex:
+            await ctx.send(f"{ex} @`{self.bot.local_machine_name}`")
+            return
+
+        for target in get_selected_targets(ctx, self.bot):
+            await self._send_export(ctx, target, fmt, compression, start, end)
+
+    async def _send_export(
+        self,
+        ctx,
+        target: ObservationTarget,
+        fmt: str,
+        compression: typing.Optional[str],
+        start: typing.Optional[float],
+        end: typing.Optional[float],
+    ):
+        lo, hi = target.history.window(start, end)
+        if lo >= hi:
+            await ctx.send(f"N/A @`{target.name}`")
+            return
+
+        # compression may take a while, do not block the event loop
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        files, stride = await self.bot.loop.run_in_executor(
+            None,
+            partial(
+                export_history,
+                target.history.snapshot(),
+                fmt=fmt,
+                compression=compression,
+                lo=lo,
+                hi=hi,
+                basename=f"stats-{target.name}-{timestamp:%Y%m%d-%H%M%S}",
+            ),
+        )
+
+        if not files:
+            await ctx.send(f"N/A (export too large) @`{target.name}`")
+            return
+
+        message = f"Export of {hi - lo} samples"
+        if stride > 1:
+            message += f" (down-sampled, every {stride}. sample)"
+        message += f" @`{target.name}`"
+
+        # the upload limit is per message, not per attachment
+        for num, group in enumerate(group_files(files)):
+            dfiles = [
+                discord.File(BytesIO(data), filename=filename)
+                for filename, data in group
+            ]
+            await ctx.send(message if num == 0 else None, files=dfiles)
+
+
+# ---------------------------------------------------------------------------
+
+
+def make_exceeded_limits_info(
+    snapshot: SystemSnapshot, limits: typing.Dict[str, ObservableLimit]
+) -> str:
+    """Returns the currently exceeded limits (embed field value)."""
+    exceeded = list()
+    for lid, limit in limits.items():
+        cur_value = snapshot.limit_values.get(lid)
+        try:
+            if cur_value is None or limit.fn_check(cur_value, limit.threshold):
+                continue
+        except Exception:  # pylint: disable=broad-except
+            continue
+        exceeded.append(
+            f"{limit.name}: {cur_value:.1f}{limit.unit} (threshold: {limit.threshold})"
+        )
+
+    limits_info = "\n".join(exceeded) if exceeded else "all ok"
+    if len(limits_info) > DISCORD_EMBED_FIELD_LIMIT:
+        limits_info = limits_info[: DISCORD_EMBED_FIELD_LIMIT - 3] + "..."
+    return limits_info
+
+
+def make_dashboard_fields(
+    snapshot: SystemSnapshot, limits: typing.Dict[str, ObservableLimit]
+) -> typing.List[typing.Tuple[str, str]]:
+    """Returns (name, value) embed fields for the live dashboard, system
+    information and the currently exceeded limits."""
+    return make_sysinfo_fields(snapshot) + [
+        ("Exceeded limits", make_exceeded_limits_info(snapshot, limits))
+    ]
+
+
+class LiveDashboardCog(commands.Cog, name="Live Dashboard"):
+    """A single (pinned) message per host that is edited periodically
+    with the latest system snapshot, instead of many separate messages.
+    Exceeded limits of other observed targets are listed below.
+
+    The message is only edited if the rendered content changed (hash of
+    the embed without the date), and not more often than every
+    ``min_edit_interval`` seconds. On edit errors (e. g. rate limits),
+    the update interval is backed off until the next successful edit."""
+
+    def __init__(self, bot: "ObserverBot", min_edit_interval: float = 5.0):
+        self.bot = bot
+        self.min_edit_interval = min_edit_interval
+
+        self.message: typing.Optional[discord.Message] = None
+        #: requested interval, ``interval`` is backed off on errors
+        self.base_interval = 30.0
+        self.interval = 30.0
+        self._content_hash: typing.Optional[str] = None
+        self._last_edit = 0.0
+        self.stats = defaultdict(int)
+
+    async def make_embed(self) -> discord.Embed:
+        host = self.bot.host_target
+        snapshot = await host.snapshots.get()
+        fields = host.snapshots.render(
+            "dashboard",
+            snapshot,
+            partial(make_dashboard_fields, limits=host.limits),
+        )
+        for target in self.bot.targets.values():
+            if target is host:
+                continue
+            target_snapshot = await target.snapshots.get()
+            info = target.snapshots.render(
+                "exceeded",
+                target_snapshot,
+                partial(make_exceeded_limits_info, limits=target.limits),
+            )
+            fields = fields + [(f"Exceeded limits @{target.name}", info)]
+        return make_sysinfo_embed(name=host.name, snapshot=snapshot, fields=fields)
+
+    @staticmethod
+    def hash_embed(embed: discord.Embed) -> str:
+        data = embed.to_dict()
+        # the date changes always
+        data.pop("footer", None)
+        return hashlib.sha1(
+            json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    @tasks.loop(seconds=30.0)
+    async def update_dashboard(self):
+        if self.message is None:
+            return
+
+        embed = await self.make_embed()
+        content_hash = self.hash_embed(embed)
+        if content_hash == self._content_hash:
+            self.stats["num_unchanged"] += 1
+            return
+
+        if time.monotonic() - self._last_edit < self.min_edit_interval:
+            self.stats["num_rate_limited"] += 1
+            return
+
+        try:
+            await self.message.edit(embed=embed)
+        except discord.NotFound:
+            LOGGER.debug("Dashboard message has been deleted, stop updating.")
+            self.message = None
+            self.update_dashboard.stop()  # pylint: disable=no-member
+            return
+        except discord.HTTPException as ex:
+            # e. g. rate limited, try less often
+            LOGGER.debug(f"Failed to edit dashboard message, reason: {ex}")
+            self.stats["num_errors"] += 1
+            self.interval = min(self.interval * 2, MAX_DASHBOARD_INTERVAL)
+            self.update_dashboard.change_interval(  # pylint: disable=no-member
+                seconds=self.interval
+            )
+            return
+
+        self._content_hash = content_hash
+        self._last_edit = time.monotonic()
+        self.stats["num_edits"] += 1
+
+        if self.interval != self.base_interval:
+            self.interval = self.base_interval
+            self.update_dashboard.change_interval(  # pylint: disable=no-member
+                seconds=self.interval
+            )
+
+    @update_dashboard.before_loop
+    async def before_update_dashboard_start(self):
+        await self.bot.wait_until_ready()
+
+    def cog_unload(self):
+        self.update_dashboard.cancel()  # pylint: disable=no-member
+
+    async def release_message(self):
+        """Unpin and forget the current dashboard message (if any)."""
+        if self.message is None:
+            return
+        try:
+            await self.message.unpin()
+        except discord.HTTPException:
+            pass
+        self.message = None
+
+    @commands.group(name="dashboard", invoke_without_command=False)
+    async def dashboard_cmd(
+        self, ctx, name: typing.Optional[SelfOrAllName] = SelfOrAllName("*"),
+    ):
+        """Live dashboard, a single message that is kept up to date.
+
+        Optionally supply the name of the local machine to filter
+        command execution. Beware for machine names that are the
+        same as sub command names."""
+
+    @dashboard_cmd.command(name="start")
+    @commands.cooldown(1.0, 10.0)
+    async def dashboard_start(self, ctx, interval: float = 30.0):
+        """Posts (and pins) the dashboard and updates it every
+        interval seconds (at least 10). A previous dashboard message
+        is unpinned and not updated anymore."""
+        self.base_interval = self.interval = max(MIN_DASHBOARD_INTERVAL, interval)
+
+        await self.release_message()
+
+        embed = await self.make_embed()
+        self.message = await ctx.send(embed=embed)
+        self._content_hash = self.hash_embed(embed)
+        self._last_edit = time.monotonic()
+        try:
+            await self.message.pin()
+        except discord.HTTPException as ex:
+            # e. g. missing "manage messages" permission
+            LOGGER.debug(f"Failed to pin dashboard message, reason: {ex}")
+
+        # pylint: disable=no-member
+        self.update_dashboard.change_interval(seconds=self.interval)
+        if self.update_dashboard.get_task() is None:
+            self.update_dashboard.start()
+        else:
+            self.update_dashboard.restart()
+        # pylint: enable=no-member
+
+    @dashboard_cmd.command(name="stop")
+    @commands.cooldown(1.0, 10.0)
+    async def dashboard_stop(self, ctx):
+        """Stops updating the dashboard (and unpins it)."""
+        self.update_dashboard.cancel()  # pylint: disable=no-member
+        await self.release_message()
+        await ctx.send(f"Dashboard stopped @`{self.bot.local_machine_name}`")
+
+    @dashboard_cmd.command(name="status")
+    @commands.cooldown(1.0, 10.0)
+    async def dashboard_status(self, ctx):
+        """Displays update statistics of the dashboard."""
+        status = {
+            "interval_s": self.interval,
+            "message_id": self.message.id if self.message is not None else None,
+            **self.stats,
+            **{
+                f"snapshot_{k}": v
+                for k, v in self.bot.host_target.snapshots.stats.items()
+            },
+        }
+        await ctx.send(
+            f"**Dashboard status for** `{self.bot.local_machine_name}`\n"
+            + dump_dict_kv(status, wrap_markdown=True)
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -504,14 +1414,36 @@ class GeneralCommandsCog(commands.Cog, name="General"):
 
     @commands.command()
     async def info(self, ctx):
-        """Query local system information and send it back."""
-        embed = make_sysinfo_embed(name=self.bot.local_machine_name)
-        await ctx.send(embed=embed)
+        """Query local system information (of all targets) and send it back."""
+        for target in self.bot.targets.values():
+            snapshot = await target.snapshots.get()
+            fields = target.snapshots.render("info", snapshot, make_sysinfo_fields)
+            embed = make_sysinfo_embed(
+                name=target.name, snapshot=snapshot, fields=fields
+            )
+            await ctx.send(embed=embed)
 
 
 # ---------------------------------------------------------------------------
 
 
+def make_lean_client_options() -> typing.Dict[str, typing.Any]:
+    """Options for the discord.py client with a small footprint. Only the
+    gateway events needed for commands in the channel are subscribed to,
+    and no messages or members are cached (or requested at startup)."""
+    intents = discord.Intents.none()
+    # channels (``get_channel``)
+    intents.guilds = True
+    # commands
+    intents.guild_messages = True
+    return {
+        "intents": intents,
+        "max_messages": None,
+        "chunk_guilds_at_startup": False,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+    }
+
+
 class ObserverBot(commands.Bot):
     def __init__(
         self,
@@ -519,25 +1451,114 @@ class ObserverBot(commands.Bot):
         *args,
         name: typing.Optional[str] = None,
         limits_types: LimitTypesSetType = None,
+        compress_history: bool = False,
+        history_budget_mb: typing.Optional[float] = None,
+        snapshot_ttl: float = 10.0,
+        watch: typing.Optional[typing.Sequence[str]] = None,
+        watch_max_rss_gb: typing.Optional[float] = None,
+        stall_threshold: float = 1.0,
+        trace_memory: bool = False,
+        providers: ProvidersSetType = None,
+        targets: typing.Optional[typing.Mapping[str, str]] = None,
+        min_check_interval: float = 60.0,
+        max_check_interval: float = 600.0,
+        window_rules: typing.Optional[typing.Sequence[WindowRule]] = None,
+        lean: bool = False,
         **kwargs,
     ):
+        if lean:
+            # explicit client options take precedence
+            kwargs = {**make_lean_client_options(), **kwargs}
         super().__init__(*args, **kwargs)
         self.channel_id = channel_id
 
-        self.local_machine_name = name or get_name()
+        #: names of enabled metric providers, None for the defaults
+        self.providers = providers
+
+        # baseline is taken once ready, to exclude startup allocations
+        self.memory_tracer = MemoryTracer()
+        self.trace_memory = trace_memory
+
+        self.stall_threshold = stall_threshold
+        #: started once connected, see :meth:`start_watchdog`
+        self.watchdog: typing.Optional[LoopWatchdog] = None
+
+        self.local_machine_name = name or get_local_machine_name()
+
+        self.watcher = ProcessWatcher()
+
+        #: limits are checked adaptively within these bounds (seconds)
+        self.min_check_interval = min_check_interval
+        self.max_check_interval = max_check_interval
+
+        # the host and e. g. containers, each with own limits and history
+        self.host_target = ObservationTarget(
+            self.local_machine_name,
+            providers=providers,
+            history=make_history(compress_history, history_budget_mb),
+            snapshot_ttl=snapshot_ttl,
+            min_check_interval=min_check_interval,
+            max_check_interval=max_check_interval,
+        )
+        self.targets: typing.Dict[str, ObservationTarget] = {
+            self.host_target.name: self.host_target
+        }
+        for target_name, path in (targets or {}).items():
+            if target_name in self.targets:
+                LOGGER.warning(f"Duplicate target name {target_name}, skip.")
+                continue
+            self.targets[target_name] = make_cgroup_target(
+                target_name,
+                path,
+                history=make_history(compress_history, history_budget_mb),
+                snapshot_ttl=snapshot_ttl,
+                min_check_interval=min_check_interval,
+                max_check_interval=max_check_interval,
+            )
+
+        # on all targets, rules for metrics a target lacks never trigger
+        for target in self.targets.values():
+            target.add_window_rules(window_rules or ())
+
+        observer_cog = SystemResourceObserverCog(self, limits_types=limits_types)
+        for target in watch or ():
+            observer_cog.add_watch(target, max_rss_gb=watch_max_rss_gb)
 
         self.add_cog(GeneralCommandsCog(self))
-        self.add_cog(SystemResourceObserverCog(self, limits_types=limits_types))
+        self.add_cog(observer_cog)
+        self.add_cog(LiveDashboardCog(self))
         self.add_cog(SystemStatsCollectorCog(self))
 
+    def select_targets(self, name: str = "*") -> typing.List[ObservationTarget]:
+        """All targets for ``*``, else the target with the name (if any)."""
+        if name == "*":
+            return list(self.targets.values())
+        return [self.targets[name]] if name in self.targets else []
+
+    def start_watchdog(self) -> LoopWatchdog:
+        if self.watchdog is None or not self.watchdog.is_alive():
+            self.watchdog = LoopWatchdog(self.loop, threshold=self.stall_threshold)
+            self.watchdog.start()
+        return self.watchdog
+
+    async def close(self):
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        await super().close()
+
     async def on_ready(self):
         LOGGER.info(f"Logged on as {self.user}")
+        self.start_watchdog()
+        if self.trace_memory and self.memory_tracer.baseline is None:
+            self.memory_tracer.start()
         LOGGER.debug(f"name: {self.user.name}, id: {self.user.id}")
 
         channel = self.get_channel(self.channel_id)
         LOGGER.info(f"Channel: {channel} {type(channel)} {repr(channel)}")
+        names = ", ".join(f"`{name}`" for name in self.targets)
         await channel.send(
             f"Running observer bot on `{self.local_machine_name}`...\n"
+            f"Observed targets: {names}\n"
             f"Type `{self.command_prefix}help` to display available commands."
         )
 
@@ -545,6 +1566,13 @@ class ObserverBot(commands.Bot):
 
     async def on_disconnect(self):
         LOGGER.warning(f"Bot {self.user} disconnected!")
+        if self.watchdog is not None and self.watchdog.stalls:
+            # blocked loop can miss gateway heartbeats
+            stall = self.watchdog.stalls[-1]
+            LOGGER.warning(
+                f"Last event loop stall: {stall.lag:.1f}s in {stall.function}"
+                f" @ {stall.date}"
+            )
 
 
 # ---------------------------------------------------------------------------
@@ -555,6 +1583,17 @@ def run_observer(
     channel_id: int,
     name: typing.Optional[str] = None,
     limits_types: LimitTypesSetType = None,
+    compress_history: bool = False,
+    history_budget_mb: typing.Optional[float] = None,
+    watch: typing.Optional[typing.Sequence[str]] = None,
+    watch_max_rss_gb: typing.Optional[float] = None,
+    trace_memory: bool = False,
+    providers: ProvidersSetType = None,
+    targets: typing.Optional[typing.Mapping[str, str]] = None,
+    min_check_interval: float = 60.0,
+    max_check_interval: float = 600.0,
+    window_rules: typing.Optional[typing.Sequence[WindowRule]] = None,
+    lean: bool = False,
 ) -> typing.NoReturn:
     """Starts the observer bot and blocks until finished.
 
@@ -570,14 +1609,57 @@ def run_observer(
         Names of limit types that should be observed,
         None would mean that only critical limits are used,
         to disable all, use an empty set, by default None
+    compress_history : bool, optional
+        store collected stats compressed, by default False
+    history_budget_mb : typing.Optional[float], optional
+        memory budget in MB for collected stats, if not given, a fixed
+        number of samples (a week) is kept, by default None
+    watch : typing.Optional[typing.Sequence[str]], optional
+        pids or process name patterns to watch, by default None
+    watch_max_rss_gb : typing.Optional[float], optional
+        memory limit for each of the watched processes, by default None
+    trace_memory : bool, optional
+        trace memory allocations (``tracemalloc``) with a baseline
+        taken at startup, by default False
+    providers : ProvidersSetType, optional
+        names of metric providers (built-in or installed via entry points)
+        to use, None for the built-in ones, by default None
+    targets : typing.Optional[typing.Mapping[str, str]], optional
+        additional targets (name to cgroup path) to observe, e. g.
+        containers, by default None
+    min_check_interval : float, optional
+        seconds between checks of limits that are exceeded or close to
+        their threshold, by default 60.0
+    max_check_interval : float, optional
+        seconds between checks of stable limits far from their
+        threshold, by default 600.0
+    window_rules : typing.Optional[typing.Sequence[WindowRule]], optional
+        conditions over the collected stats (e. g. a mean over ten
+        minutes) to alert on, checked on all targets, by default None
+    lean : bool, optional
+        minimal gateway intents and no message/member caches, see
+        :func:`make_lean_client_options`, by default False
     """
 
     if name:
         LOGGER.info(f"Set local machine name to: {name}")
-        set_name(name)
 
     observer_bot = ObserverBot(
-        channel_id, name=name, limits_types=limits_types, command_prefix="."
+        channel_id,
+        name=name,
+        limits_types=limits_types,
+        compress_history=compress_history,
+        history_budget_mb=history_budget_mb,
+        watch=watch,
+        watch_max_rss_gb=watch_max_rss_gb,
+        trace_memory=trace_memory,
+        providers=providers,
+        targets=targets,
+        min_check_interval=min_check_interval,
+        max_check_interval=max_check_interval,
+        window_rules=window_rules,
+        lean=lean,
+        command_prefix=".",
     )
     LOGGER.info("Start observer bot ...")
     observer_bot.run(token)
@@ -0,0 +1,433 @@
+import typing
+from functools import partial
+
+from discord_system_observer_bot.gpuinfo import get_gpu_info, get_gpus
+from discord_system_observer_bot.gpuinfo import (
+    _get_gpu_util,
+    _get_gpu_mem_load,
+    _get_gpu_temp,
+)
+from discord_system_observer_bot.providers import MetricProvider
+from discord_system_observer_bot.sampler import ProbeType
+from discord_system_observer_bot.sensors import (
+    DEFAULT_TEMP_THRESHOLD,
+    _get_fans,
+    _get_power,
+    _get_temperature,
+    _get_temperature_threshold,
+    _get_temperatures,
+)
+from discord_system_observer_bot.statsobserver import ObservableLimit
+from discord_system_observer_bot.statsobserver import has_extra_deps_gpu
+from discord_system_observer_bot.sysinfo import get_cpu_info, get_disk_info
+from discord_system_observer_bot.sysinfo import (
+    _get_loadavg,
+    _get_cpu_util,
+    _get_cpu_util_percpu,
+    _get_cpu_times_perc,
+    _get_mem_util,
+    _get_mem_used,
+)
+from discord_system_observer_bot.sysinfo import (
+    _get_disk_paths,
+    _get_disk_usage,
+    _get_disk_free_gb,
+)
+from discord_system_observer_bot.sysinfo import (
+    make_disk_io_rates,
+    make_net_rates,
+    _get_nic_list,
+    _get_nic_speed,
+    _get_net_rates,
+    _get_net_util,
+    _net_util,
+    _get_disk_io_list,
+    _get_disk_io_rates,
+    _get_disk_busy,
+    _disk_busy,
+)
+
+
+StatsType = typing.Dict[str, typing.Union[float, int]]
+LimitsType = typing.Dict[str, ObservableLimit]
+
+#: rates of limits are over at least this many seconds, snapshots of the
+#: limits (info, dashboard) in between return the last rates
+LIMIT_RATES_MIN_INTERVAL = 30.0
+
+
+# ---------------------------------------------------------------------------
+
+
+class CpuProvider(MetricProvider):
+    metrics = (
+        "load_avg_1m_perc_percpu",
+        "load_avg_5m_perc_percpu",
+        "load_avg_15m_perc_percpu",
+        "mem_util_perc",
+        "mem_used_gb",
+        "cpu_core_perc:*",
+        "cpu_*_perc",
+    )
+    # more for notification purposes (if free or not)
+    limit_types = ("cpu", "ram")
+    info_title = "System information"
+
+    def collect(self, stats: StatsType) -> None:
+        (
+            stats["load_avg_1m_perc_percpu"],
+            stats["load_avg_5m_perc_percpu"],
+            stats["load_avg_15m_perc_percpu"],
+        ) = [round(v, 1) for v in _get_loadavg()]
+        stats["mem_util_perc"] = round(_get_mem_util(), 1)
+        stats["mem_used_gb"] = round(_get_mem_used(), 1)
+        # per-core values, a single pegged core hides in the load average
+        for core, perc in enumerate(_get_cpu_util_percpu()):
+            stats[f"cpu_core_perc:{core}"] = round(perc, 1)
+        for field, perc in _get_cpu_times_perc().items():
+            stats[f"cpu_{field}_perc"] = round(perc, 1)
+
+    def make_probes(self) -> typing.List[ProbeType]:
+        def _probe_cpu():
+            return {
+                "cpu_util_perc": _get_cpu_util(),
+                "mem_util_perc": _get_mem_util(),
+            }
+
+        return [_probe_cpu]
+
+    def make_limits(self, limit_types: typing.Sequence[str]) -> LimitsType:
+        limits = dict()
+
+        if "cpu" in limit_types:
+            limits["cpu_load_5min"] = ObservableLimit(
+                name="CPU Load Avg [5min]",
+                fn_retrieve=lambda: round(_get_loadavg()[1], 1),
+                fn_check=lambda cur, thres: cur < thres,
+                unit="%",
+                threshold=95.0,
+                message="**CPU Load Avg [5min]** is too high! (value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`",
+                # increase badness level by 2
+                badness_inc=2,
+                # notify, when badness counter reached 6
+                badness_threshold=6,
+                column="load_avg_5m_perc_percpu",
+            )
+
+        if "ram" in limit_types:
+            limits["mem_util"] = ObservableLimit(
+                name="Memory Utilisation",
+                fn_retrieve=lambda: round(_get_mem_util(), 1),
+                fn_check=lambda cur, thres: cur < thres,
+                unit="%",
+                threshold=85.0,
+                message="**Memory Usage** is too high! (value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`",
+                # increase badness level by 1
+                badness_inc=1,
+                # notify, when badness counter reached 3
+                badness_threshold=3,
+                column="mem_util_perc",
+            )
+
+        return limits
+
+    def info(self) -> typing.Optional[str]:
+        return get_cpu_info()
+
+
+class DiskProvider(MetricProvider):
+    metrics = ("disk_usage_perc:*", "disk_free_gb:*")
+    limit_types = ("disk", "disk_gb")
+    # critical: more for early warnings
+    default_limit_types = ("disk", "disk_gb")
+    info_title = "Disk information"
+
+    def collect(self, stats: StatsType) -> None:
+        for dpath in _get_disk_paths():
+            stats[f"disk_usage_perc:{dpath}"] = round(_get_disk_usage(dpath), 1)
+            stats[f"disk_free_gb:{dpath}"] = round(_get_disk_free_gb(dpath), 1)
+
+    def make_limits(self, limit_types: typing.Sequence[str]) -> LimitsType:
+        limits = dict()
+
+        if "disk" in limit_types or "disk_gb" in limit_types:
+            for i, path in enumerate(_get_disk_paths()):
+                if "disk" in limit_types:
+                    limits[f"disk_util_perc{i}"] = ObservableLimit(
+                        name=f"Disk Usage: {path}",
+                        fn_retrieve=partial(_get_disk_usage, path),
+                        fn_check=lambda cur, thres: cur < thres,
+                        unit="%",
+                        threshold=95.0,
+                        message=(
+                            f"**Disk Usage for `{path}`** is too high! "
+                            "(value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`"
+                        ),
+                        # use default increment amount
+                        badness_inc=None,
+                        # notify immediately
+                        badness_threshold=None,
+                        column=f"disk_usage_perc:{path}",
+                    )
+
+                # TODO: disable the static values test if system has less or not significantly more total disk space
+                if "disk_gb" in limit_types:
+
+                    def _round_get_disk_gree_gb(path):
+                        return round(_get_disk_free_gb(path), 1)
+
+                    limits[f"disk_util_gb{i}"] = ObservableLimit(
+                        name=f"Disk Space (Free): {path}",
+                        fn_retrieve=partial(_round_get_disk_gree_gb, path),
+                        fn_check=lambda cur, thres: cur > thres,
+                        unit="GB",
+                        # currently a hard-coded limit of 30GB (for smaller systems (non-servers) unneccessary?)
+                        threshold=30.0,
+                        message=(
+                            "No more **Disk Space for `{path}`**! "
+                            "(value: `{cur_value:.1f}GB`, threshold: `{threshold:.1f})`"
+                        ),
+                        # use default increment amount
+                        badness_inc=None,
+                        # notify immediately
+                        badness_threshold=None,
+                        column=f"disk_free_gb:{path}",
+                    )
+
+        return limits
+
+    def info(self) -> typing.Optional[str]:
+        return get_disk_info()
+
+
+class GpuProvider(MetricProvider):
+    metrics = (
+        "gpu_util_perc:*",
+        "gpu_mem_perc:*",
+        "gpu_temp:*",
+        "gpu_mem_used_mb:*",
+        "gpu_mem_total_mb:*",
+    )
+    limit_types = ("gpu_load", "gpu_temp")
+    default_limit_types = ("gpu_temp",)
+    info_title = "GPU information"
+
+    def is_available(self) -> bool:
+        return has_extra_deps_gpu()
+
+    def collect(self, stats: StatsType) -> None:
+        for gpu in get_gpus():
+            stats[f"gpu_util_perc:{gpu.id}"] = round(gpu.load * 100)
+            stats[f"gpu_mem_perc:{gpu.id}"] = round(gpu.memoryUtil * 100, 1)
+            stats[f"gpu_temp:{gpu.id}"] = round(gpu.temperature, 1)
+            stats[f"gpu_mem_used_mb:{gpu.id}"] = int(gpu.memoryUsed)
+            stats[f"gpu_mem_total_mb:{gpu.id}"] = int(gpu.memoryTotal)
+
+    def make_probes(self) -> typing.List[ProbeType]:
+        def _probe_gpu():
+            stats = dict()
+            for gpu in get_gpus():
+                stats[f"gpu_util_perc:{gpu.id}"] = gpu.load * 100
+                stats[f"gpu_mem_perc:{gpu.id}"] = gpu.memoryUtil * 100
+                stats[f"gpu_temp:{gpu.id}"] = gpu.temperature
+            return stats
+
+        return [_probe_gpu]
+
+    def make_limits(self, limit_types: typing.Sequence[str]) -> LimitsType:
+        limits = dict()
+
+        if "gpu_load" not in limit_types and "gpu_temp" not in limit_types:
+            return limits
+
+        for gpu in get_gpus():
+            # NOTE: may be useful if you just want to know when GPU is free for new stuff ...
+            if "gpu_load" in limit_types:
+                limits[f"gpu_util_perc:{gpu.id}"] = ObservableLimit(
+                    name=f"GPU {gpu.id} Utilisation",
+                    fn_retrieve=partial(_get_gpu_util, gpu.id),
+                    fn_check=lambda cur, thres: cur < thres,
+                    unit="%",
+                    threshold=85,
+                    message="**GPU {gpu.id} Utilisation** is working! (value: `{cur_value}%`, threshold: `{threshold})`",
+                    # increase by 2, decrease by 1
+                    badness_inc=2,
+                    badness_threshold=6,
+                    column=f"gpu_util_perc:{gpu.id}",
+                )
+                limits[f"gpu_mem_perc:{gpu.id}"] = ObservableLimit(
+                    name=f"GPU {gpu.id} Memory Utilisation",
+                    fn_retrieve=partial(_get_gpu_mem_load, gpu.id),
+                    fn_check=lambda cur, thres: cur < thres,
+                    unit="%",
+                    threshold=85.0,
+                    message="**GPU {gpu.id} Memory** is full! (value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`",
+                    # increase by 2, decrease by 1
+                    badness_inc=2,
+                    badness_threshold=6,
+                    column=f"gpu_mem_perc:{gpu.id}",
+                )
+
+            if "gpu_temp" in limit_types:
+                limits[f"gpu_temp:{gpu.id}"] = ObservableLimit(
+                    name=f"GPU {gpu.id} Temperature",
+                    fn_retrieve=partial(_get_gpu_temp, gpu.id),
+                    fn_check=lambda cur, thres: cur < thres,
+                    unit="°C",
+                    threshold=90,
+                    message="**GPU {gpu.id} Temperature** too high! (value: `{cur_value:.1f}{unit}`, threshold: `{threshold:.1f}{unit})`",
+                    # 3 times the charm
+                    badness_inc=1,
+                    badness_threshold=3,
+                    column=f"gpu_temp:{gpu.id}",
+                )
+
+        return limits
+
+    def info(self) -> typing.Optional[str]:
+        return get_gpu_info()
+
+
+class NetProvider(MetricProvider):
+    metrics = ("net_recv_mbit_s:*", "net_sent_mbit_s:*", "net_util_perc:*")
+    limit_types = ("net",)
+
+    def __init__(self):
+        # separate baselines, so that stats are over the collector interval
+        self._collect_rates = make_net_rates()
+        self._limit_rates = make_net_rates(min_interval=LIMIT_RATES_MIN_INTERVAL)
+
+    def collect(self, stats: StatsType) -> None:
+        # rates, only available from the second sample on
+        all_rates = _get_net_rates(self._collect_rates)
+        for nic, rates in all_rates.items():
+            stats[f"net_recv_mbit_s:{nic}"] = round(rates["bytes_recv"] * 8 / 1e6, 2)
+            stats[f"net_sent_mbit_s:{nic}"] = round(rates["bytes_sent"] * 8 / 1e6, 2)
+            speed = _get_nic_speed(nic)
+            if speed:
+                stats[f"net_util_perc:{nic}"] = round(_net_util(nic, all_rates), 1)
+
+    def make_limits(self, limit_types: typing.Sequence[str]) -> LimitsType:
+        limits = dict()
+
+        if "net" not in limit_types:
+            return limits
+
+        for nic in _get_nic_list():
+            if not _get_nic_speed(nic):
+                # unknown link speed, can't compute saturation
+                continue
+            limits[f"net_util_perc:{nic}"] = ObservableLimit(
+                name=f"Network Utilisation: {nic}",
+                fn_retrieve=partial(
+                    lambda nic: round(_get_net_util(nic, self._limit_rates), 1), nic
+                ),
+                fn_check=lambda cur, thres: cur < thres,
+                unit="%",
+                threshold=90.0,
+                message=(
+                    f"**Network Interface `{nic}`** is saturated! "
+                    "(value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`"
+                ),
+                badness_inc=1,
+                badness_threshold=3,
+                column=f"net_util_perc:{nic}",
+            )
+
+        return limits
+
+
+class DiskIOProvider(MetricProvider):
+    metrics = (
+        "disk_read_iops:*",
+        "disk_write_iops:*",
+        "disk_read_mb_s:*",
+        "disk_write_mb_s:*",
+        "disk_busy_perc:*",
+    )
+    limit_types = ("diskio",)
+
+    def __init__(self):
+        # separate baselines, so that stats are over the collector interval
+        self._collect_rates = make_disk_io_rates()
+        self._limit_rates = make_disk_io_rates(min_interval=LIMIT_RATES_MIN_INTERVAL)
+
+    def collect(self, stats: StatsType) -> None:
+        # rates, only available from the second sample on
+        all_rates = _get_disk_io_rates(self._collect_rates)
+        for disk, rates in all_rates.items():
+            stats[f"disk_read_iops:{disk}"] = round(rates["read_count"], 1)
+            stats[f"disk_write_iops:{disk}"] = round(rates["write_count"], 1)
+            stats[f"disk_read_mb_s:{disk}"] = round(rates["read_bytes"] / 1e6, 2)
+            stats[f"disk_write_mb_s:{disk}"] = round(rates["write_bytes"] / 1e6, 2)
+            stats[f"disk_busy_perc:{disk}"] = round(_disk_busy(disk, all_rates), 1)
+
+    def make_limits(self, limit_types: typing.Sequence[str]) -> LimitsType:
+        limits = dict()
+
+        if "diskio" not in limit_types:
+            return limits
+
+        for disk in _get_disk_io_list():
+            limits[f"disk_busy_perc:{disk}"] = ObservableLimit(
+                name=f"Disk Busy: {disk}",
+                fn_retrieve=partial(
+                    lambda disk: round(_get_disk_busy(disk, self._limit_rates), 1),
+                    disk,
+                ),
+                fn_check=lambda cur, thres: cur < thres,
+                unit="%",
+                threshold=90.0,
+                message=(
+                    f"**Disk `{disk}`** is busy! "
+                    "(value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`"
+                ),
+                badness_inc=1,
+                badness_threshold=3,
+                column=f"disk_busy_perc:{disk}",
+            )
+
+        return limits
+
+
+class SensorsProvider(MetricProvider):
+    metrics = ("sensor_temp:*", "fan_rpm:*", "power_w:*")
+    limit_types = ("temp",)
+
+    def collect(self, stats: StatsType) -> None:
+        for sensor, temp in _get_temperatures().items():
+            stats[f"sensor_temp:{sensor}"] = round(temp, 1)
+        for fan, rpm in _get_fans().items():
+            stats[f"fan_rpm:{fan}"] = round(rpm)
+        # energy counter rates, only available from the second sample on
+        for zone, watts in _get_power().items():
+            stats[f"power_w:{zone}"] = round(watts, 1)
+
+    def make_limits(self, limit_types: typing.Sequence[str]) -> LimitsType:
+        limits = dict()
+
+        if "temp" not in limit_types:
+            return limits
+
+        for sensor in _get_temperatures().keys():
+            limits[f"sensor_temp:{sensor}"] = ObservableLimit(
+                name=f"Temperature: {sensor}",
+                fn_retrieve=partial(_get_temperature, sensor),
+                fn_check=lambda cur, thres: cur < thres,
+                unit="°C",
+                # use the sensor's own "high" value (CPUs throttle there)
+                threshold=_get_temperature_threshold(sensor) or DEFAULT_TEMP_THRESHOLD,
+                message=(
+                    f"**Temperature `{sensor}`** too high! "
+                    "(value: `{cur_value:.1f}{unit}`, threshold: `{threshold:.1f}{unit})`"
+                ),
+                # 3 times the charm
+                badness_inc=1,
+                badness_threshold=3,
+                column=f"sensor_temp:{sensor}",
+            )
+
+        return limits
+
+
+# ---------------------------------------------------------------------------
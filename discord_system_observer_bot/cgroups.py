@@ -0,0 +1,280 @@
+import logging
+import os
+import typing
+from functools import partial
+
+import psutil
+
+from discord_system_observer_bot.providers import MetricProvider
+from discord_system_observer_bot.rates import CounterRates
+from discord_system_observer_bot.statsobserver import ObservableLimit
+from discord_system_observer_bot.utils import make_table
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: mount point of the cgroup file systems
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+#: cgroup v1 reports "unlimited" as a huge page-aligned number
+_V1_UNLIMITED = 2 ** 60
+
+
+# ---------------------------------------------------------------------------
+
+
+def _read_text(filename: str) -> typing.Optional[str]:
+    try:
+        with open(filename, "r") as fp:
+            return fp.read().strip()
+    except OSError:
+        return None
+
+
+def _read_int(filename: str) -> typing.Optional[int]:
+    text = _read_text(filename)
+    if text is None or text == "max":
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+def _read_keyed(filename: str) -> typing.Dict[str, int]:
+    """Read flat keyed files, e. g. ``cpu.stat`` or ``memory.events``."""
+    values = dict()
+    for line in (_read_text(filename) or "").splitlines():
+        key, _, value = line.partition(" ")
+        try:
+            values[key] = int(value)
+        except ValueError:
+            continue
+    return values
+
+
+class CgroupReader:
+    """Reads the resource usage of a control group (a container, a systemd
+    unit, ...). Supports the unified (v2) hierarchy and the ``memory``,
+    ``cpu,cpuacct`` and ``pids`` controllers of v1.
+
+    ``path`` is either absolute (below ``root``) or relative to the
+    hierarchy root, e. g. ``system.slice/docker-<id>.scope``."""
+
+    def __init__(self, path: str, root: str = CGROUP_ROOT):
+        if os.path.isabs(path) and os.path.commonpath([path, root]) == root:
+            path = os.path.relpath(path, root)
+        self.path = path.strip("/")
+        self.root = root
+
+        unified = os.path.join(root, self.path)
+        if os.path.isfile(os.path.join(unified, "cgroup.controllers")):
+            self.version = 2
+            self._dirs = dict.fromkeys(("memory", "cpu", "cpuacct", "pids"), unified)
+        else:
+            self.version = 1
+            self._dirs = {
+                controller: os.path.join(root, controller, self.path)
+                for controller in ("memory", "cpu", "cpuacct", "pids")
+            }
+
+    def _file(self, controller: str, name: str) -> str:
+        return os.path.join(self._dirs[controller], name)
+
+    @property
+    def exists(self) -> bool:
+        return os.path.isdir(self._dirs["memory"])
+
+    def memory_used(self) -> typing.Optional[int]:
+        """Memory usage in bytes, without the inactive page cache that can
+        be reclaimed (the "working set", like ``docker stats``)."""
+        if self.version == 2:
+            used = _read_int(self._file("memory", "memory.current"))
+            inactive_key = "inactive_file"
+        else:
+            used = _read_int(self._file("memory", "memory.usage_in_bytes"))
+            inactive_key = "total_inactive_file"
+        if used is None:
+            return None
+        stat = _read_keyed(self._file("memory", "memory.stat"))
+        return max(0, used - stat.get(inactive_key, 0))
+
+    def memory_limit(self) -> typing.Optional[int]:
+        """Memory limit in bytes, None if unlimited."""
+        if self.version == 2:
+            return _read_int(self._file("memory", "memory.max"))
+        limit = _read_int(self._file("memory", "memory.limit_in_bytes"))
+        return limit if limit is not None and limit < _V1_UNLIMITED else None
+
+    def oom_kills(self) -> typing.Optional[int]:
+        """Number of processes killed by the OOM killer."""
+        if self.version == 2:
+            return _read_keyed(self._file("memory", "memory.events")).get("oom_kill")
+        return _read_keyed(self._file("memory", "memory.oom_control")).get("oom_kill")
+
+    def cpu_usage(self) -> typing.Optional[float]:
+        """Consumed CPU time in seconds."""
+        if self.version == 2:
+            usage = _read_keyed(self._file("cpu", "cpu.stat")).get("usage_usec")
+            return usage / 1e6 if usage is not None else None
+        usage = _read_int(self._file("cpuacct", "cpuacct.usage"))
+        return usage / 1e9 if usage is not None else None
+
+    def cpu_limit(self) -> typing.Optional[float]:
+        """CPU bandwidth limit (number of CPUs), None if unlimited."""
+        if self.version == 2:
+            quota, _, period = (
+                _read_text(self._file("cpu", "cpu.max")) or ""
+            ).partition(" ")
+        else:
+            quota = _read_text(self._file("cpu", "cpu.cfs_quota_us")) or ""
+            period = _read_text(self._file("cpu", "cpu.cfs_period_us")) or ""
+        try:
+            quota, period = int(quota), int(period)
+        except ValueError:
+            return None
+        if quota <= 0 or period <= 0:
+            return None
+        return quota / period
+
+    def num_pids(self) -> typing.Optional[int]:
+        return _read_int(self._file("pids", "pids.current"))
+
+
+# ---------------------------------------------------------------------------
+
+
+class _CpuCounter(typing.NamedTuple):
+    cpu_seconds: float
+
+
+class CgroupProvider(MetricProvider):
+    """Metrics of a single control group, e. g. of a container. Not part of
+    the registry as it needs a path, see
+    :func:`discord_system_observer_bot.targets.make_cgroup_target`.
+
+    Metric names are the same as for the host (relative to the cgroup's
+    own limits), so charts and limits types are interchangeable."""
+
+    name = "cgroup"
+    metrics = (
+        "cpu_util_perc",
+        "mem_util_perc",
+        "mem_used_gb",
+        "pids_count",
+        "oom_kills",
+    )
+    limit_types = ("cpu", "ram")
+    # critical: running into the memory limit means OOM kills
+    default_limit_types = ("ram",)
+    info_title = "Cgroup information"
+
+    def __init__(self, path: str, root: str = CGROUP_ROOT):
+        self.reader = CgroupReader(path, root=root)
+        # shared by collector and limit checks
+        self._cpu_rates = CounterRates(("cpu_seconds",), wrap=None)
+
+    def is_available(self) -> bool:
+        return self.reader.exists
+
+    def _get_cpu_util(self) -> typing.Optional[float]:
+        """CPU usage in percent of the limit (or all CPUs), None until the
+        second sample."""
+        usage = self.reader.cpu_usage()
+        if usage is None:
+            return None
+        rates = self._cpu_rates.update({"cpu": _CpuCounter(usage)})
+        if "cpu" not in rates:
+            return None
+        cpus = self.reader.cpu_limit() or psutil.cpu_count() or 1
+        return rates["cpu"]["cpu_seconds"] / cpus * 100
+
+    def _get_mem_util(self) -> typing.Optional[float]:
+        """Memory usage in percent of the limit (or of the host memory)."""
+        used = self.reader.memory_used()
+        if used is None:
+            return None
+        limit = self.reader.memory_limit() or psutil.virtual_memory().total
+        return used / limit * 100
+
+    def collect(self, stats: typing.Dict[str, typing.Union[float, int]]) -> None:
+        cpu_util = self._get_cpu_util()
+        if cpu_util is not None:
+            stats["cpu_util_perc"] = round(cpu_util, 1)
+        mem_util = self._get_mem_util()
+        if mem_util is not None:
+            stats["mem_util_perc"] = round(mem_util, 1)
+            stats["mem_used_gb"] = round(self.reader.memory_used() / 1024 ** 3, 2)
+        num_pids = self.reader.num_pids()
+        if num_pids is not None:
+            stats["pids_count"] = num_pids
+        oom_kills = self.reader.oom_kills()
+        if oom_kills is not None:
+            stats["oom_kills"] = oom_kills
+
+    def make_limits(
+        self, limit_types: typing.Sequence[str]
+    ) -> typing.Dict[str, ObservableLimit]:
+        limits = dict()
+
+        def _round_or_zero(fn_retrieve):
+            value = fn_retrieve()
+            return round(value, 1) if value is not None else 0.0
+
+        if "cpu" in limit_types:
+            limits["cpu_util_perc"] = ObservableLimit(
+                name="CPU Utilisation",
+                fn_retrieve=partial(_round_or_zero, self._get_cpu_util),
+                fn_check=lambda cur, thres: cur < thres,
+                unit="%",
+                threshold=95.0,
+                message="**CPU Utilisation** is too high! (value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`",
+                # increase badness level by 2
+                badness_inc=2,
+                # notify, when badness counter reached 6
+                badness_threshold=6,
+                column="cpu_util_perc",
+            )
+
+        if "ram" in limit_types:
+            limits["mem_util_perc"] = ObservableLimit(
+                name="Memory Utilisation",
+                fn_retrieve=partial(_round_or_zero, self._get_mem_util),
+                fn_check=lambda cur, thres: cur < thres,
+                unit="%",
+                threshold=90.0,
+                message="**Memory Usage** is close to the limit! (value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`",
+                badness_inc=1,
+                badness_threshold=3,
+                column="mem_util_perc",
+            )
+
+        return limits
+
+    def info(self) -> typing.Optional[str]:
+        if not self.reader.exists:
+            return None
+        mem_used = self.reader.memory_used()
+        mem_limit = self.reader.memory_limit()
+        cpu_limit = self.reader.cpu_limit()
+
+        def _fmt_gb(value):
+            return f"{value / 1024 ** 3:.1f} GB" if value is not None else "-"
+
+        rows = [
+            ("Path", f"/{self.reader.path} (v{self.reader.version})"),
+            ("Memory", f"{_fmt_gb(mem_used)} / {_fmt_gb(mem_limit)}"),
+            ("CPUs", f"{cpu_limit:.1f}" if cpu_limit is not None else "-"),
+            ("Processes", self.reader.num_pids()),
+            ("OOM kills", self.reader.oom_kills()),
+        ]
+        return make_table(
+            [(key, str(value)) for key, value in rows],
+            None,
+            alignments=("<", "<"),
+            column_separators=False,
+        )
+
+
+# ---------------------------------------------------------------------------
@@ -1,11 +1,26 @@
 import argparse
 import configparser
+import json
 import logging
 import os
 import pathlib
+import subprocess
 import sys
 
-from discord_system_observer_bot.bot import run_observer
+from discord_system_observer_bot.bot import ObserverBot, run_observer
+from discord_system_observer_bot.export import import_history
+from discord_system_observer_bot.loadtest import DEFAULT_COMMANDS, FakeGateway
+from discord_system_observer_bot.loadtest import attach_fake_http, attach_fake_transport
+from discord_system_observer_bot.loadtest import disable_cooldowns
+from discord_system_observer_bot.loadtest import format_report, run_load
+from discord_system_observer_bot.loadtest import format_idle_reports, run_idle
+from discord_system_observer_bot.replay import format_results, match_limits
+from discord_system_observer_bot.replay import replay_limit
+from discord_system_observer_bot.report import replay_events, write_report_file
+from discord_system_observer_bot.statsobserver import make_observable_limits
+from discord_system_observer_bot.targets import parse_target_specs
+from discord_system_observer_bot.utils import parse_timerange
+from discord_system_observer_bot.windowrules import parse_window_rules
 
 
 LOGGER = logging.getLogger(__name__)
@@ -52,6 +67,42 @@ def load_config_file(filename):
         return {
             "token": configs["token"].strip('"'),
             "channel": int(configs["channel"]),
+            # optional
+            "compress_history": configs.getboolean("compress_history", fallback=False),
+            "history_budget_mb": configs.getfloat("history_budget_mb", fallback=None),
+            "watch": [
+                target.strip()
+                for target in configs.get("watch", fallback="").split(",")
+                if target.strip()
+            ],
+            "watch_max_rss_gb": configs.getfloat("watch_max_rss_gb", fallback=None),
+            "trace_memory": configs.getboolean("trace_memory", fallback=False),
+            "limits_types": [
+                limit_type.strip()
+                for limit_type in configs.get("limits", fallback="").split(",")
+                if limit_type.strip()
+            ]
+            or None,
+            "providers": [
+                provider.strip()
+                for provider in configs.get("providers", fallback="").split(",")
+                if provider.strip()
+            ]
+            or None,
+            "targets": parse_target_specs(
+                spec
+                for spec in configs.get("targets", fallback="").split(",")
+                if spec.strip()
+            ),
+            "check_interval_min": configs.getfloat("check_interval_min", fallback=60.0),
+            "check_interval_max": configs.getfloat(
+                "check_interval_max", fallback=600.0
+            ),
+            # separated by ";" as rules may contain commas
+            "window_rules": parse_window_rules(
+                configs.get("window_rules", fallback="").split(";")
+            ),
+            "lean_client": configs.getboolean("lean_client", fallback=False),
         }
     except KeyError as ex:
         LOGGER.error(f"Missing configuration key! >>{ex.args[0]}<<")
@@ -96,10 +147,138 @@ def parse_args(args=None):
         "-n", "--name", type=str, default=None, help="Local machine name (id)"
     )
 
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.add_parser("run", help="Run the observer bot (default)")
+
+    replay_parser = subparsers.add_parser(
+        "replay", help="Replay recorded stats against the limits"
+    )
+    replay_parser.add_argument(
+        "history_files",
+        nargs="+",
+        metavar="history-file",
+        help="Exported stats (csv/ndjson[.gz|.zst], npz), parts are concatenated",
+    )
+    replay_parser.add_argument(
+        "-l", "--limit", default=None, help="Only columns matching the glob pattern"
+    )
+    replay_parser.add_argument(
+        "-t",
+        "--threshold",
+        type=_make_list_type(float),
+        default=None,
+        help="Comma separated thresholds to try",
+    )
+    replay_parser.add_argument(
+        "-i",
+        "--badness-inc",
+        type=_make_list_type(int),
+        default=None,
+        help="Comma separated badness increments to try",
+    )
+    replay_parser.add_argument(
+        "-b",
+        "--badness-threshold",
+        type=_make_list_type(int),
+        default=None,
+        help="Comma separated badness thresholds to try",
+    )
+    replay_parser.add_argument(
+        "-e", "--events", action="store_true", help="List times of all events"
+    )
+
+    report_parser = subparsers.add_parser(
+        "report", help="Generate a HTML report from recorded stats"
+    )
+    report_parser.add_argument(
+        "history_files",
+        nargs="+",
+        metavar="history-file",
+        help="Exported stats (csv/ndjson[.gz|.zst], npz), parts are concatenated",
+    )
+    report_parser.add_argument(
+        "-o", "--output", default="report.html", help="Output HTML file"
+    )
+    report_parser.add_argument(
+        "-r",
+        "--range",
+        dest="timerange",
+        default="",
+        help='Time range, e. g. "2020-05-01..2020-05-14", default: all',
+    )
+    report_parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Parallel chart renderers"
+    )
+    report_parser.add_argument(
+        "--backend",
+        choices=("matplotlib", "builtin"),
+        default=None,
+        help="Plotting backend (default: matplotlib if installed)",
+    )
+
+    loadtest_parser = subparsers.add_parser(
+        "loadtest", help="Run the bot offline against a fake Discord and load it"
+    )
+    loadtest_parser.add_argument(
+        "--command",
+        dest="commands",
+        action="append",
+        default=None,
+        help=f"Command to fire, can be repeated (default: {', '.join(DEFAULT_COMMANDS)})",
+    )
+    loadtest_parser.add_argument(
+        "--num", type=int, default=1000, help="Number of commands to fire"
+    )
+    loadtest_parser.add_argument(
+        "--concurrency", type=int, default=50, help="Concurrent commands"
+    )
+    loadtest_parser.add_argument(
+        "--latency", type=float, default=0.0, help="Simulated API latency (seconds)"
+    )
+    loadtest_parser.add_argument(
+        "--loop-interval",
+        type=float,
+        default=1.0,
+        help="Interval of the background loops (seconds), negative to disable",
+    )
+    loadtest_parser.add_argument(
+        "--keep-cooldowns", action="store_true", help="Keep command cooldowns"
+    )
+
+    idletest_parser = subparsers.add_parser(
+        "idletest",
+        help="Measure memory/CPU of the idle bot against a fake Discord gateway",
+    )
+    idletest_parser.add_argument(
+        "--mode",
+        choices=("default", "lean", "both"),
+        default="both",
+        help="Client profile, both to compare (each in its own process)",
+    )
+    idletest_parser.add_argument(
+        "--duration", type=float, default=30.0, help="Seconds to idle"
+    )
+    idletest_parser.add_argument(
+        "--members", type=int, default=1000, help="Number of members in the guild"
+    )
+    idletest_parser.add_argument(
+        "--rate", type=float, default=5.0, help="User messages per second"
+    )
+    idletest_parser.add_argument(
+        "--json", action="store_true", help="Print the result as JSON"
+    )
+
     args = parser.parse_args(args)
     return args
 
 
+def _make_list_type(fn_type):
+    def _parse_list(text):
+        return [fn_type(value) for value in text.split(",") if value.strip()]
+
+    return _parse_list
+
+
 def setup_logging(debug=False):
     if debug:
         # logging.basicConfig(format="* %(message)s", level=logging.INFO)
@@ -114,16 +293,175 @@ def setup_logging(debug=False):
 # ---------------------------------------------------------------------------
 
 
+def run_replay(args) -> int:
+    """Replay recorded stats against the (local) limits and print how
+    many alerts/recoveries each parameter combination would produce."""
+    try:
+        history = import_history(args.history_files)
+    except (OSError, ValueError) as ex:
+        LOGGER.error(f"Loading history failed! {ex}")
+        return 1
+
+    pairs = match_limits(history, make_observable_limits(), pattern=args.limit)
+    if not pairs:
+        LOGGER.error("Found no limits for the recorded stats!")
+        return 1
+
+    results = [
+        result
+        for column, limit in pairs
+        for result in replay_limit(
+            history,
+            column,
+            limit,
+            thresholds=args.threshold,
+            badness_incs=args.badness_inc,
+            badness_thresholds=args.badness_threshold,
+        )
+    ]
+
+    print(f"Replayed {len(history)} samples.")
+    print(format_results(history, results, with_events=args.events))
+    return 0
+
+
+def run_report(args) -> int:
+    """Write a HTML report of recorded stats, with the alerts that the
+    (local) limits would have produced."""
+    try:
+        history = import_history(args.history_files)
+        start, end = parse_timerange(args.timerange)
+    except (OSError, ValueError) as ex:
+        LOGGER.error(f"Loading history failed! {ex}")
+        return 1
+
+    lo, hi = history.window(start, end)
+    if lo >= hi:
+        LOGGER.error("No recorded stats in the time range!")
+        return 1
+
+    write_report_file(
+        args.output,
+        history,
+        events=replay_events(history, make_observable_limits()),
+        title=f"System report for {args.name or 'recorded stats'}",
+        lo=lo,
+        hi=hi,
+        backend=args.backend,
+        max_workers=args.jobs,
+        use_processes=True,
+    )
+    print(f"Wrote report of {hi - lo} samples to {args.output}")
+    return 0
+
+
+def run_loadtest(args) -> int:
+    """Run the bot against a fake Discord transport, fire commands
+    concurrently and print latency percentiles and event loop stalls."""
+    channel_id = 1
+    observer_bot = ObserverBot(channel_id, name=args.name, command_prefix=".")
+    attach_fake_transport(observer_bot, channel_id, latency=args.latency)
+    if not args.keep_cooldowns:
+        disable_cooldowns(observer_bot)
+
+    report = observer_bot.loop.run_until_complete(
+        run_load(
+            observer_bot,
+            channel_id,
+            command_lines=args.commands or DEFAULT_COMMANDS,
+            num_commands=args.num,
+            concurrency=args.concurrency,
+            loop_interval=args.loop_interval if args.loop_interval >= 0 else None,
+        )
+    )
+    for cog_name in list(observer_bot.cogs.keys()):
+        observer_bot.remove_cog(cog_name)
+
+    print(format_report(report))
+    return 0
+
+
+def run_idletest(args) -> int:
+    """Let the bot idle in a busy channel of a fake Discord gateway and
+    print its memory and CPU usage, for the default or the lean client
+    profile, or for both (in separate processes for clean numbers)."""
+    if args.mode == "both":
+        reports = dict()
+        for mode in ("default", "lean"):
+            cmd = [
+                sys.executable,
+                "-m",
+                "discord_system_observer_bot",
+                "idletest",
+                f"--mode={mode}",
+                f"--duration={args.duration}",
+                f"--members={args.members}",
+                f"--rate={args.rate}",
+                "--json",
+            ]
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, check=False)
+            if result.returncode != 0:
+                LOGGER.error(f"Idle test in {mode} mode failed!")
+                return 1
+            reports[mode] = json.loads(result.stdout.decode().splitlines()[-1])
+        print(format_idle_reports(reports))
+        return 0
+
+    channel_id = 1
+    observer_bot = ObserverBot(
+        channel_id, name=args.name, lean=args.mode == "lean", command_prefix="."
+    )
+    attach_fake_http(observer_bot)
+    gateway = FakeGateway(observer_bot, channel_id, num_members=args.members)
+
+    report = observer_bot.loop.run_until_complete(
+        run_idle(observer_bot, gateway, duration=args.duration, message_rate=args.rate)
+    )
+    for cog_name in list(observer_bot.cogs.keys()):
+        observer_bot.remove_cog(cog_name)
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(format_idle_reports({args.mode: report}))
+    return 0
+
+
 def main(args=None):
     args = parse_args(args)
 
     setup_logging(args.debug)
 
+    if args.command == "replay":
+        sys.exit(run_replay(args))
+    if args.command == "report":
+        sys.exit(run_report(args))
+    if args.command == "loadtest":
+        sys.exit(run_loadtest(args))
+    if args.command == "idletest":
+        sys.exit(run_idletest(args))
+
     configs = load_config(filename=args.config)
     LOGGER.debug(f"Run bot with configs: {configs}")
 
     try:
-        run_observer(configs["token"], configs["channel"], name=args.name)
+        run_observer(
+            configs["token"],
+            configs["channel"],
+            name=args.name,
+            limits_types=configs.get("limits_types"),
+            compress_history=configs.get("compress_history", False),
+            history_budget_mb=configs.get("history_budget_mb"),
+            watch=configs.get("watch"),
+            watch_max_rss_gb=configs.get("watch_max_rss_gb"),
+            trace_memory=configs.get("trace_memory", False),
+            providers=configs.get("providers"),
+            targets=configs.get("targets"),
+            min_check_interval=configs.get("check_interval_min", 60.0),
+            max_check_interval=configs.get("check_interval_max", 600.0),
+            window_rules=configs.get("window_rules"),
+            lean=configs.get("lean_client", False),
+        )
     except:  # pylint: disable=bare-except
         sys.exit(1)
 
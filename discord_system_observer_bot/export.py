@@ -0,0 +1,411 @@
+import csv
+import gzip
+import io
+import json
+import math
+import typing
+from functools import lru_cache
+from io import BytesIO
+
+from discord_system_observer_bot.history import StatsHistory, StatsType
+
+
+#: default upload limit for Discord attachments (without boosts/nitro)
+DISCORD_UPLOAD_LIMIT = 8 * 1024 ** 2
+#: maximum number of attachments per message
+DISCORD_MAX_ATTACHMENTS = 10
+
+#: supported export formats
+FORMATS = ("csv", "ndjson", "npz")
+#: supported compressions (npz is always zip/deflate compressed)
+COMPRESSIONS = ("gz", "zst")
+
+#: compressed buffers lag behind the compressor state, so split early
+_SIZE_MARGIN = 256 * 1024
+#: check compressed size only every so many rows
+_CHECK_EVERY = 256
+
+FileListType = typing.List[typing.Tuple[str, bytes]]
+
+
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=1)
+def has_extra_deps_zstd() -> bool:
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel,unused-import
+    except ImportError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def has_extra_deps_numpy() -> bool:
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel,unused-import
+    except ImportError:
+        return False
+    return True
+
+
+def parse_format(text: typing.Optional[str]) -> typing.Tuple[str, typing.Optional[str]]:
+    """Parse export formats like ``csv``, ``ndjson.gz``, ``csv.zst`` or
+    ``npz`` into format and compression. If not given, the best available
+    compression is chosen.
+
+    Raises
+    ------
+    ValueError
+        if unknown or the compression is not available
+    """
+    fmt, _, compression = (text or "csv").lower().partition(".")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}, use one of {', '.join(FORMATS)}")
+    if fmt == "npz":
+        if not has_extra_deps_numpy():
+            raise ValueError("Format npz requires numpy to be installed!")
+        return fmt, None
+    if not compression:
+        compression = "zst" if has_extra_deps_zstd() else "gz"
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == "zst" and not has_extra_deps_zstd():
+        raise ValueError("Compression zst requires zstandard to be installed!")
+    return fmt, compression
+
+
+# ---------------------------------------------------------------------------
+
+
+def _iter_columns(
+    history: StatsHistory, lo: int, hi: int, stride: int = 1
+) -> typing.Iterator[typing.Tuple]:
+    """Yield rows ``(_id, _datetime, *metrics)`` by zipping the column
+    iterators, no intermediate lists are materialized."""
+    columns = [
+        history.iter_ids(lo, hi),
+        history.iter_timestamps(lo, hi),
+    ] + [history.iter_column(name, lo, hi) for name in history.names]
+    for num, row in enumerate(zip(*columns)):
+        if num % stride == 0:
+            yield row
+
+
+def iter_csv(
+    history: StatsHistory, lo: int = 0, hi: typing.Optional[int] = None, stride: int = 1
+) -> typing.Iterator[str]:
+    """Yield CSV lines (with header), missing values are empty. Written
+    with :func:`csv.writer` (quoting of names), like they are read."""
+    if hi is None:
+        hi = len(history)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def _format(row):
+        writer.writerow(row)
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    yield _format(["_id", "_datetime"] + history.names)
+    for row in _iter_columns(history, lo, hi, stride=stride):
+        yield _format(
+            "" if isinstance(v, float) and math.isnan(v) else repr(v) for v in row
+        )
+
+
+def iter_ndjson(
+    history: StatsHistory, lo: int = 0, hi: typing.Optional[int] = None, stride: int = 1
+) -> typing.Iterator[str]:
+    """Yield one JSON object per sample, missing values are omitted."""
+    if hi is None:
+        hi = len(history)
+    names = ["_id", "_datetime"] + history.names
+    for row in _iter_columns(history, lo, hi, stride=stride):
+        yield json.dumps(
+            {
+                name: value
+                for name, value in zip(names, row)
+                if not (isinstance(value, float) and math.isnan(value))
+            }
+        ) + "\n"
+
+
+# ---------------------------------------------------------------------------
+
+
+class _CompressedPart:
+    """Compressed in-memory file, the size is only an estimate until
+    :meth:`close` is called."""
+
+    def __init__(self, compression: str):
+        self.buffer = BytesIO()
+        if compression == "zst":
+            import zstandard  # pylint: disable=import-outside-toplevel
+
+            self.stream = zstandard.ZstdCompressor(level=10).stream_writer(
+                self.buffer, closefd=False
+            )
+        else:
+            self.stream = gzip.GzipFile(fileobj=self.buffer, mode="wb", compresslevel=9)
+        self.num_lines = 0
+
+    def write(self, line: str) -> None:
+        self.stream.write(line.encode("utf-8"))
+        self.num_lines += 1
+
+    @property
+    def size(self) -> int:
+        return self.buffer.tell()
+
+    def close(self) -> bytes:
+        self.stream.close()
+        return self.buffer.getvalue()
+
+
+def _export_text(
+    lines: typing.Iterator[str],
+    compression: str,
+    max_size: int,
+    max_parts: int,
+    with_header: bool,
+) -> typing.Optional[typing.List[bytes]]:
+    """Stream lines into compressed parts of at most ``max_size`` bytes.
+    Returns ``None`` if more than ``max_parts`` parts are required."""
+    header = next(lines) if with_header else None
+    parts = list()
+    part = None
+    for line in lines:
+        if part is None:
+            part = _CompressedPart(compression)
+            if header is not None:
+                part.write(header)
+        part.write(line)
+
+        if part.num_lines % _CHECK_EVERY == 0 and part.size > max_size - _SIZE_MARGIN:
+            parts.append(part.close())
+            part = None
+            if len(parts) >= max_parts:
+                # more data would follow, give up
+                if next(lines, None) is not None:
+                    return None
+
+    if part is not None:
+        parts.append(part.close())
+    elif not parts and header is not None:
+        part = _CompressedPart(compression)
+        part.write(header)
+        parts.append(part.close())
+
+    if any(len(data) > max_size for data in parts):
+        return None
+    return parts
+
+
+def _export_npz(history: StatsHistory, lo: int, hi: int, stride: int = 1) -> bytes:
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+
+    # pylint: enable=import-outside-toplevel
+
+    arrays = {
+        "_id": np.fromiter(history.iter_ids(lo, hi), dtype=np.int64)[::stride],
+        "_datetime": np.fromiter(history.iter_timestamps(lo, hi), dtype=np.int64)[
+            ::stride
+        ],
+    }
+    for name in history.names:
+        arrays[name] = np.fromiter(
+            history.iter_column(name, lo, hi), dtype=np.float64, count=hi - lo
+        )[::stride]
+
+    buf = BytesIO()
+    np.savez_compressed(buf, **arrays)
+    return buf.getvalue()
+
+
+def export_history(
+    history: StatsHistory,
+    fmt: str = "csv",
+    compression: typing.Optional[str] = "gz",
+    lo: int = 0,
+    hi: typing.Optional[int] = None,
+    basename: str = "stats",
+    max_size: int = DISCORD_UPLOAD_LIMIT,
+    max_parts: int = DISCORD_MAX_ATTACHMENTS,
+) -> typing.Tuple[FileListType, int]:
+    """Export collected stats into compressed files that fit into
+    Discord attachments.
+
+    The data is split into multiple (standalone) files if too large.
+    If it does not fit into ``max_parts`` files, the data is down-sampled
+    (every 2nd, 4th, ... sample) until it fits.
+
+    Returns
+    -------
+    typing.Tuple[FileListType, int]
+        list of filenames and content, and the down-sampling stride
+        (1 if all samples are exported)
+    """
+    if hi is None:
+        hi = len(history)
+
+    stride = 1
+    while True:
+        if fmt == "npz":
+            parts = list()
+            # split by rows (halving) until each part fits
+            pending = [(lo, hi)]
+            while pending and len(parts) <= max_parts:
+                part_lo, part_hi = pending.pop(0)
+                data = _export_npz(history, part_lo, part_hi, stride=stride)
+                if len(data) <= max_size or part_hi - part_lo <= stride:
+                    parts.append(data)
+                else:
+                    mid = part_lo + (part_hi - part_lo) // 2
+                    pending[0:0] = [(part_lo, mid), (mid, part_hi)]
+            if pending or len(parts) > max_parts:
+                parts = None
+            extension = "npz"
+        else:
+            fn_iter = iter_csv if fmt == "csv" else iter_ndjson
+            parts = _export_text(
+                fn_iter(history, lo, hi, stride=stride),
+                compression,
+                max_size,
+                max_parts,
+                with_header=fmt == "csv",
+            )
+            extension = f"{fmt}.{compression}"
+
+        if parts is not None:
+            break
+        if stride >= hi - lo:
+            # can't reduce any further
+            return list(), stride
+        stride *= 2
+
+    if len(parts) == 1:
+        return [(f"{basename}.{extension}", parts[0])], stride
+    return (
+        [
+            (f"{basename}.part{num:02d}.{extension}", data)
+            for num, data in enumerate(parts, 1)
+        ],
+        stride,
+    )
+
+
+def group_files(
+    files: FileListType,
+    max_size: int = DISCORD_UPLOAD_LIMIT,
+    max_files: int = DISCORD_MAX_ATTACHMENTS,
+) -> typing.List[FileListType]:
+    """Group files (in order) for messages, the upload limit applies to
+    all attachments of a message together. Files larger than ``max_size``
+    are sent on their own."""
+    groups = list()
+    group, group_size = list(), 0
+    for filename, data in files:
+        if group and (group_size + len(data) > max_size or len(group) >= max_files):
+            groups.append(group)
+            group, group_size = list(), 0
+        group.append((filename, data))
+        group_size += len(data)
+    if group:
+        groups.append(group)
+    return groups
+
+
+# ---------------------------------------------------------------------------
+
+
+def _open_text(filename: str) -> typing.TextIO:
+    """Open a (compressed) text file for reading, by extension."""
+    if filename.endswith(".gz"):
+        return gzip.open(filename, "rt", encoding="utf-8")
+    if filename.endswith(".zst"):
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+        fp = open(filename, "rb")
+        return io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(fp, closefd=True),
+            encoding="utf-8",
+        )
+    return open(filename, "r", encoding="utf-8")
+
+
+def _iter_csv_samples(fp: typing.TextIO) -> typing.Iterator[StatsType]:
+    for row in csv.DictReader(fp):
+        sample = {"_datetime": int(row.pop("_datetime"))}
+        row.pop("_id", None)
+        for name, value in row.items():
+            if value:
+                sample[name] = float(value)
+        yield sample
+
+
+def _iter_ndjson_samples(fp: typing.TextIO) -> typing.Iterator[StatsType]:
+    for line in fp:
+        if line.strip():
+            sample = json.loads(line)
+            sample.pop("_id", None)
+            yield sample
+
+
+def _iter_npz_samples(filename: str) -> typing.Iterator[StatsType]:
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+
+    # pylint: enable=import-outside-toplevel
+
+    with np.load(filename) as data:
+        arrays = {name: data[name] for name in data.files}
+    timestamps = arrays.pop("_datetime")
+    arrays.pop("_id", None)
+    for pos, timestamp in enumerate(timestamps):
+        sample = {"_datetime": int(timestamp)}
+        for name, values in arrays.items():
+            if not math.isnan(values[pos]):
+                sample[name] = float(values[pos])
+        yield sample
+
+
+def import_history(
+    filenames: typing.Sequence[str], history: typing.Optional[StatsHistory] = None
+) -> StatsHistory:
+    """Load files written by :func:`export_history` (``csv``/``ndjson``,
+    optionally ``gz``/``zst`` compressed, or ``npz``) into a history.
+    Parts are appended in order of their (sorted) filenames.
+
+    Raises
+    ------
+    ValueError
+        if the file format is unknown
+    """
+    if history is None:
+        history = StatsHistory()
+
+    for filename in sorted(filenames):
+        name = filename[: -len(".gz")] if filename.endswith(".gz") else filename
+        name = name[: -len(".zst")] if name.endswith(".zst") else name
+        if name.endswith(".npz"):
+            for sample in _iter_npz_samples(filename):
+                history.append(sample)
+            continue
+        if name.endswith(".csv"):
+            fn_iter = _iter_csv_samples
+        elif name.endswith(".ndjson"):
+            fn_iter = _iter_ndjson_samples
+        else:
+            raise ValueError(f"Unknown history file format: {filename}")
+        with _open_text(filename) as fp:
+            for sample in fn_iter(fp):
+                history.append(sample)
+
+    return history
+
+
+# ---------------------------------------------------------------------------
@@ -0,0 +1,189 @@
+import struct
+import typing
+
+
+# ---------------------------------------------------------------------------
+
+
+class BitWriter:
+    def __init__(self):
+        self._buffer = bytearray()
+        self._acc = 0
+        self._num_bits = 0
+
+    def write(self, value: int, num_bits: int) -> None:
+        """Write the lowest ``num_bits`` bits of ``value``."""
+        self._acc = (self._acc << num_bits) | (value & ((1 << num_bits) - 1))
+        self._num_bits += num_bits
+        while self._num_bits >= 8:
+            self._num_bits -= 8
+            self._buffer.append((self._acc >> self._num_bits) & 0xFF)
+        self._acc &= (1 << self._num_bits) - 1
+
+    def getvalue(self) -> bytes:
+        data = bytes(self._buffer)
+        if self._num_bits:
+            data += bytes([(self._acc << (8 - self._num_bits)) & 0xFF])
+        return data
+
+
+class BitReader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+        self._acc = 0
+        self._num_bits = 0
+
+    def read(self, num_bits: int) -> int:
+        while self._num_bits < num_bits:
+            self._acc = (self._acc << 8) | self._data[self._pos]
+            self._pos += 1
+            self._num_bits += 8
+        self._num_bits -= num_bits
+        value = self._acc >> self._num_bits
+        self._acc &= (1 << self._num_bits) - 1
+        return value
+
+    def read_signed(self, num_bits: int) -> int:
+        value = self.read(num_bits)
+        if value >= 1 << (num_bits - 1):
+            value -= 1 << num_bits
+        return value
+
+
+# ---------------------------------------------------------------------------
+
+
+#: (prefix, prefix length, value bits) for delta-of-delta buckets
+_DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12), (0b1111, 4, 32))
+#: reserved 32bit delta-of-delta, followed by a raw 64bit value
+_DOD_ESCAPE = -(1 << 31)
+
+
+def encode_ints(values: typing.Iterable[int]) -> bytes:
+    """Delta-of-delta encode 64bit integers (e. g. timestamps), like in
+    Facebook's Gorilla time series database. Values with regular intervals
+    only need a single bit, small changes of the interval a few bits."""
+    writer = BitWriter()
+    prev, prev_delta = None, 0
+    for value in values:
+        if prev is None:
+            writer.write(value, 64)
+            prev = value
+            continue
+
+        delta = value - prev
+        dod = delta - prev_delta
+        if dod == 0:
+            writer.write(0, 1)
+        else:
+            for prefix, prefix_len, num_bits in _DOD_BUCKETS:
+                if -(1 << (num_bits - 1)) < dod < (1 << (num_bits - 1)):
+                    writer.write(prefix, prefix_len)
+                    writer.write(dod, num_bits)
+                    break
+            else:
+                # does not fit into 32 bits, store raw value
+                writer.write(0b1111, 4)
+                writer.write(_DOD_ESCAPE, 32)
+                writer.write(value, 64)
+                delta = 0
+        prev, prev_delta = value, delta
+    return writer.getvalue()
+
+
+def decode_ints(data: bytes, count: int) -> typing.Iterator[int]:
+    """Lazily decode ``count`` integers encoded by :func:`encode_ints`."""
+    if not count:
+        return
+    reader = BitReader(data)
+    prev = reader.read_signed(64)
+    prev_delta = 0
+    yield prev
+    for _ in range(count - 1):
+        # number of leading one bits select the bucket
+        bucket = 0
+        while bucket < len(_DOD_BUCKETS) and reader.read(1):
+            bucket += 1
+        if bucket == 0:
+            dod = 0
+        else:
+            dod = reader.read_signed(_DOD_BUCKETS[bucket - 1][2])
+            if bucket == len(_DOD_BUCKETS) and dod == _DOD_ESCAPE:
+                prev = reader.read_signed(64)
+                prev_delta = 0
+                yield prev
+                continue
+        prev_delta += dod
+        prev += prev_delta
+        yield prev
+
+
+# ---------------------------------------------------------------------------
+
+
+def _float2bits(value: float) -> int:
+    return struct.unpack(">Q", struct.pack(">d", value))[0]
+
+
+def _bits2float(bits: int) -> float:
+    return struct.unpack(">d", struct.pack(">Q", bits))[0]
+
+
+def encode_floats(values: typing.Iterable[float]) -> bytes:
+    """XOR encode 64bit floats against the previous value (Gorilla).
+    Unchanged values need a single bit, slowly changing values only the
+    meaningful (non-zero) bits of the XOR."""
+    writer = BitWriter()
+    prev = None
+    prev_leading, prev_trailing = 65, 65
+    for value in values:
+        bits = _float2bits(value)
+        if prev is None:
+            writer.write(bits, 64)
+            prev = bits
+            continue
+
+        xor = bits ^ prev
+        prev = bits
+        if xor == 0:
+            writer.write(0, 1)
+            continue
+
+        writer.write(1, 1)
+        leading = min(64 - xor.bit_length(), 31)
+        trailing = (xor & -xor).bit_length() - 1
+        if leading >= prev_leading and trailing >= prev_trailing:
+            # meaningful bits fit into the previous window
+            writer.write(0, 1)
+            writer.write(xor >> prev_trailing, 64 - prev_leading - prev_trailing)
+        else:
+            meaningful = 64 - leading - trailing
+            writer.write(1, 1)
+            writer.write(leading, 5)
+            # 64 meaningful bits do not fit into 6 bits, stored as 0
+            writer.write(meaningful & 0x3F, 6)
+            writer.write(xor >> trailing, meaningful)
+            prev_leading, prev_trailing = leading, trailing
+    return writer.getvalue()
+
+
+def decode_floats(data: bytes, count: int) -> typing.Iterator[float]:
+    """Lazily decode ``count`` floats encoded by :func:`encode_floats`."""
+    if not count:
+        return
+    reader = BitReader(data)
+    prev = reader.read(64)
+    yield _bits2float(prev)
+    leading, trailing = 0, 0
+    for _ in range(count - 1):
+        if reader.read(1):
+            if reader.read(1):
+                leading = reader.read(5)
+                meaningful = reader.read(6) or 64
+                trailing = 64 - leading - meaningful
+            prev ^= reader.read(64 - leading - trailing) << trailing
+        yield _bits2float(prev)
+
+
+# ---------------------------------------------------------------------------
@@ -1,4 +1,11 @@
+import resource
+import shutil
+import subprocess
+import threading
 import typing
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
 
 from discord_system_observer_bot.utils import make_table
 
@@ -18,9 +25,38 @@ except ImportError:
             return []
 
 
+#: ``nvidia-smi`` runs (GPUtil, process memory) one at a time, so that the
+#: CPU time of the reaped child process can be attributed to the caller
+_NVIDIA_SMI_LOCK = threading.Lock()
+_THREAD_CHILD_CPU = threading.local()
+
+
 # ---------------------------------------------------------------------------
 
 
+def _children_cpu_time() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def get_thread_child_cpu_time() -> float:
+    """CPU time (seconds) of the ``nvidia-smi`` processes that the current
+    thread has run so far."""
+    return getattr(_THREAD_CHILD_CPU, "seconds", 0.0)
+
+
+@contextmanager
+def _nvidia_smi_call() -> typing.Iterator[None]:
+    with _NVIDIA_SMI_LOCK:
+        start = _children_cpu_time()
+        try:
+            yield
+        finally:
+            _THREAD_CHILD_CPU.seconds = (
+                get_thread_child_cpu_time() + _children_cpu_time() - start
+            )
+
+
 def get_gpus() -> typing.List[GPUtil.GPU]:
     """Return a list of ``GPUtil.GPU`` objects. Empty if none found.
 
@@ -29,7 +65,8 @@ def get_gpus() -> typing.List[GPUtil.GPU]:
     typing.List[GPUtil.GPU]
         List of GPU info objects. Empty if none found.
     """
-    return GPUtil.getGPUs()
+    with _nvidia_smi_call():
+        return GPUtil.getGPUs()
 
 
 # ---------------------------------------------------------------------------
@@ -67,6 +104,52 @@ def _get_gpu_temp(gpu_id):
     return round(gpu.temperature, 1)
 
 
+@lru_cache(maxsize=1)
+def _find_nvidia_smi() -> typing.Optional[str]:
+    return shutil.which("nvidia-smi")
+
+
+def get_gpu_process_memory() -> typing.Dict[int, float]:
+    """Used GPU memory (MB) per process id, summed over all GPUs.
+
+    Returns
+    -------
+    typing.Dict[int, float]
+        mapping of pid to used memory, empty if ``nvidia-smi`` is not
+        available or failed
+    """
+    nvidia_smi = _find_nvidia_smi()
+    if nvidia_smi is None:
+        return dict()
+
+    try:
+        with _nvidia_smi_call():
+            output = subprocess.run(
+                [
+                    nvidia_smi,
+                    "--query-compute-apps=pid,used_memory",
+                    "--format=csv,noheader,nounits",
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                universal_newlines=True,
+                timeout=10,
+                check=True,
+            ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return dict()
+
+    memory = defaultdict(float)
+    for line in output.splitlines():
+        pid, _, used = line.partition(",")
+        try:
+            memory[int(pid)] += float(used)
+        except ValueError:
+            # e. g. "[N/A]" if not supported
+            continue
+    return dict(memory)
+
+
 # ---------------------------------------------------------------------------
 
 
@@ -86,7 +169,7 @@ def get_gpu_info() -> typing.Optional[str]:
     headers = ("ID", "Util", "Mem", "Temp", "Memory (Used)")  # , "Name")
 
     rows = list()
-    for gpu in GPUtil.getGPUs():
+    for gpu in get_gpus():
         fields = [
             f"{gpu.id}",
             f"{gpu.load * 100:.0f} %",
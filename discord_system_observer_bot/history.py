@@ -0,0 +1,781 @@
+import math
+import sys
+import typing
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from discord_system_observer_bot.gorilla import decode_floats, decode_ints
+from discord_system_observer_bot.gorilla import encode_floats, encode_ints
+from discord_system_observer_bot.sampler import split_aggregate_name
+
+
+#: number of samples per chunk, all but the last (open) chunk are full
+CHUNK_SIZE = 256
+
+#: supported aggregates for :meth:`StatsHistory.aggregate`
+AGGREGATES = ("min", "max", "avg", "p95", "last")
+
+NaN = float("nan")
+Inf = float("inf")
+
+StatsType = typing.Dict[str, typing.Union[float, int]]
+
+
+# ---------------------------------------------------------------------------
+
+
+def aggregate_values(
+    values: typing.Iterable[float], agg: str
+) -> typing.Optional[float]:
+    """Aggregate values, ``NaN`` (missing) values are ignored.
+    Returns ``None`` if no values are left."""
+    values = [v for v in values if not math.isnan(v)]
+    if not values:
+        return None
+    if agg == "min":
+        return min(values)
+    if agg == "max":
+        return max(values)
+    if agg == "avg":
+        return sum(values) / len(values)
+    if agg == "p95":
+        # nearest-rank percentile
+        return sorted(values)[math.ceil(0.95 * len(values)) - 1]
+    if agg == "last":
+        return values[-1]
+    raise ValueError(f"Unknown aggregate: {agg}")
+
+
+# ---------------------------------------------------------------------------
+
+
+class _RangeIndex:
+    """Aggregates of a single metric over whole chunks.
+
+    Chunks are addressed by their absolute (ever increasing) number and
+    stored in a ring of ``capacity`` slots. Minimum and maximum are kept
+    in iterative segment trees over the ring slots (``O(log n)`` range
+    queries), sum and count as prefix sums (``O(1)`` range queries).
+    The ring must have at least one more slot than retained chunks, so
+    that the prefix sum preceding the oldest chunk is still available."""
+
+    __slots__ = ("capacity", "mins", "maxs", "psums", "pcounts")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.mins = array("d", [Inf]) * (2 * capacity)
+        self.maxs = array("d", [-Inf]) * (2 * capacity)
+        self.psums = array("d", [0.0]) * capacity
+        self.pcounts = array("d", [0.0]) * capacity
+
+    def set(self, chunk_no: int, summary: typing.Optional[typing.List[float]]) -> None:
+        """Store the ``[min, max, sum, count]`` summary of a chunk,
+        ``None`` if the metric has no values in it."""
+        vmin, vmax, vsum, vcount = summary or (Inf, -Inf, 0.0, 0.0)
+
+        slot = chunk_no % self.capacity
+        prev = (chunk_no - 1) % self.capacity
+        self.psums[slot] = (self.psums[prev] if chunk_no else 0.0) + vsum
+        self.pcounts[slot] = (self.pcounts[prev] if chunk_no else 0.0) + vcount
+
+        for tree, value, fn_agg in ((self.mins, vmin, min), (self.maxs, vmax, max)):
+            pos = slot + self.capacity
+            tree[pos] = value
+            pos >>= 1
+            while pos:
+                tree[pos] = fn_agg(tree[2 * pos], tree[2 * pos + 1])
+                pos >>= 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            sys.getsizeof(a) for a in (self.mins, self.maxs, self.psums, self.pcounts)
+        )
+
+    def _tree_query(self, tree: array, fn_agg, init: float, lo: int, hi: int) -> float:
+        """Aggregate ring slots ``[lo, hi)`` (no wrap-around)."""
+        result = init
+        lo += self.capacity
+        hi += self.capacity
+        while lo < hi:
+            if lo & 1:
+                result = fn_agg(result, tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                result = fn_agg(result, tree[hi])
+            lo >>= 1
+            hi >>= 1
+        return result
+
+    def query(
+        self, first_no: int, last_no: int
+    ) -> typing.Tuple[float, float, float, float]:
+        """Return ``(min, max, sum, count)`` for chunks ``first_no``
+        to ``last_no`` (inclusive)."""
+        lo = first_no % self.capacity
+        hi = last_no % self.capacity + 1
+        if lo < hi:
+            ranges = ((lo, hi),)
+        else:
+            ranges = ((lo, self.capacity), (0, hi))
+        vmin = min(self._tree_query(self.mins, min, Inf, a, b) for a, b in ranges)
+        vmax = max(self._tree_query(self.maxs, max, -Inf, a, b) for a, b in ranges)
+
+        prev = (first_no - 1) % self.capacity
+        vsum = self.psums[hi - 1] - (self.psums[prev] if first_no else 0.0)
+        vcount = self.pcounts[hi - 1] - (self.pcounts[prev] if first_no else 0.0)
+        return vmin, vmax, vsum, vcount
+
+
+def _summarize(values: typing.Iterable[float]) -> typing.Optional[typing.List[float]]:
+    """Return ``[min, max, sum, count]`` of non-``NaN`` values."""
+    values = [v for v in values if not math.isnan(v)]
+    if not values:
+        return None
+    return [min(values), max(values), sum(values), len(values)]
+
+
+# ---------------------------------------------------------------------------
+
+
+class _Chunk:
+    """Columnar block of samples, one ``array`` per metric.
+    Missing values (metric not available in a sample) are ``NaN``.
+
+    A ``[min, max, sum, count]`` summary per metric is maintained while
+    appending. The ``level`` is the number of times the samples have been
+    down-sampled (by a factor of 2)."""
+
+    __slots__ = ("timestamps", "ids", "columns", "summary", "level")
+
+    def __init__(self, level: int = 0):
+        self.timestamps = array("q")
+        self.ids = array("q")
+        self.columns: typing.Dict[str, array] = dict()
+        self.summary: typing.Dict[str, typing.List[float]] = dict()
+        self.level = level
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def names(self) -> typing.List[str]:
+        return list(self.columns.keys())
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            sys.getsizeof(self.timestamps)
+            + sys.getsizeof(self.ids)
+            + sys.getsizeof(self.columns)
+            + sum(sys.getsizeof(column) for column in self.columns.values())
+        )
+
+    @property
+    def first_timestamp(self) -> int:
+        return self.timestamps[0]
+
+    @property
+    def last_timestamp(self) -> int:
+        return self.timestamps[-1]
+
+    def append(self, timestamp: int, id_: int, values: StatsType) -> None:
+        pos = len(self.timestamps)
+        self.timestamps.append(timestamp)
+        self.ids.append(id_)
+
+        for name, value in values.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = array("d", [NaN]) * pos
+            if value is None or math.isnan(value):
+                column.append(NaN)
+                continue
+            column.append(value)
+
+            summary = self.summary.get(name)
+            if summary is None:
+                self.summary[name] = [value, value, value, 1]
+            else:
+                if value < summary[0]:
+                    summary[0] = value
+                if value > summary[1]:
+                    summary[1] = value
+                summary[2] += value
+                summary[3] += 1
+
+        # pad metrics that are missing in this sample
+        for column in self.columns.values():
+            if len(column) == pos:
+                column.append(NaN)
+
+    def column(self, name: str, lo: int = 0, hi: typing.Optional[int] = None):
+        if hi is None:
+            hi = len(self)
+        column = self.columns.get(name)
+        if column is None:
+            return array("d", [NaN]) * (hi - lo)
+        return column[lo:hi]
+
+
+class _CompressedChunk:
+    """Closed chunk with Gorilla compressed columns (delta-of-delta
+    timestamps and ids, XOR encoded floats), see :mod:`gorilla`.
+    Columns are decoded lazily and only up to the requested row."""
+
+    __slots__ = (
+        "length",
+        "first_timestamp",
+        "last_timestamp",
+        "summary",
+        "level",
+        "_timestamps",
+        "_ids",
+        "_columns",
+    )
+
+    def __init__(self, chunk: _Chunk):
+        self.length = len(chunk)
+        self.first_timestamp = chunk.first_timestamp
+        self.last_timestamp = chunk.last_timestamp
+        self.summary = chunk.summary
+        self.level = chunk.level
+        self._timestamps = encode_ints(chunk.timestamps)
+        self._ids = encode_ints(chunk.ids)
+        self._columns = {
+            name: encode_floats(column) for name, column in chunk.columns.items()
+        }
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def names(self) -> typing.List[str]:
+        return list(self._columns.keys())
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            sys.getsizeof(self._timestamps)
+            + sys.getsizeof(self._ids)
+            + sys.getsizeof(self._columns)
+            + sum(sys.getsizeof(data) for data in self._columns.values())
+        )
+
+    @property
+    def timestamps(self) -> array:
+        return array("q", decode_ints(self._timestamps, self.length))
+
+    @property
+    def ids(self) -> array:
+        return array("q", decode_ints(self._ids, self.length))
+
+    def column(self, name: str, lo: int = 0, hi: typing.Optional[int] = None):
+        if hi is None:
+            hi = self.length
+        data = self._columns.get(name)
+        if data is None:
+            return array("d", [NaN]) * (hi - lo)
+        return array("d", islice(decode_floats(data, self.length), lo, hi))
+
+
+def _downsample(first: _Chunk, second: _Chunk) -> _Chunk:
+    """Merge two (full) chunks into one with half the resolution.
+    Pairs of samples are averaged, except for sub-sampled minimum and
+    maximum aggregates which keep their extremes."""
+    merged = _Chunk(level=max(first.level, second.level) + 1)
+    names = list(dict.fromkeys(first.names + second.names))
+    fn_merges = dict()
+    for name in names:
+        _, agg = split_aggregate_name(name)
+        fn_merges[name] = {"min": min, "max": max}.get(
+            agg, lambda pair: sum(pair) / len(pair)
+        )
+
+    for chunk in (first, second):
+        timestamps = chunk.timestamps
+        ids = chunk.ids
+        columns = [(name, chunk.column(name)) for name in names]
+        for pos in range(0, len(chunk), 2):
+            values = dict()
+            for name, column in columns:
+                pair = [v for v in column[pos : pos + 2] if not math.isnan(v)]
+                if pair:
+                    values[name] = fn_merges[name](pair)
+            merged.append(timestamps[pos], ids[pos], values)
+    return merged
+
+
+class StatsHistory:
+    """Columnar time series store for collected statistics.
+
+    Samples are appended in time order into chunks of ``chunk_size``
+    rows with one ``array`` per metric column. This allows binary search
+    on the timestamp column and aggregations over single metric columns
+    without materializing rows of dicts.
+
+    If ``maxlen`` is given, the oldest full chunk is evicted as soon as
+    the remaining samples still number at least ``maxlen``, so up to
+    ``maxlen + chunk_size - 1`` samples are retained.
+
+    Per metric range indices over chunk summaries are updated on append
+    and eviction, so ``min``/``max``/``avg`` aggregates over arbitrary
+    windows only scan the (at most two) partially covered chunks at the
+    window edges and otherwise take ``O(log n)`` time.
+
+    With ``compress``, closed chunks are stored Gorilla compressed, which
+    shrinks regularly sampled, slowly changing metrics to a few bits per
+    sample. Chunk summaries stay uncompressed, so the range index works
+    without decoding.
+
+    With ``max_bytes``, the memory used (:attr:`nbytes`) is kept within
+    the budget. The oldest adjacent pair of closed chunks (in the older
+    half) with the same resolution is down-sampled into one chunk (up to
+    ``max_level`` times, i. e. ``2 ** max_level`` coarser), if none is
+    left, the oldest chunk is evicted."""
+
+    def __init__(
+        self,
+        maxlen: typing.Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        compress: bool = False,
+        max_bytes: typing.Optional[int] = None,
+        max_level: int = 3,
+    ):
+        if max_bytes is not None and chunk_size % 2:
+            raise ValueError("chunk_size must be even for down-sampling!")
+
+        self.maxlen = maxlen
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.max_bytes = max_bytes
+        self.max_level = max_level
+
+        self._chunks: typing.List[typing.Union[_Chunk, _CompressedChunk]] = list()
+        self._names: typing.Dict[str, None] = dict()
+        self._length = 0
+
+        #: absolute number of the oldest retained chunk
+        self._first_no = 0
+        self._indices: typing.Dict[str, _RangeIndex] = dict()
+        self._index_capacity = 16
+
+        #: size of closed chunks (immutable, so only updated on changes)
+        self._closed_nbytes = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> typing.Iterator[StatsType]:
+        return self.iter_rows()
+
+    def __getitem__(self, index: int) -> StatsType:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("history index out of range")
+        return next(self.iter_rows(index, index + 1))
+
+    @property
+    def names(self) -> typing.List[str]:
+        """Names of all metrics (without meta columns)."""
+        return list(self._names.keys())
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used for samples and indices."""
+        return (
+            self._closed_nbytes
+            + (self._chunks[-1].nbytes if self._chunks else 0)
+            + sum(index.nbytes for index in self._indices.values())
+        )
+
+    @property
+    def max_chunk_level(self) -> int:
+        """Highest down-sampling level (factor ``2 ** level``)."""
+        return max((chunk.level for chunk in self._chunks), default=0)
+
+    @property
+    def first_timestamp(self) -> typing.Optional[int]:
+        return self._chunks[0].first_timestamp if self._chunks else None
+
+    @property
+    def last_timestamp(self) -> typing.Optional[int]:
+        return self._chunks[-1].last_timestamp if self._chunks else None
+
+    def append(self, stats: StatsType) -> None:
+        """Append a sample from :func:`collect_stats`. The ``_id`` is
+        assigned consecutively, the ``_datetime`` timestamp is clamped
+        to be non-decreasing (clock adjustments)."""
+        values = {k: v for k, v in stats.items() if not k.startswith("_")}
+        timestamp = int(stats["_datetime"])
+
+        if self._chunks:
+            last_chunk = self._chunks[-1]
+            timestamp = max(timestamp, last_chunk.timestamps[-1])
+            id_ = last_chunk.ids[-1] + 1
+        else:
+            id_ = 0
+
+        if not self._chunks or len(self._chunks[-1]) >= self.chunk_size:
+            self._open_chunk()
+        chunk = self._chunks[-1]
+        chunk.append(timestamp, id_, values)
+        self._names.update(dict.fromkeys(values.keys()))
+        self._length += 1
+
+        chunk_no = self._first_no + len(self._chunks) - 1
+        for name in values.keys():
+            index = self._indices.get(name)
+            if index is None:
+                index = self._indices[name] = self._build_index(name)
+            else:
+                index.set(chunk_no, chunk.summary.get(name))
+
+        self._evict()
+        self._enforce_budget()
+
+    def _open_chunk(self) -> None:
+        if self._chunks:
+            if self.compress:
+                self._chunks[-1] = _CompressedChunk(self._chunks[-1])
+            self._closed_nbytes += self._chunks[-1].nbytes
+        self._chunks.append(_Chunk())
+        if len(self._chunks) + 1 > self._index_capacity:
+            # grow ring, rebuild all indices
+            while len(self._chunks) + 1 > self._index_capacity:
+                self._index_capacity *= 2
+            for name in self._indices:
+                self._indices[name] = self._build_index(name)
+        else:
+            # reset slot of new chunk (may contain an evicted chunk)
+            chunk_no = self._first_no + len(self._chunks) - 1
+            for index in self._indices.values():
+                index.set(chunk_no, None)
+
+    def _build_index(self, name: str) -> _RangeIndex:
+        index = _RangeIndex(self._index_capacity)
+        for chunk_no, chunk in enumerate(self._chunks, self._first_no):
+            index.set(chunk_no, chunk.summary.get(name))
+        return index
+
+    def _evict(self) -> None:
+        if self.maxlen is None:
+            return
+        while len(self._chunks) > 1 and self._length - self.chunk_size >= self.maxlen:
+            self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        chunk = self._chunks.pop(0)
+        self._closed_nbytes -= chunk.nbytes
+        self._length -= self.chunk_size
+        self._first_no += 1
+
+    def _enforce_budget(self) -> None:
+        if self.max_bytes is None:
+            return
+        while len(self._chunks) > 1 and self.nbytes > self.max_bytes:
+            # oldest pair of closed chunks with the same resolution,
+            # only from the older half, recent data keeps its resolution
+            closed = self._chunks[:-1]
+            for idx in range(min(len(closed) // 2, len(closed) - 1)):
+                if closed[idx].level == closed[idx + 1].level < self.max_level:
+                    break
+            else:
+                self._evict_oldest()
+                continue
+
+            merged = _downsample(closed[idx], closed[idx + 1])
+            if self.compress:
+                merged = _CompressedChunk(merged)
+            self._closed_nbytes += (
+                merged.nbytes - closed[idx].nbytes - closed[idx + 1].nbytes
+            )
+            self._chunks[idx : idx + 2] = [merged]
+            self._length -= self.chunk_size
+
+            # chunk numbers shifted, rebuild indices
+            for name in self._indices:
+                self._indices[name] = self._build_index(name)
+
+    def snapshot(self) -> "StatsHistory":
+        """Return a read-only copy for use in background threads.
+
+        Closed chunks are never modified and thus shared, only the open
+        chunk is copied. The copy has no range index, so ``min``/``max``/
+        ``avg`` aggregates fall back to scans."""
+        copy = StatsHistory(maxlen=None, chunk_size=self.chunk_size)
+        copy._chunks = list(self._chunks)  # pylint: disable=protected-access
+        if copy._chunks:  # pylint: disable=protected-access
+            open_chunk = _Chunk()
+            last_chunk = self._chunks[-1]
+            open_chunk.timestamps = array("q", last_chunk.timestamps)
+            open_chunk.ids = array("q", last_chunk.ids)
+            open_chunk.columns = {
+                n: array("d", c) for n, c in last_chunk.columns.items()
+            }
+            copy._chunks[-1] = open_chunk  # pylint: disable=protected-access
+        copy._names = dict(self._names)  # pylint: disable=protected-access
+        copy._length = self._length  # pylint: disable=protected-access
+        return copy
+
+    def clear(self) -> None:
+        self._chunks = list()
+        self._names = dict()
+        self._length = 0
+        self._first_no = 0
+        self._indices = dict()
+        self._closed_nbytes = 0
+
+    # -----------------------------------------------------
+
+    def _split(
+        self, lo: int, hi: typing.Optional[int]
+    ) -> typing.Iterator[typing.Tuple[_Chunk, int, int]]:
+        """Yield chunks with their local row range for global rows
+        ``[lo, hi)``."""
+        if hi is None or hi > self._length:
+            hi = self._length
+        lo = max(lo, 0)
+        while lo < hi:
+            chunk_idx, offset = divmod(lo, self.chunk_size)
+            chunk = self._chunks[chunk_idx]
+            end = min(len(chunk), offset + hi - lo)
+            yield chunk, offset, end
+            lo += end - offset
+
+    def bisect(self, timestamp: float, right: bool = False) -> int:
+        """Return the row index where ``timestamp`` would be inserted,
+        see :func:`bisect.bisect_left` / :func:`bisect.bisect_right`."""
+        lo, hi = 0, len(self._chunks)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            last = self._chunks[mid].last_timestamp
+            if last < timestamp or (right and last == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(self._chunks):
+            return self._length
+
+        fn_bisect = bisect_right if right else bisect_left
+        return lo * self.chunk_size + fn_bisect(self._chunks[lo].timestamps, timestamp)
+
+    def window(
+        self, start: typing.Optional[float] = None, end: typing.Optional[float] = None
+    ) -> typing.Tuple[int, int]:
+        """Row range ``[lo, hi)`` for samples within ``start <= t <= end``."""
+        lo = self.bisect(start) if start is not None else 0
+        hi = self.bisect(end, right=True) if end is not None else self._length
+        return lo, max(lo, hi)
+
+    def iter_timestamps(
+        self, lo: int = 0, hi: typing.Optional[int] = None
+    ) -> typing.Iterator[int]:
+        for chunk, start, end in self._split(lo, hi):
+            yield from chunk.timestamps[start:end]
+
+    def iter_ids(
+        self, lo: int = 0, hi: typing.Optional[int] = None
+    ) -> typing.Iterator[int]:
+        for chunk, start, end in self._split(lo, hi):
+            yield from chunk.ids[start:end]
+
+    def iter_column(
+        self, name: str, lo: int = 0, hi: typing.Optional[int] = None
+    ) -> typing.Iterator[float]:
+        """Yield values of a single metric, ``NaN`` if missing."""
+        for chunk, start, end in self._split(lo, hi):
+            yield from chunk.column(name, start, end)
+
+    def iter_rows(
+        self, lo: int = 0, hi: typing.Optional[int] = None
+    ) -> typing.Iterator[StatsType]:
+        """Yield samples as dicts (like :func:`collect_stats`),
+        missing metrics are omitted."""
+        for chunk, start, end in self._split(lo, hi):
+            ids = chunk.ids[start:end]
+            timestamps = chunk.timestamps[start:end]
+            columns = [(n, chunk.column(n, start, end)) for n in self._names]
+            for pos in range(end - start):
+                row = {"_id": ids[pos], "_datetime": timestamps[pos]}
+                for name, column in columns:
+                    if not math.isnan(column[pos]):
+                        row[name] = column[pos]
+                yield row
+
+    def rows(
+        self, lo: int = 0, hi: typing.Optional[int] = None
+    ) -> typing.Optional[typing.Tuple[typing.Tuple[str, typing.List]]]:
+        """Like :func:`stats2rows`, missing values are ``None``."""
+        if lo >= min(self._length, hi if hi is not None else self._length):
+            return None
+        series = [
+            ("_id", list(self.iter_ids(lo, hi))),
+            ("_datetime", list(self.iter_timestamps(lo, hi))),
+        ]
+        for name in self._names:
+            series.append(
+                (
+                    name,
+                    [
+                        None if math.isnan(v) else v
+                        for v in self.iter_column(name, lo, hi)
+                    ],
+                )
+            )
+        return tuple(series)
+
+    def matrix(
+        self, base_name: str, lo: int = 0, hi: typing.Optional[int] = None
+    ) -> typing.Tuple[typing.List[str], typing.List[array]]:
+        """Values of all devices of a metric, e. g. ``cpu_core_perc:*``,
+        as 2D array with one row per device (ordered by device number).
+
+        Returns
+        -------
+        typing.Tuple[typing.List[str], typing.List[array]]
+            device names and rows of values (``NaN`` if missing)
+        """
+        prefix = f"{base_name}:"
+        devices = [
+            name[len(prefix) :] for name in self._names if name.startswith(prefix)
+        ]
+        devices.sort(
+            key=lambda dev: (not dev.isdigit(), int(dev) if dev.isdigit() else 0, dev)
+        )
+        return (
+            devices,
+            [array("d", self.iter_column(prefix + dev, lo, hi)) for dev in devices],
+        )
+
+    def summary(
+        self, name: str, lo: int = 0, hi: typing.Optional[int] = None
+    ) -> typing.Optional[typing.Tuple[float, float, float, float]]:
+        """Return ``(min, max, sum, count)`` of a metric for rows
+        ``[lo, hi)``, ``None`` if no values.
+
+        Only the partially covered chunks at the edges are scanned,
+        fully covered chunks are aggregated using the range index."""
+        if hi is None or hi > self._length:
+            hi = self._length
+        lo = max(lo, 0)
+        if lo >= hi or name not in self._names:
+            return None
+        index = self._indices.get(name)
+        if index is None:
+            # no index (snapshot), scan everything
+            return _summarize(self.iter_column(name, lo, hi))
+
+        first_chunk = lo // self.chunk_size
+        last_chunk = (hi - 1) // self.chunk_size
+        # full chunks in between, extend to the edges if fully covered
+        full_lo = first_chunk + (1 if lo % self.chunk_size else 0)
+        full_hi = last_chunk - (
+            0 if hi == self._length or hi % self.chunk_size == 0 else 1
+        )
+
+        parts = list()
+        if full_lo <= full_hi:
+            parts.append(
+                index.query(self._first_no + full_lo, self._first_no + full_hi)
+            )
+            edges = (
+                (lo, full_lo * self.chunk_size),
+                ((full_hi + 1) * self.chunk_size, hi),
+            )
+        else:
+            edges = ((lo, hi),)
+        for edge_lo, edge_hi in edges:
+            if edge_lo < edge_hi:
+                parts.append(_summarize(self.iter_column(name, edge_lo, edge_hi)))
+
+        parts = [p for p in parts if p is not None and p[3]]
+        if not parts:
+            return None
+        return (
+            min(p[0] for p in parts),
+            max(p[1] for p in parts),
+            sum(p[2] for p in parts),
+            sum(p[3] for p in parts),
+        )
+
+    def buckets(
+        self, name: str, num: int, lo: int = 0, hi: typing.Optional[int] = None
+    ) -> typing.List[typing.Optional[float]]:
+        """Mean values of a metric in (at most) ``num`` equally sized
+        row buckets of ``[lo, hi)``, ``None`` for buckets without values.
+        Each bucket is aggregated with :meth:`summary`."""
+        if hi is None or hi > self._length:
+            hi = self._length
+        lo = max(lo, 0)
+        num = min(num, hi - lo)
+        if num <= 0:
+            return list()
+
+        means = list()
+        for bucket in range(num):
+            summary = self.summary(
+                name,
+                lo + (hi - lo) * bucket // num,
+                lo + (hi - lo) * (bucket + 1) // num,
+            )
+            means.append(summary[2] / summary[3] if summary is not None else None)
+        return means
+
+    def value_range(
+        self, lo: int = 0, hi: typing.Optional[int] = None, margin: float = 0.05
+    ) -> typing.Dict[str, typing.Tuple[float, float]]:
+        """Return y-axis ranges ``(min, max)`` with a relative ``margin``
+        for all metrics, sub-sampled aggregates are merged into the range
+        of their plain metric, see :func:`split_aggregate_name`."""
+        ranges = dict()
+        for name in self._names:
+            summary = self.summary(name, lo, hi)
+            if summary is None:
+                continue
+            base_name, _ = split_aggregate_name(name)
+            vmin, vmax = summary[0], summary[1]
+            if base_name in ranges:
+                vmin = min(vmin, ranges[base_name][0])
+                vmax = max(vmax, ranges[base_name][1])
+            ranges[base_name] = (vmin, vmax)
+
+        for name, (vmin, vmax) in ranges.items():
+            pad = (vmax - vmin) * margin or 1.0
+            ranges[name] = (vmin - pad, vmax + pad)
+        return ranges
+
+    def aggregate(
+        self,
+        name: str,
+        agg: str,
+        start: typing.Optional[float] = None,
+        end: typing.Optional[float] = None,
+    ) -> typing.Optional[float]:
+        """Aggregate a metric over the time range ``[start, end]``.
+
+        ``min``, ``max`` and ``avg`` use the range index, ``last`` scans
+        backwards to the most recent value, ``p95`` needs a full scan."""
+        lo, hi = self.window(start, end)
+
+        if agg in ("min", "max", "avg"):
+            summary = self.summary(name, lo, hi)
+            if summary is None:
+                return None
+            vmin, vmax, vsum, vcount = summary
+            return {"min": vmin, "max": vmax, "avg": vsum / vcount}[agg]
+
+        if agg == "last":
+            for chunk, chunk_lo, chunk_hi in reversed(list(self._split(lo, hi))):
+                for value in reversed(chunk.column(name, chunk_lo, chunk_hi)):
+                    if not math.isnan(value):
+                        return value
+            return None
+
+        return aggregate_values(self.iter_column(name, lo, hi), agg)
+
+
+# ---------------------------------------------------------------------------
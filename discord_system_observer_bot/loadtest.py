@@ -0,0 +1,680 @@
+import asyncio
+import gc
+import itertools
+import json
+import logging
+import time
+import typing
+import zlib
+from collections import Counter, defaultdict
+
+import aiohttp
+import discord
+import psutil
+from aiohttp import web
+from discord.ext import commands, tasks
+from discord.gateway import DiscordClientWebSocketResponse
+from discord.http import HTTPClient
+
+from discord_system_observer_bot.utils import dump_dict_kv, make_table
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: ids of the fake Discord objects
+FAKE_GUILD_ID = 1000
+FAKE_USER_ID = 2000
+FAKE_BOT_ID = 3000
+
+#: commands fired by default by the load generator
+DEFAULT_COMMANDS = (".info", ".collector plot", ".observer status")
+
+_USER_MESSAGE_IDS = itertools.count(10 ** 9)
+
+
+# ---------------------------------------------------------------------------
+
+
+def _make_user_data(user_id: int, name: str, bot: bool = False) -> dict:
+    return {
+        "id": user_id,
+        "username": name,
+        "discriminator": "0000",
+        "avatar": None,
+        "bot": bot,
+    }
+
+
+def _make_message_data(
+    message_id: int, channel_id: int, content: str, author: dict, **kwargs
+) -> dict:
+    return {
+        "id": message_id,
+        "channel_id": channel_id,
+        "type": 0,
+        "content": content,
+        "author": author,
+        "embeds": [],
+        "attachments": [],
+        "mentions": [],
+        "mention_roles": [],
+        "mention_everyone": False,
+        "pinned": False,
+        "tts": False,
+        "timestamp": "2020-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        **kwargs,
+    }
+
+
+class FakeHTTPClient(HTTPClient):
+    """Offline replacement for the Discord REST client. All requests are
+    recorded (by method and route) and answered with minimal payloads,
+    nothing is sent over the network. The gateway is the local
+    :class:`FakeGateway` (if any)."""
+
+    def __init__(self, latency: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        #: simulated round trip time (seconds)
+        self.latency = latency
+        self.requests: typing.Counter[str] = Counter()
+        self._message_ids = itertools.count(10 ** 6)
+        #: websocket URL of the :class:`FakeGateway`
+        self.gateway_url: typing.Optional[str] = None
+        self._session: typing.Optional[aiohttp.ClientSession] = None
+
+    async def request(self, route, *, files=None, form=None, **kwargs):
+        self.requests[f"{route.method} {route.path}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if route.path == "/gateway":
+            return {"url": self.gateway_url}
+        if route.path.endswith("/messages") and route.method == "POST":
+            payload = kwargs.get("json") or dict()
+            if form:
+                payload = next(
+                    (
+                        part.get("value")
+                        for part in form
+                        if part.get("name") == "payload_json"
+                    ),
+                    payload,
+                )
+                if isinstance(payload, str):
+                    payload = json.loads(payload)
+            return self._make_message(route.channel_id, payload)
+        if route.path.endswith("/messages/{message_id}") and route.method == "PATCH":
+            payload = kwargs.get("json") or dict()
+            return self._make_message(
+                route.channel_id, payload, message_id=route.kwargs.get("message_id")
+            )
+        return None
+
+    async def static_login(self, token, *, bot):
+        self.token = token
+        return _make_user_data(FAKE_BOT_ID, "bot", bot=True)
+
+    async def ws_connect(self, url, *, compress=0):
+        # like the real client, but without proxy and (shared) connector
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                ws_response_class=DiscordClientWebSocketResponse
+            )
+        return await self._session.ws_connect(
+            url, max_msg_size=0, timeout=30.0, autoclose=False, compress=compress
+        )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _make_message(self, channel_id, payload, message_id=None):
+        return _make_message_data(
+            message_id or next(self._message_ids),
+            channel_id,
+            payload.get("content") or "",
+            _make_user_data(FAKE_BOT_ID, "bot", bot=True),
+            embeds=[payload["embed"]] if payload.get("embed") else [],
+        )
+
+
+def attach_fake_http(bot: commands.Bot, latency: float = 0.0) -> FakeHTTPClient:
+    """Replace the REST client of the bot, e. g. to connect it to a
+    :class:`FakeGateway`."""
+    state = bot._connection  # pylint: disable=protected-access
+    fake_http = FakeHTTPClient(latency=latency, loop=bot.loop)
+    bot.http = state.http = fake_http
+    return fake_http
+
+
+def attach_fake_transport(
+    bot: commands.Bot, channel_id: int, latency: float = 0.0
+) -> FakeHTTPClient:
+    """Replace the REST client of the bot and create a fake guild with
+    the text channel ``channel_id``, the bot is marked as ready
+    (without connecting to the gateway)."""
+    state = bot._connection  # pylint: disable=protected-access
+    fake_http = attach_fake_http(bot, latency=latency)
+
+    guild = discord.Guild(
+        data={"id": FAKE_GUILD_ID, "name": "fake", "member_count": 1},
+        state=state,
+    )
+    channel = discord.TextChannel(
+        state=state,
+        guild=guild,
+        data={
+            "id": channel_id,
+            "name": "observer",
+            "type": 0,
+            "position": 0,
+            "guild_id": FAKE_GUILD_ID,
+        },
+    )
+    guild._add_channel(channel)  # pylint: disable=protected-access
+    state._add_guild(guild)  # pylint: disable=protected-access
+    state.user = discord.ClientUser(
+        state=state,
+        data=_make_user_data(FAKE_BOT_ID, "bot", bot=True),
+    )
+    bot._ready.set()  # pylint: disable=protected-access
+    return fake_http
+
+
+def make_fake_message(
+    bot: commands.Bot, channel_id: int, content: str
+) -> discord.Message:
+    """A message in the fake channel, as if sent by a user."""
+    state = bot._connection  # pylint: disable=protected-access
+    channel = bot.get_channel(channel_id)
+    return discord.Message(
+        state=state,
+        channel=channel,
+        data=_make_message_data(
+            next(_USER_MESSAGE_IDS),
+            channel_id,
+            content,
+            _make_user_data(FAKE_USER_ID, "user"),
+        ),
+    )
+
+
+def _make_member_data(user_id: int, name: str, bot: bool = False) -> dict:
+    return {
+        "user": _make_user_data(user_id, name, bot=bot),
+        "roles": [],
+        "nick": None,
+        "joined_at": "2020-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+    }
+
+
+class FakeGateway:
+    """Local Discord gateway, a websocket server the bot connects to like
+    to Discord (``Client.connect``): events are sent as zlib-stream
+    compressed JSON and parsed by the client's gateway code (heartbeats,
+    sequence numbers, ready handling, member chunk requests). Like Discord,
+    only events that the intents sent with IDENTIFY subscribe to are sent:
+    the guild (with ``num_members`` members if the ``members`` intent is
+    set) and users chatting (typing and messages) in the channel.
+
+    Unlike Discord there is no TLS, no rate limiting of the client and no
+    resuming, a closed connection stays closed."""
+
+    #: intent required for an event
+    EVENT_INTENTS = {
+        "GUILD_CREATE": "guilds",
+        "MESSAGE_CREATE": "guild_messages",
+        "TYPING_START": "guild_typing",
+    }
+
+    #: heartbeat interval sent with HELLO (milliseconds)
+    HEARTBEAT_INTERVAL = 41250
+
+    def __init__(self, bot: commands.Bot, channel_id: int, num_members: int = 1000):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.num_members = num_members
+        #: sent and (by intents) dropped events
+        self.events: typing.Counter[str] = Counter()
+        self.dropped: typing.Counter[str] = Counter()
+        #: intents of the connected client (IDENTIFY)
+        self.intents: typing.Optional[discord.Intents] = None
+        self.url: typing.Optional[str] = None
+        self._members = [
+            _make_member_data(FAKE_USER_ID + i, f"user{i}")
+            for i in range(1, num_members + 1)
+        ]
+        self._chatter = itertools.count()
+        self._sequence = itertools.count(1)
+        self._runner: typing.Optional[web.AppRunner] = None
+        self._socket: typing.Optional[web.WebSocketResponse] = None
+        self._zlib = None
+        self._client_task: typing.Optional[asyncio.Future] = None
+
+    async def _send(self, payload: dict) -> None:
+        # one zlib stream per connection, each message ends with a sync flush
+        data = json.dumps(payload).encode("utf-8")
+        await self._socket.send_bytes(
+            self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+        )
+
+    async def _handle_socket(self, request: web.Request) -> web.WebSocketResponse:
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        self._socket, self._zlib = socket, zlib.compressobj()
+
+        await self._send(
+            {"op": 10, "d": {"heartbeat_interval": self.HEARTBEAT_INTERVAL}}
+        )
+        async for message in socket:
+            if message.type == aiohttp.WSMsgType.TEXT:
+                await self._received(json.loads(message.data))
+
+        self._socket = None
+        return socket
+
+    async def _received(self, payload: dict) -> None:
+        op, data = payload.get("op"), payload.get("d")
+        if op == 1:  # heartbeat
+            await self._send({"op": 11})
+        elif op == 2:  # identify
+            # pylint: disable=protected-access
+            self.intents = discord.Intents._from_value(
+                data.get("intents", discord.Intents.default().value)
+            )
+            await self._send_ready()
+        elif op == 8:  # request guild members
+            await self.dispatch(
+                "GUILD_MEMBERS_CHUNK",
+                {
+                    "guild_id": FAKE_GUILD_ID,
+                    "members": self._members,
+                    "chunk_index": 0,
+                    "chunk_count": 1,
+                    "nonce": data.get("nonce"),
+                },
+            )
+
+    def _is_subscribed(self, event: str) -> bool:
+        intent = self.EVENT_INTENTS.get(event)
+        return intent is None or getattr(self.intents, intent)
+
+    async def dispatch(self, event: str, data: dict) -> bool:
+        """Send an event if subscribed, returns False if dropped."""
+        if self._socket is None:
+            raise RuntimeError("No client connected to the fake gateway!")
+        if not self._is_subscribed(event):
+            self.dropped[event] += 1
+            return False
+        await self._send({"op": 0, "t": event, "s": next(self._sequence), "d": data})
+        self.events[event] += 1
+        return True
+
+    async def _send_ready(self) -> None:
+        await self.dispatch(
+            "READY",
+            {
+                "v": 6,
+                "user": _make_user_data(FAKE_BOT_ID, "bot", bot=True),
+                "guilds": [{"id": FAKE_GUILD_ID, "unavailable": True}],
+                "session_id": "fake",
+                "private_channels": [],
+                "relationships": [],
+            },
+        )
+        members = [_make_member_data(FAKE_BOT_ID, "bot", bot=True)]
+        if self.intents.members:
+            members.extend(self._members)
+        await self.dispatch(
+            "GUILD_CREATE",
+            {
+                "id": FAKE_GUILD_ID,
+                "name": "fake",
+                "unavailable": False,
+                "member_count": self.num_members + 1,
+                "large": self.num_members >= 250,
+                "roles": [
+                    {
+                        "id": FAKE_GUILD_ID,
+                        "name": "@everyone",
+                        "permissions": "0",
+                        "position": 0,
+                        "color": 0,
+                        "hoist": False,
+                        "managed": False,
+                        "mentionable": False,
+                    }
+                ],
+                "channels": [
+                    {
+                        "id": self.channel_id,
+                        "name": "observer",
+                        "type": 0,
+                        "position": 0,
+                        "permission_overwrites": [],
+                    }
+                ],
+                "members": members,
+                "presences": [],
+                "voice_states": [],
+                "emojis": [],
+            },
+        )
+
+    async def connect(self) -> None:
+        """Start the server and connect the bot (its REST client must be a
+        :class:`FakeHTTPClient`), returns when the bot is ready."""
+        app = web.Application()
+        app.router.add_get("/", self._handle_socket)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", 0).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"ws://{host}:{port}/"
+        self.bot.http.gateway_url = self.url
+
+        await self.bot.login("fake")
+        self._client_task = asyncio.ensure_future(self.bot.connect(reconnect=False))
+        ready_task = asyncio.ensure_future(self.bot.wait_until_ready())
+        await asyncio.wait(
+            (self._client_task, ready_task), return_when=asyncio.FIRST_COMPLETED
+        )
+        if not ready_task.done():
+            ready_task.cancel()
+            # raises the connection error, if any
+            self._client_task.result()
+            raise RuntimeError("Bot disconnected from the fake gateway!")
+
+    async def close(self) -> None:
+        """Disconnect the bot and stop the server."""
+        if self._socket is not None:
+            # clean close (1000), the client does not try to reconnect
+            await self._socket.close(code=1000)
+        if self._client_task is not None:
+            await asyncio.wait((self._client_task,))
+            self._client_task.result()
+        await self.bot.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def chatter(self) -> None:
+        """A user types and sends a (non-command) message."""
+        num = next(self._chatter)
+        member = self._members[num % len(self._members)] if self._members else None
+        if member is None:
+            return
+        await self.dispatch(
+            "TYPING_START",
+            {
+                "channel_id": self.channel_id,
+                "guild_id": FAKE_GUILD_ID,
+                "user_id": member["user"]["id"],
+                "timestamp": int(time.time()),
+                "member": member,
+            },
+        )
+        await self.dispatch(
+            "MESSAGE_CREATE",
+            _make_message_data(
+                next(_USER_MESSAGE_IDS),
+                self.channel_id,
+                f"message {num}: " + "lorem ipsum dolor sit amet " * 8,
+                member["user"],
+                guild_id=FAKE_GUILD_ID,
+                member={k: v for k, v in member.items() if k != "user"},
+            ),
+        )
+
+
+def disable_cooldowns(bot: commands.Bot) -> None:
+    """Remove command cooldowns, so that load tests measure the commands
+    and not the cooldown error path."""
+    # pylint: disable=protected-access
+    for command in bot.walk_commands():
+        command._buckets = commands.CooldownMapping(None)
+
+
+# ---------------------------------------------------------------------------
+
+
+class StallMonitor:
+    """Measures the event loop lag: a task sleeps for ``interval`` and
+    records how much later than expected it wakes up. Lags above
+    ``threshold`` are stalls (blocking calls in coroutines)."""
+
+    def __init__(self, interval: float = 0.01, threshold: float = 0.05):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags: typing.List[float] = list()
+        self._task: typing.Optional[asyncio.Task] = None
+
+    @property
+    def stalls(self) -> typing.List[float]:
+        return [lag for lag in self.lags if lag >= self.threshold]
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+def percentiles(
+    values: typing.Sequence[float], quantiles: typing.Sequence[int] = (50, 90, 99)
+) -> typing.Dict[str, float]:
+    """Nearest-rank percentiles and the maximum, 0 if no values."""
+    values = sorted(values)
+    result = dict()
+    for quantile in quantiles:
+        pos = max(0, -(-len(values) * quantile // 100) - 1)
+        result[f"p{quantile}"] = values[pos] if values else 0.0
+    result["max"] = values[-1] if values else 0.0
+    return result
+
+
+def _iter_task_loops(bot: commands.Bot) -> typing.Iterator[tasks.Loop]:
+    for cog in bot.cogs.values():
+        for name in dir(type(cog)):
+            loop = getattr(cog, name, None)
+            if isinstance(loop, tasks.Loop):
+                yield loop
+
+
+async def run_load(
+    bot: commands.Bot,
+    channel_id: int,
+    command_lines: typing.Sequence[str] = DEFAULT_COMMANDS,
+    num_commands: int = 1000,
+    concurrency: int = 50,
+    loop_interval: typing.Optional[float] = 1.0,
+) -> typing.Dict[str, typing.Any]:
+    """Fire ``num_commands`` commands (round robin over ``command_lines``),
+    at most ``concurrency`` at once, while the background loops of all
+    cogs run every ``loop_interval`` seconds (``None`` to not start them).
+
+    Returns
+    -------
+    typing.Dict[str, typing.Any]
+        latencies (seconds) and number of failures per command, event
+        loop lags and the number of REST requests per route
+    """
+    latencies = defaultdict(list)
+    failures = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _fire(content):
+        async with semaphore:
+            message = make_fake_message(bot, channel_id, content)
+            start = time.perf_counter()
+            ctx = await bot.get_context(message)
+            await bot.invoke(ctx)
+            latencies[content].append(time.perf_counter() - start)
+            if ctx.command_failed or ctx.command is None:
+                failures[content] += 1
+
+    loops = list()
+    if loop_interval is not None:
+        for loop in _iter_task_loops(bot):
+            loop.change_interval(seconds=loop_interval)
+            loop.start()
+            loops.append(loop)
+
+    monitor = StallMonitor()
+    monitor.start()
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *[
+                _fire(content)
+                for content in itertools.islice(
+                    itertools.cycle(command_lines), num_commands
+                )
+            ]
+        )
+    finally:
+        duration = time.perf_counter() - start
+        monitor.stop()
+        for loop in loops:
+            loop.cancel()
+
+    return {
+        "duration": duration,
+        "latencies": dict(latencies),
+        "failures": dict(failures),
+        "lags": monitor.lags,
+        "stalls": monitor.stalls,
+        "requests": dict(getattr(bot.http, "requests", dict())),
+    }
+
+
+async def run_idle(
+    bot: commands.Bot,
+    gateway: FakeGateway,
+    duration: float = 30.0,
+    message_rate: float = 5.0,
+) -> typing.Dict[str, typing.Any]:
+    """Connect the bot to the fake gateway and let users chat in the
+    channel for ``duration`` seconds (``message_rate`` messages per
+    second, including the time to connect), while the bot idles, then
+    disconnect. Memory and CPU time are those of the whole process (incl.
+    the gateway), so compare runs in separate processes.
+
+    Returns
+    -------
+    typing.Dict[str, typing.Any]
+        RSS (MB) at the end and its growth, CPU time (seconds and percent
+        of the duration), sizes of the client caches and gateway events
+    """
+    process = psutil.Process()
+    gc.collect()
+    rss_before = process.memory_info().rss
+    cpu_before = process.cpu_times()
+    start = time.perf_counter()
+
+    await gateway.connect()
+    try:
+        while time.perf_counter() - start < duration:
+            await gateway.chatter()
+            await asyncio.sleep(1 / message_rate)
+
+        elapsed = time.perf_counter() - start
+        cpu_after = process.cpu_times()
+        cpu_seconds = (cpu_after.user - cpu_before.user) + (
+            cpu_after.system - cpu_before.system
+        )
+        gc.collect()
+        rss_after = process.memory_info().rss
+
+        # pylint: disable=protected-access
+        state = bot._connection
+        cache_sizes = {
+            "cached_messages": len(state._messages or ()),
+            "cached_members": sum(len(guild.members) for guild in bot.guilds),
+            "cached_users": len(state._users),
+        }
+    finally:
+        await gateway.close()
+
+    return {
+        "duration": elapsed,
+        "rss_mb": rss_after / 1024 ** 2,
+        "rss_growth_mb": (rss_after - rss_before) / 1024 ** 2,
+        "cpu_seconds": cpu_seconds,
+        "cpu_perc": cpu_seconds / max(elapsed, 1e-9) * 100,
+        **cache_sizes,
+        "events": sum(gateway.events.values()),
+        "dropped_events": sum(gateway.dropped.values()),
+    }
+
+
+def format_idle_reports(reports: typing.Dict[str, typing.Dict[str, typing.Any]]) -> str:
+    """Table of :func:`run_idle` results, a column per mode."""
+    names = list(next(iter(reports.values())).keys())
+    rows = [
+        (name,)
+        + tuple(
+            f"{report[name]:.2f}" if isinstance(report[name], float) else report[name]
+            for report in reports.values()
+        )
+        for name in names
+    ]
+    return make_table(
+        rows,
+        ("",) + tuple(reports.keys()),
+        alignments=("<",) + (">",) * len(reports),
+        wrap_markdown=False,
+        header_separator=True,
+        column_separators=False,
+    )
+
+
+def format_report(report: typing.Dict[str, typing.Any]) -> str:
+    """Text summary of :func:`run_load` results (times in ms)."""
+    num_commands = sum(len(values) for values in report["latencies"].values())
+    rows = list()
+    for content, values in report["latencies"].items():
+        stats = percentiles(values)
+        rows.append(
+            (content, len(values), report["failures"].get(content, 0))
+            + tuple(round(v * 1000, 1) for v in stats.values())
+        )
+    lags = percentiles(report["lags"])
+
+    return "\n".join(
+        [
+            f"{num_commands} commands in {report['duration']:.1f}s "
+            f"({num_commands / max(report['duration'], 1e-9):.1f}/s)",
+            "",
+            make_table(
+                rows,
+                ("command", "count", "failed", "p50", "p90", "p99", "max"),
+                alignments=("<", ">", ">", ">", ">", ">", ">"),
+                wrap_markdown=False,
+                header_separator=True,
+                column_separators=False,
+            ),
+            "",
+            "event loop lag: "
+            + ", ".join(f"{k}: {v * 1000:.1f}ms" for k, v in lags.items())
+            + f", stalls: {len(report['stalls'])}",
+            "",
+            dump_dict_kv(report["requests"], wrap_markdown=False) or "no requests",
+        ]
+    )
+
+
+# ---------------------------------------------------------------------------
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+import types
+import typing
+from collections import deque
+
+import discord
+import psutil
+from discord.http import HTTPClient
+from discord.state import ConnectionState
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: objects that are not traversed (not owned by the measured structure)
+_OPAQUE_TYPES = (
+    type,
+    types.ModuleType,
+    asyncio.AbstractEventLoop,
+    threading.Thread,
+    # e. g. ``Message._state``, the whole client cache is reachable from it
+    ConnectionState,
+    HTTPClient,
+    discord.Client,
+)
+
+#: (location, size diff KiB, size KiB, count diff)
+TraceRowType = typing.Tuple[str, float, float, int]
+
+
+# ---------------------------------------------------------------------------
+
+
+def get_process_memory() -> typing.Dict[str, float]:
+    """Resident (RSS) and unique (USS) memory of this process in MB.
+    USS (memory freed if the process exited) needs ``/proc/<pid>/smaps``,
+    it is missing if not available."""
+    proc = psutil.Process(os.getpid())
+    try:
+        meminfo = proc.memory_full_info()
+    except (psutil.AccessDenied, psutil.Error):
+        meminfo = proc.memory_info()
+    result = {"rss_mb": meminfo.rss / 1024 ** 2}
+    if hasattr(meminfo, "uss"):
+        result["uss_mb"] = meminfo.uss / 1024 ** 2
+    return {k: round(v, 1) for k, v in result.items()}
+
+
+def deep_sizeof(obj: typing.Any, max_objects: int = 1000000) -> int:
+    """Approximate size in bytes of an object and everything reachable
+    from it (containers, instance attributes and slots). Shared objects
+    are counted once, functions, classes, modules, event loops, threads
+    and the Discord client (state, HTTP) are not followed.
+
+    Can be run in a thread, containers that are changed meanwhile are
+    skipped (not counted with their items)."""
+    seen = set()
+    todo = [obj]
+    size = 0
+    while todo and len(seen) < max_objects:
+        cur = todo.pop()
+        if id(cur) in seen:
+            continue
+        seen.add(id(cur))
+        if isinstance(cur, _OPAQUE_TYPES) or callable(cur):
+            continue
+        size += sys.getsizeof(cur)
+
+        if isinstance(cur, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        try:
+            if isinstance(cur, dict):
+                todo.extend([*cur.keys(), *cur.values()])
+            elif isinstance(cur, (list, tuple, set, frozenset, deque)):
+                todo.extend(list(cur))
+        except RuntimeError:
+            # changed during iteration
+            pass
+        if hasattr(cur, "__dict__"):
+            todo.append(vars(cur))
+        for klass in type(cur).__mro__:
+            for slot in getattr(klass, "__slots__", ()):
+                if isinstance(slot, str) and hasattr(cur, slot):
+                    todo.append(getattr(cur, slot))
+    return size
+
+
+# ---------------------------------------------------------------------------
+
+
+class MemoryTracer:
+    """Wrapper for ``tracemalloc`` that compares the current allocations
+    with a baseline snapshot, to locate growing allocation sites."""
+
+    def __init__(self, nframes: int = 1):
+        self.nframes = nframes
+        self.baseline: typing.Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def is_tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+
+    def start(self) -> None:
+        """Start tracing (if not yet) and take the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            LOGGER.debug("Start tracing memory allocations ...")
+            tracemalloc.start(self.nframes)
+        self.baseline = self._snapshot()
+
+    def stop(self) -> None:
+        self.baseline = None
+        tracemalloc.stop()
+
+    def traced_memory(self) -> typing.Dict[str, float]:
+        current, peak = tracemalloc.get_traced_memory()
+        overhead = tracemalloc.get_tracemalloc_memory()
+        return {
+            "traced_mb": round(current / 1024 ** 2, 1),
+            "traced_peak_mb": round(peak / 1024 ** 2, 1),
+            "tracemalloc_mb": round(overhead / 1024 ** 2, 1),
+        }
+
+    def diff(self, top: int = 10) -> typing.List[TraceRowType]:
+        """Allocation sites (by line) with the highest growth since
+        the baseline."""
+        if not self.is_tracing or self.baseline is None:
+            return list()
+        stats = self._snapshot().compare_to(self.baseline, "lineno")
+        rows = list()
+        for stat in stats[:top]:
+            frame = stat.traceback[0]
+            rows.append(
+                (
+                    f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                    round(stat.size_diff / 1024, 1),
+                    round(stat.size / 1024, 1),
+                    stat.count_diff,
+                )
+            )
+        return rows
+
+
+# ---------------------------------------------------------------------------
@@ -0,0 +1,368 @@
+import datetime
+import math
+import struct
+import typing
+import zlib
+
+
+#: palette (RGB) of the indexed-color images
+PALETTE = (
+    (255, 255, 255),  # background
+    (0, 0, 0),  # text
+    (225, 225, 225),  # grid
+    (110, 110, 110),  # axes
+    (31, 119, 180),  # series
+    (174, 199, 232),  # min/max band
+    (255, 127, 14),  # mean
+)
+COLOR_BACKGROUND, COLOR_TEXT, COLOR_GRID, COLOR_AXES = 0, 1, 2, 3
+COLOR_SERIES, COLOR_BAND, COLOR_MEAN = 4, 5, 6
+
+#: 3x5 pixel glyphs (rows top to bottom), upper and lower case look the same
+GLYPHS = {
+    " ": "... ... ... ... ...",
+    "0": "### #.# #.# #.# ###",
+    "1": ".#. ##. .#. .#. ###",
+    "2": "### ..# ### #.. ###",
+    "3": "### ..# .## ..# ###",
+    "4": "#.# #.# ### ..# ..#",
+    "5": "### #.. ### ..# ###",
+    "6": "### #.. ### #.# ###",
+    "7": "### ..# .#. .#. .#.",
+    "8": "### #.# ### #.# ###",
+    "9": "### #.# ### ..# ###",
+    "a": ".#. #.# ### #.# #.#",
+    "b": "##. #.# ##. #.# ##.",
+    "c": ".## #.. #.. #.. .##",
+    "d": "##. #.# #.# #.# ##.",
+    "e": "### #.. ##. #.. ###",
+    "f": "### #.. ##. #.. #..",
+    "g": ".## #.. #.# #.# .##",
+    "h": "#.# #.# ### #.# #.#",
+    "i": "### .#. .#. .#. ###",
+    "j": "..# ..# ..# #.# .#.",
+    "k": "#.# #.# ##. #.# #.#",
+    "l": "#.. #.. #.. #.. ###",
+    "m": "#.# ### ### #.# #.#",
+    "n": "##. #.# #.# #.# #.#",
+    "o": ".#. #.# #.# #.# .#.",
+    "p": "##. #.# ##. #.. #..",
+    "q": ".#. #.# #.# ##. .##",
+    "r": "##. #.# ##. #.# #.#",
+    "s": ".## #.. .#. ..# ##.",
+    "t": "### .#. .#. .#. .#.",
+    "u": "#.# #.# #.# #.# ###",
+    "v": "#.# #.# #.# #.# .#.",
+    "w": "#.# #.# ### ### #.#",
+    "x": "#.# #.# .#. #.# #.#",
+    "y": "#.# #.# .#. .#. .#.",
+    "z": "### ..# .#. #.. ###",
+    "_": "... ... ... ... ###",
+    ":": "... .#. ... .#. ...",
+    ".": "... ... ... ... .#.",
+    ",": "... ... ... .#. #..",
+    "-": "... ... ### ... ...",
+    "+": "... .#. ### .#. ...",
+    "%": "#.# ..# .#. #.. #.#",
+    "/": "..# ..# .#. #.. #..",
+    "@": ".#. #.# ### #.. .##",
+    "(": ".#. #.. #.. #.. .#.",
+    ")": ".#. ..# ..# ..# .#.",
+    "?": "### ..# .#. ... .#.",
+}
+GLYPH_WIDTH, GLYPH_HEIGHT = 3, 5
+
+
+class ChartPanel(typing.NamedTuple):
+    title: str
+    values: typing.Sequence[float]
+    #: y-axis range, default: range of the values
+    ylim: typing.Optional[typing.Tuple[float, float]] = None
+    #: optional (min values, max values) drawn as band behind the values
+    band: typing.Optional[
+        typing.Tuple[typing.Sequence[float], typing.Sequence[float]]
+    ] = None
+    #: optional second (dashed in matplotlib) series, e. g. sub-sampled mean
+    mean: typing.Optional[typing.Sequence[float]] = None
+
+
+# ---------------------------------------------------------------------------
+
+
+def encode_png(
+    width: int,
+    height: int,
+    pixels: typing.Union[bytes, bytearray],
+    palette: typing.Sequence[typing.Tuple[int, int, int]] = PALETTE,
+) -> bytes:
+    """Encode an 8 bit indexed-color image (one palette index per byte,
+    row by row) as PNG."""
+
+    def _chunk(tag: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + tag
+            + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+        )
+
+    view = memoryview(pixels)
+    # filter type 0 (none) for every row, the palette indices compress well
+    raw = b"".join(b"\x00" + view[y * width : (y + 1) * width] for y in range(height))
+    return b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)),
+            _chunk(b"PLTE", bytes(c for rgb in palette for c in rgb)),
+            _chunk(b"IDAT", zlib.compress(raw, 6)),
+            _chunk(b"IEND", b""),
+        ]
+    )
+
+
+class Canvas:
+    """Indexed-color raster image in a single ``bytearray``. Spans are
+    drawn with slice assignments (whole rows or, with a stride of the
+    image width, whole columns) instead of pixel by pixel."""
+
+    def __init__(self, width: int, height: int, background: int = COLOR_BACKGROUND):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray([background]) * (width * height)
+
+    def hline(self, x0: int, x1: int, y: int, color: int) -> None:
+        x0, x1 = max(0, min(x0, x1)), min(self.width - 1, max(x0, x1))
+        if 0 <= y < self.height and x0 <= x1:
+            offset = y * self.width
+            self.pixels[offset + x0 : offset + x1 + 1] = bytes([color]) * (x1 - x0 + 1)
+
+    def vline(self, x: int, y0: int, y1: int, color: int) -> None:
+        y0, y1 = max(0, min(y0, y1)), min(self.height - 1, max(y0, y1))
+        if 0 <= x < self.width and y0 <= y1:
+            start, end = y0 * self.width + x, y1 * self.width + x + 1
+            self.pixels[start : end : self.width] = bytes([color]) * (y1 - y0 + 1)
+
+    def rect(self, x0: int, y0: int, x1: int, y1: int, color: int) -> None:
+        self.hline(x0, x1, y0, color)
+        self.hline(x0, x1, y1, color)
+        self.vline(x0, y0, y1, color)
+        self.vline(x1, y0, y1, color)
+
+    def fill(self, x0: int, y0: int, x1: int, y1: int, color: int) -> None:
+        for y in range(max(0, y0), min(self.height, y1 + 1)):
+            self.hline(x0, x1, y, color)
+
+    def text(
+        self, x: int, y: int, text: str, color: int = COLOR_TEXT, scale: int = 1
+    ) -> None:
+        """Draw text with its top left corner at ``(x, y)``."""
+        for char in text.lower():
+            glyph = GLYPHS.get(char, GLYPHS["?"])
+            for row, bits in enumerate(glyph.split()):
+                for col, bit in enumerate(bits):
+                    if bit == "#":
+                        self.fill(
+                            x + col * scale,
+                            y + row * scale,
+                            x + (col + 1) * scale - 1,
+                            y + (row + 1) * scale - 1,
+                            color,
+                        )
+            x += (GLYPH_WIDTH + 1) * scale
+
+    @staticmethod
+    def text_width(text: str, scale: int = 1) -> int:
+        return max(0, len(text) * (GLYPH_WIDTH + 1) * scale - scale)
+
+    def to_png(self) -> bytes:
+        return encode_png(self.width, self.height, self.pixels)
+
+
+# ---------------------------------------------------------------------------
+
+
+def _fmt_value(value: float) -> str:
+    for factor, suffix in ((1e9, "g"), (1e6, "m"), (1e3, "k")):
+        if abs(value) >= factor:
+            return f"{value / factor:.3g}{suffix}"
+    return f"{value:.3g}"
+
+
+def _column_spans(
+    columns: typing.Sequence[int],
+    values: typing.Sequence[float],
+    fn_y: typing.Callable[[float], int],
+) -> typing.Dict[int, typing.Tuple[int, int, int, int, bool]]:
+    """Per pixel column: (min y, max y, first y, last y, connected) of
+    all values mapped to it, in a single pass over the values.
+    ``connected`` is False if a value before the first was missing."""
+    spans = dict()
+    connected = True
+    for column, value in zip(columns, values):
+        if value is None or math.isnan(value):
+            connected = False
+            continue
+        y = fn_y(value)
+        span = spans.get(column)
+        if span is None:
+            spans[column] = (y, y, y, y, connected)
+        else:
+            spans[column] = (min(span[0], y), max(span[1], y), span[2], y, span[4])
+        connected = True
+    return spans
+
+
+def _draw_series(
+    canvas: Canvas,
+    columns: typing.Sequence[int],
+    values: typing.Sequence[float],
+    fn_y: typing.Callable[[float], int],
+    color: int,
+) -> None:
+    # each column is a vertical span, extended to connect to the last
+    # value of the previous column (gaps of missing values stay open)
+    prev_column, prev_y = None, None
+    for column, (y_min, y_max, y_first, y_last, connected) in sorted(
+        _column_spans(columns, values, fn_y).items()
+    ):
+        if not connected:
+            prev_column, prev_y = None, None
+        if prev_column is not None and column - prev_column > 1:
+            # interpolate over skipped columns (sparse samples)
+            steps = column - prev_column
+            for step in range(1, steps):
+                y_from = prev_y + (y_first - prev_y) * (step - 1) // steps
+                y_to = prev_y + (y_first - prev_y) * step // steps
+                canvas.vline(prev_column + step, y_from, y_to, color)
+            prev_y = y_to
+        if prev_y is not None and prev_column is not None:
+            y_min, y_max = min(y_min, prev_y), max(y_max, prev_y)
+        canvas.vline(column, y_min, y_max, color)
+        prev_column, prev_y = column, y_last
+
+
+def _draw_band(
+    canvas: Canvas,
+    columns: typing.Sequence[int],
+    lows: typing.Sequence[float],
+    highs: typing.Sequence[float],
+    fn_y: typing.Callable[[float], int],
+    color: int,
+) -> None:
+    spans_low = _column_spans(columns, lows, fn_y)
+    spans_high = _column_spans(columns, highs, fn_y)
+    for column in spans_low.keys() & spans_high.keys():
+        # y grows downwards, low values have the higher y
+        canvas.vline(column, spans_high[column][0], spans_low[column][1], color)
+
+
+def render_line_charts(
+    timestamps: typing.Sequence[float],
+    panels: typing.Sequence[ChartPanel],
+    ncols: int = 2,
+    panel_width: int = 400,
+    panel_height: int = 160,
+    scale: int = 2,
+) -> typing.Optional[bytes]:
+    """Render a grid of line charts with a shared (time) x-axis as PNG.
+
+    Parameters
+    ----------
+    timestamps : typing.Sequence[float]
+        UTC timestamps of the values, if empty, values are equidistant
+    panels : typing.Sequence[ChartPanel]
+        a chart for each, in rows of ``ncols``
+    scale : int, optional
+        size of a font pixel, by default 2
+
+    Returns
+    -------
+    typing.Optional[bytes]
+        PNG image, or None if no panels
+    """
+    if not panels:
+        return None
+
+    nrows = (len(panels) + ncols - 1) // ncols
+    canvas = Canvas(panel_width * min(ncols, len(panels)), panel_height * nrows)
+
+    line_height = (GLYPH_HEIGHT + 2) * scale
+    margin_left = Canvas.text_width("-0.00k", scale) + 2 * scale
+    margin_right = 3 * scale
+    margin_top = line_height + scale
+    margin_bottom = line_height + scale
+
+    num_values = max(len(panel.values) for panel in panels)
+    if timestamps:
+        x_start, x_end = timestamps[0], timestamps[-1]
+        positions = timestamps
+    else:
+        x_start, x_end = 0, max(1, num_values - 1)
+        positions = range(num_values)
+    x_span = (x_end - x_start) or 1
+    plot_width = panel_width - margin_left - margin_right
+    # column (within plot area) per sample, shared by all panels
+    columns = [
+        round((position - x_start) / x_span * (plot_width - 1))
+        for position in positions
+    ]
+
+    x_labels = ("", "")
+    if timestamps:
+        x_labels = tuple(
+            datetime.datetime.utcfromtimestamp(ts).strftime("%m-%d %H:%M")
+            for ts in (x_start, x_end)
+        )
+
+    for num, panel in enumerate(panels):
+        left = (num % ncols) * panel_width + margin_left
+        top = (num // ncols) * panel_height + margin_top
+        right = left + plot_width - 1
+        bottom = (num // ncols + 1) * panel_height - margin_bottom - 1
+        plot_height = bottom - top + 1
+
+        values = [v for v in panel.values if v is not None and not math.isnan(v)]
+        if panel.ylim is not None:
+            y_low, y_high = panel.ylim
+        elif values:
+            y_low, y_high = min(values), max(values)
+        else:
+            y_low, y_high = 0.0, 1.0
+        if y_high <= y_low:
+            y_low, y_high = y_low - 1, y_high + 1
+
+        def _fn_y(value, top=top, y_low=y_low, y_high=y_high, height=plot_height):
+            pos = (value - y_low) / (y_high - y_low)
+            return top + height - 1 - round(min(max(pos, 0.0), 1.0) * (height - 1))
+
+        # grid, axes and labels
+        for frac in (0.25, 0.5, 0.75):
+            canvas.hline(left, right, top + round(plot_height * frac), COLOR_GRID)
+        canvas.rect(left - 1, top - 1, right + 1, bottom + 1, COLOR_AXES)
+        canvas.text(left, top - line_height, panel.title, scale=scale)
+        for value, y in ((y_high, top), (y_low, bottom - GLYPH_HEIGHT * scale + 1)):
+            label = _fmt_value(value)
+            x = left - 2 * scale - Canvas.text_width(label, scale)
+            canvas.text(x, y, label, scale=scale)
+        canvas.text(left, bottom + 2 * scale + 1, x_labels[0], scale=scale)
+        canvas.text(
+            right - Canvas.text_width(x_labels[1], scale),
+            bottom + 2 * scale + 1,
+            x_labels[1],
+            scale=scale,
+        )
+
+        # data, columns are relative to the plot area
+        panel_columns = [left + column for column in columns]
+        if panel.band is not None:
+            _draw_band(
+                canvas, panel_columns, panel.band[0], panel.band[1], _fn_y, COLOR_BAND
+            )
+        if panel.mean is not None:
+            _draw_series(canvas, panel_columns, panel.mean, _fn_y, COLOR_MEAN)
+        _draw_series(canvas, panel_columns, panel.values, _fn_y, COLOR_SERIES)
+
+    return canvas.to_png()
+
+
+# ---------------------------------------------------------------------------
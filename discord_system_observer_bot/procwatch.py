@@ -0,0 +1,236 @@
+import logging
+import os
+import threading
+import time
+import typing
+from fnmatch import fnmatch
+
+import psutil
+
+from discord_system_observer_bot.gpuinfo import get_gpu_process_memory
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: metrics per watch, summed over all matching processes
+WATCH_METRICS = (
+    "proc_count",
+    "proc_rss_mb",
+    "proc_cpu_perc",
+    "proc_threads",
+    "proc_fds",
+    "proc_gpu_mem_mb",
+)
+
+WatchStatsType = typing.Dict[str, float]
+
+
+# ---------------------------------------------------------------------------
+
+
+def make_watch_key(target: str) -> str:
+    """Device part of stats names, colons separate metric and device."""
+    return target.replace(":", "_")
+
+
+class ProcessWatch:
+    """Processes to watch, either a single pid or all processes whose
+    name or command line matches a (glob) pattern. A pattern without
+    wildcards matches as substring of the command line.
+
+    Matched ``psutil.Process`` handles are kept (they also store the
+    previous CPU times for ``cpu_percent``), the process table is only
+    scanned again if a matched process disappeared or nothing matched."""
+
+    def __init__(self, target: str, max_rss_gb: typing.Optional[float] = None):
+        self.target = target
+        self.max_rss_gb = max_rss_gb
+        self.pid = int(target) if target.isdigit() else None
+        if self.pid is None and not any(c in target for c in "*?["):
+            self._pattern = f"*{target}*"
+        else:
+            self._pattern = target
+
+        self._handles: typing.Dict[int, psutil.Process] = dict()
+        self._need_scan = True
+        self.num_scans = 0
+        #: whether any process has ever been seen
+        self.seen = False
+
+    @property
+    def key(self) -> str:
+        return make_watch_key(self.target)
+
+    @property
+    def pids(self) -> typing.List[int]:
+        return list(self._handles.keys())
+
+    def matches(self, proc: psutil.Process) -> bool:
+        info = getattr(proc, "info", None) or dict()
+        name = info.get("name") or ""
+        cmdline = " ".join(info.get("cmdline") or ())
+        return fnmatch(name, self._pattern) or fnmatch(cmdline, self._pattern)
+
+    def _scan(
+        self, processes: typing.Optional[typing.Iterable[psutil.Process]]
+    ) -> None:
+        self._need_scan = False
+        self.num_scans += 1
+
+        if self.pid is not None:
+            try:
+                self._handles[self.pid] = psutil.Process(self.pid)
+            except psutil.NoSuchProcess:
+                pass
+            return
+
+        own_pid = os.getpid()
+        for proc in processes or ():
+            if proc.pid != own_pid and proc.pid not in self._handles:
+                if self.matches(proc):
+                    self._handles[proc.pid] = proc
+
+    @property
+    def need_scan(self) -> bool:
+        # a single pid can not come back
+        return self._need_scan and (self.pid is None or not self.seen)
+
+    @property
+    def need_process_table(self) -> bool:
+        return self.need_scan and self.pid is None
+
+    def update(
+        self,
+        processes: typing.Optional[typing.Iterable[psutil.Process]],
+        gpu_memory: typing.Dict[int, float],
+    ) -> WatchStatsType:
+        """Sum up metrics of all alive matched processes.
+
+        Parameters
+        ----------
+        processes : typing.Optional[typing.Iterable[psutil.Process]]
+            process table (with prefetched ``name`` and ``cmdline``
+            infos), only required if :attr:`need_process_table`
+        gpu_memory : typing.Dict[int, float]
+            used GPU memory (MB) per pid
+        """
+        if self.need_scan:
+            self._scan(processes)
+
+        stats = dict.fromkeys(WATCH_METRICS, 0.0)
+        for pid, proc in list(self._handles.items()):
+            try:
+                with proc.oneshot():
+                    stats["proc_rss_mb"] += proc.memory_info().rss / 1024 ** 2
+                    stats["proc_cpu_perc"] += proc.cpu_percent(interval=None)
+                    stats["proc_threads"] += proc.num_threads()
+                    if hasattr(proc, "num_fds"):
+                        stats["proc_fds"] += proc.num_fds()
+            except psutil.NoSuchProcess:
+                LOGGER.debug(f"Watched process {pid} ({self.target}) is gone.")
+                del self._handles[pid]
+                self._need_scan = True
+                continue
+            except psutil.AccessDenied:
+                pass
+            stats["proc_count"] += 1
+            stats["proc_gpu_mem_mb"] += gpu_memory.get(pid, 0.0)
+
+        if not self._handles:
+            self._need_scan = True
+        else:
+            self.seen = True
+        return stats
+
+
+class ProcessWatcher:
+    """Collection of :class:`ProcessWatch` with a single shared (cached)
+    update for all consumers (stats collector, limit checks, commands).
+
+    :meth:`update` is blocking (process table, ``nvidia-smi``), run it in
+    an executor. Readers (:meth:`get`, :meth:`collect_stats`) only return
+    the stats of the last update, adding or removing watches never waits
+    for a running update. GPU memory is refreshed at most every
+    ``gpu_max_age`` seconds."""
+
+    def __init__(self, max_age: float = 1.0, gpu_max_age: float = 30.0):
+        self.max_age = max_age
+        self.gpu_max_age = gpu_max_age
+        self.watches: typing.Dict[str, ProcessWatch] = dict()
+        self._stats: typing.Dict[str, WatchStatsType] = dict()
+        self._timestamp: typing.Optional[float] = None
+        self._gpu_memory: typing.Dict[int, float] = dict()
+        self._gpu_timestamp: typing.Optional[float] = None
+        #: guards the watches and stats (short)
+        self._lock = threading.Lock()
+        #: serializes updates (slow)
+        self._update_lock = threading.Lock()
+
+    def add(
+        self, target: str, max_rss_gb: typing.Optional[float] = None
+    ) -> ProcessWatch:
+        with self._lock:
+            watch = ProcessWatch(target, max_rss_gb=max_rss_gb)
+            self.watches[watch.key] = watch
+            self._timestamp = None
+            return watch
+
+    def remove(self, target: str) -> typing.Optional[ProcessWatch]:
+        with self._lock:
+            self._stats.pop(make_watch_key(target), None)
+            return self.watches.pop(make_watch_key(target), None)
+
+    def _get_gpu_memory(self, now: float) -> typing.Dict[int, float]:
+        if self._gpu_timestamp is None or now - self._gpu_timestamp >= self.gpu_max_age:
+            self._gpu_memory = get_gpu_process_memory()
+            self._gpu_timestamp = now
+        return self._gpu_memory
+
+    def update(self) -> typing.Dict[str, WatchStatsType]:
+        """Refresh and return metrics per watch (by key), at most every
+        ``max_age`` seconds (blocking)."""
+        with self._update_lock:
+            now = time.monotonic()
+            if self._timestamp is not None and now - self._timestamp < self.max_age:
+                return self._stats
+
+            with self._lock:
+                watches = dict(self.watches)
+
+            stats = dict()
+            if watches:
+                processes = None
+                if any(watch.need_process_table for watch in watches.values()):
+                    processes = list(psutil.process_iter(["name", "cmdline"]))
+
+                gpu_memory = self._get_gpu_memory(now)
+
+                stats = {
+                    key: watch.update(processes, gpu_memory)
+                    for key, watch in watches.items()
+                }
+
+            with self._lock:
+                # watches may have been removed in the meantime
+                self._stats = {
+                    key: value for key, value in stats.items() if key in self.watches
+                }
+                self._timestamp = now
+            return self._stats
+
+    def get(self, target: str, metric: str) -> typing.Optional[float]:
+        """Metric of the last :meth:`update`, None if not updated yet."""
+        return self._stats.get(make_watch_key(target), dict()).get(metric)
+
+    def collect_stats(self) -> typing.Dict[str, float]:
+        """Flat stats like :func:`collect_stats`, e. g. ``proc_rss_mb:<key>``,
+        of the last :meth:`update`."""
+        return {
+            f"{metric}:{key}": round(value, 1)
+            for key, stats in self._stats.items()
+            for metric, value in stats.items()
+        }
+
+
+# ---------------------------------------------------------------------------
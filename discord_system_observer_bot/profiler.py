@@ -0,0 +1,85 @@
+import asyncio
+import cProfile
+import io
+import logging
+import marshal
+import os
+import pstats
+import typing
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: upper bound for a profiling window (seconds)
+MAX_PROFILE_SECONDS = 300.0
+
+#: (function, calls, total time, cumulative time)
+ProfileRowType = typing.Tuple[str, str, float, float]
+
+
+# ---------------------------------------------------------------------------
+
+
+async def profile_loop(seconds: float) -> cProfile.Profile:
+    """Profile everything that runs on the event loop (task loops,
+    commands, callbacks) for the given window.
+
+    ``cProfile`` only hooks the thread it is enabled in, so enabling it
+    from a coroutine covers exactly the event loop thread. Each resumed
+    coroutine step counts as a call, cumulative times of coroutines
+    therefore do not include the time spent awaiting. Work done in
+    executor threads is not included.
+
+    Raises
+    ------
+    ValueError
+        if another profiler is already active (Python 3.12+)
+    """
+    seconds = min(max(seconds, 0.0), MAX_PROFILE_SECONDS)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+    LOGGER.debug(f"Profiled event loop for {seconds:.1f}s")
+    return profiler
+
+
+def _format_func(func: typing.Tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        # builtins, e. g. "<method 'poll' of 'select.epoll' objects>"
+        return name
+    return f"{os.path.basename(filename)}:{lineno}({name})"
+
+
+def make_profile_rows(
+    profiler: cProfile.Profile, top: int = 15, sort: str = "cumulative"
+) -> typing.List[ProfileRowType]:
+    """Top functions of the profile, by cumulative time (default)."""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats(sort)
+    rows = list()
+    # pylint: disable=no-member
+    for func in stats.fcn_list[:top]:
+        prim_calls, num_calls, total_time, cum_time, _ = stats.stats[func]
+        calls = str(num_calls)
+        if prim_calls != num_calls:
+            # recursive calls
+            calls += f"/{prim_calls}"
+        rows.append(
+            (_format_func(func), calls, round(total_time, 4), round(cum_time, 4))
+        )
+    return rows
+
+
+def dump_profile(profiler: cProfile.Profile) -> bytes:
+    """Raw profile, same format as ``pstats.Stats.dump_stats``, can be
+    loaded with ``pstats.Stats(filename)`` or viewers like snakeviz."""
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)  # pylint: disable=no-member
+
+
+# ---------------------------------------------------------------------------
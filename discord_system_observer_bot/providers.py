@@ -0,0 +1,154 @@
+import importlib
+import logging
+import typing
+from functools import lru_cache
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    # pylint: disable=cyclic-import
+    from discord_system_observer_bot.sampler import ProbeType
+    from discord_system_observer_bot.statsobserver import ObservableLimit
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: entry point group for site-specific providers, e. g. in a setup.py:
+#: ``entry_points={"discord_system_observer_bot.providers": ["slurm = mypkg:SlurmProvider"]}``
+ENTRY_POINT_GROUP = "discord_system_observer_bot.providers"
+
+#: providers shipped with the bot, name -> "module:attribute"
+BUILTIN_PROVIDERS = {
+    "cpu": "discord_system_observer_bot.builtin_providers:CpuProvider",
+    "disk": "discord_system_observer_bot.builtin_providers:DiskProvider",
+    "gpu": "discord_system_observer_bot.builtin_providers:GpuProvider",
+    "net": "discord_system_observer_bot.builtin_providers:NetProvider",
+    "diskio": "discord_system_observer_bot.builtin_providers:DiskIOProvider",
+    "sensors": "discord_system_observer_bot.builtin_providers:SensorsProvider",
+}
+
+#: enabled if not configured otherwise
+DEFAULT_PROVIDERS = tuple(BUILTIN_PROVIDERS.keys())
+
+#: provider names, or provider instances (e. g. with arguments)
+ProvidersSetType = typing.Optional[typing.Sequence[typing.Union[str, "MetricProvider"]]]
+
+
+# ---------------------------------------------------------------------------
+
+
+class MetricProvider:
+    """A family of metrics (e. g. CPU, GPUs, a site-specific job queue).
+
+    Subclasses declare their metrics and limit types and implement the
+    hooks they support, all hooks are optional. Providers are created
+    once (without arguments) and shared by all consumers."""
+
+    #: name for configuration, set by the registry if empty
+    name: str = ""
+    #: metric names (``<metric>`` or ``<metric>:*`` for per-device ones),
+    #: for documentation and to group charts
+    metrics: typing.Tuple[str, ...] = ()
+    #: names of limit types that :meth:`make_limits` supports
+    limit_types: typing.Tuple[str, ...] = ()
+    #: limit types enabled if the limits are not configured explicitly
+    default_limit_types: typing.Tuple[str, ...] = ()
+    #: title of the section in the system information, None for none
+    info_title: typing.Optional[str] = None
+
+    def is_available(self) -> bool:
+        """Whether the provider can be used on this system (e. g.
+        optional dependencies installed)."""
+        return True
+
+    def collect(self, stats: typing.Dict[str, typing.Union[float, int]]) -> None:
+        """Sample current values into ``stats``, like :func:`collect_stats`."""
+
+    def make_probes(self) -> typing.List["ProbeType"]:
+        """Cheap probes for high-frequency sub-sampling."""
+        return list()
+
+    def make_limits(
+        self, limit_types: typing.Sequence[str]
+    ) -> typing.Dict[str, "ObservableLimit"]:
+        """Limits (by id) for the requested types of :attr:`limit_types`."""
+        return dict()
+
+    def info(self) -> typing.Optional[str]:
+        """Pre-formatted system information section, None if N/A."""
+        return None
+
+
+# ---------------------------------------------------------------------------
+
+
+def _iter_entry_points() -> typing.List[typing.Any]:
+    # pylint: disable=import-outside-toplevel
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        try:
+            from importlib_metadata import entry_points
+        except ImportError:
+            return list()
+    # pylint: enable=import-outside-toplevel
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=ENTRY_POINT_GROUP))
+    return list(eps.get(ENTRY_POINT_GROUP, ()))
+
+
+@lru_cache(maxsize=1)
+def available_providers() -> typing.Dict[str, str]:
+    """Names of all known providers, built-in and installed via entry
+    points, with their ``module:attribute`` (nothing is imported)."""
+    providers = dict(BUILTIN_PROVIDERS)
+    for entry_point in _iter_entry_points():
+        if entry_point.name in providers:
+            LOGGER.warning(f"Provider {entry_point.name} already registered, skip.")
+            continue
+        providers[entry_point.name] = entry_point.value
+    return providers
+
+
+@lru_cache(maxsize=None)
+def load_provider(name: str) -> typing.Optional[MetricProvider]:
+    """Import and create a provider, None if unknown, failed to load or
+    not available on this system."""
+    spec = available_providers().get(name)
+    if spec is None:
+        LOGGER.warning(f"Unknown metric provider: {name}")
+        return None
+
+    module_name, _, attribute = spec.partition(":")
+    try:
+        obj = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            obj = getattr(obj, part)
+        provider = obj() if isinstance(obj, type) else obj
+    except Exception as ex:  # pylint: disable=broad-except
+        LOGGER.warning(f"Failed to load metric provider {name} ({spec}): {ex}")
+        return None
+
+    if not provider.name:
+        provider.name = name
+    if not provider.is_available():
+        LOGGER.debug(f"Metric provider {name} not available.")
+        return None
+    return provider
+
+
+def get_providers(names: ProvidersSetType = None) -> typing.List[MetricProvider]:
+    """Load the (available) providers, :data:`DEFAULT_PROVIDERS` if no
+    names are given. Only the named providers are imported, provider
+    instances are used as they are."""
+    if names is None:
+        names = DEFAULT_PROVIDERS
+    providers = (
+        name if isinstance(name, MetricProvider) else load_provider(name)
+        for name in dict.fromkeys(names)
+    )
+    return [provider for provider in providers if provider is not None]
+
+
+# ---------------------------------------------------------------------------
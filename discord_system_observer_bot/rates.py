@@ -0,0 +1,156 @@
+import threading
+import time
+import typing
+from array import array
+
+
+#: default wrap-around value for counters (32bit kernel counters),
+#: 64bit counters will not wrap in any reasonable amount of time
+COUNTER_WRAP_32 = 2 ** 32
+
+
+# ---------------------------------------------------------------------------
+
+
+def _counter_delta(
+    cur: float, prev: float, wrap: typing.Optional[float]
+) -> typing.Optional[float]:
+    """Compute the difference between two raw counter values.
+
+    Returns ``None`` if the counter has been reset (e. g. device re-plugged
+    or driver reloaded), as the interval for the new value is unknown."""
+    if cur >= prev:
+        return cur - prev
+    # counter went backwards, either it wrapped around or has been reset
+    # a wrap is only plausible if the previous value was near the maximum
+    if wrap and wrap / 2 <= prev < wrap:
+        return cur + wrap - prev
+    return None
+
+
+class CounterRates:
+    """Converts monotonic raw counters (bytes, operations, energy, ...)
+    of a set of devices into per-second rates between two updates.
+
+    The previous raw values are kept in a single flat ``array`` with
+    ``len(fields)`` consecutive values per device. Devices may appear
+    or vanish between updates (hot-plug, renamed network interfaces, ...).
+    New devices report rates only from their second sample on, vanished
+    devices are dropped.
+
+    Updates that follow the previous one within ``min_interval`` seconds
+    return the previous rates, to not produce noisy rates over tiny
+    intervals. Each update moves the baseline, so consumers that need
+    rates over their own interval (collector, limit checks) should use
+    separate instances."""
+
+    def __init__(
+        self,
+        fields: typing.Sequence[str],
+        wrap: typing.Optional[float] = COUNTER_WRAP_32,
+        min_interval: float = 1.0,
+    ):
+        self.fields = tuple(fields)
+        self.wrap = wrap
+        self.min_interval = min_interval
+
+        self._index: typing.Dict[str, int] = dict()
+        self._values = array("d")
+        self._timestamp: typing.Optional[float] = None
+        self._rates: typing.Dict[str, typing.Dict[str, float]] = dict()
+        # updates may come from executor threads (snapshots, sub-sampler)
+        self._lock = threading.Lock()
+
+    @property
+    def rates(self) -> typing.Dict[str, typing.Dict[str, float]]:
+        """Rates computed by the last update."""
+        return self._rates
+
+    def reset(self) -> None:
+        """Forget previous counters, next update will not produce rates."""
+        self._index = dict()
+        self._values = array("d")
+        self._timestamp = None
+        self._rates = dict()
+
+    def update(
+        self,
+        counters: typing.Mapping[str, typing.Any],
+        timestamp: typing.Optional[float] = None,
+        wraps: typing.Optional[typing.Mapping[str, float]] = None,
+    ) -> typing.Dict[str, typing.Dict[str, float]]:
+        """Store new raw counters and compute rates.
+
+        Parameters
+        ----------
+        counters : typing.Mapping[str, typing.Any]
+            mapping of device name to a (named tuple like) object that
+            has the attributes in ``fields``, missing attributes are zero
+        timestamp : typing.Optional[float], optional
+            time of sampling in seconds, by default ``time.monotonic()``
+        wraps : typing.Optional[typing.Mapping[str, float]], optional
+            device specific wrap-around values, by default None
+
+        Returns
+        -------
+        typing.Dict[str, typing.Dict[str, float]]
+            per device mapping of field name to its per-second rate
+        """
+        with self._lock:
+            return self._update(counters, timestamp, wraps)
+
+    def _update(
+        self,
+        counters: typing.Mapping[str, typing.Any],
+        timestamp: typing.Optional[float],
+        wraps: typing.Optional[typing.Mapping[str, float]],
+    ) -> typing.Dict[str, typing.Dict[str, float]]:
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        if (
+            self._timestamp is not None
+            and timestamp - self._timestamp < self.min_interval
+        ):
+            return self._rates
+
+        elapsed = timestamp - self._timestamp if self._timestamp is not None else 0
+        num_fields = len(self.fields)
+
+        index = dict()
+        values = array("d", [0.0]) * (len(counters) * num_fields)
+        rates = dict()
+
+        for pos, (key, counter) in enumerate(counters.items()):
+            base = pos * num_fields
+            index[key] = base
+            for off, field in enumerate(self.fields):
+                values[base + off] = getattr(counter, field, 0)
+
+            prev_base = self._index.get(key)
+            if prev_base is None or elapsed <= 0:
+                # new device or first update
+                continue
+
+            wrap = wraps.get(key, self.wrap) if wraps else self.wrap
+            key_rates = dict()
+            for off, field in enumerate(self.fields):
+                delta = _counter_delta(
+                    values[base + off], self._values[prev_base + off], wrap
+                )
+                if delta is None:
+                    # counter reset, skip device for this interval
+                    break
+                key_rates[field] = delta / elapsed
+            else:
+                rates[key] = key_rates
+
+        self._index = index
+        self._values = values
+        self._timestamp = timestamp
+        self._rates = rates
+
+        return rates
+
+
+# ---------------------------------------------------------------------------
@@ -0,0 +1,238 @@
+import datetime
+import itertools
+import math
+import typing
+from fnmatch import fnmatch
+
+from discord_system_observer_bot.history import StatsHistory
+from discord_system_observer_bot.statsobserver import ObservableLimit
+from discord_system_observer_bot.utils import make_table
+
+
+#: same defaults as :class:`NotifyBadCounterManager`
+DEFAULT_BADNESS_INC = 1
+DEFAULT_BADNESS_DEC = 1
+DEFAULT_BADNESS_THRESHOLD = 3
+
+#: run of consecutive samples with the same check result:
+#: (is ok, position of first sample, number of samples)
+RunType = typing.Tuple[bool, int, int]
+
+
+class ReplayEvent(typing.NamedTuple):
+    #: "alert" or "recovery"
+    kind: str
+    #: history row of the sample that triggered the event
+    row: int
+
+
+class ReplayResult(typing.NamedTuple):
+    column: str
+    limit_name: str
+    threshold: float
+    badness_inc: int
+    badness_threshold: int
+    events: typing.List[ReplayEvent]
+
+    @property
+    def num_alerts(self) -> int:
+        return sum(1 for event in self.events if event.kind == "alert")
+
+    @property
+    def num_recoveries(self) -> int:
+        return sum(1 for event in self.events if event.kind == "recovery")
+
+
+# ---------------------------------------------------------------------------
+
+
+def make_runs(
+    values: typing.Sequence[float],
+    fn_check: typing.Callable[[float, float], bool],
+    threshold: float,
+) -> typing.Tuple[typing.List[RunType], typing.List[int]]:
+    """Evaluate the check for all samples and run-length encode the
+    results. Missing values (``NaN``) are skipped, like failed checks
+    in the observer loop.
+
+    Returns
+    -------
+    typing.Tuple[typing.List[RunType], typing.List[int]]
+        runs (with positions into the evaluated samples) and the
+        history rows of the evaluated samples
+    """
+    rows = [row for row, value in enumerate(values) if not math.isnan(value)]
+    runs = list()
+    pos = 0
+    for is_ok, group in itertools.groupby(
+        fn_check(values[row], threshold) for row in rows
+    ):
+        length = sum(1 for _ in group)
+        runs.append((is_ok, pos, length))
+        pos += length
+    return runs, rows
+
+
+def replay_runs(
+    runs: typing.Sequence[RunType],
+    rows: typing.Sequence[int],
+    badness_inc: int = DEFAULT_BADNESS_INC,
+    badness_threshold: int = DEFAULT_BADNESS_THRESHOLD,
+    badness_dec: int = DEFAULT_BADNESS_DEC,
+) -> typing.List[ReplayEvent]:
+    """Replay :class:`NotifyBadCounterManager` on run-length encoded
+    check results. Each run is handled in constant time, so parameter
+    sweeps don't need to touch every sample again.
+
+    Parameters
+    ----------
+    runs : typing.Sequence[RunType]
+        from :func:`make_runs`
+    rows : typing.Sequence[int]
+        history rows of the evaluated samples, from :func:`make_runs`
+    """
+    events = list()
+    counter, notified = 0, False
+    for is_ok, start, length in runs:
+        if not is_ok:
+            # counter increases (capped at threshold), notify once reached
+            if not notified:
+                needed = max(1, math.ceil((badness_threshold - counter) / badness_inc))
+                if needed <= length:
+                    events.append(ReplayEvent("alert", rows[start + needed - 1]))
+                    notified = True
+            counter = min(badness_threshold, counter + length * badness_inc)
+        elif counter > 0:
+            # counter decreases, recovery message once normal (if notified)
+            needed = math.ceil(counter / badness_dec)
+            if needed <= length:
+                if notified:
+                    events.append(ReplayEvent("recovery", rows[start + needed - 1]))
+                notified = False
+            counter = max(0, counter - length * badness_dec)
+    return events
+
+
+def replay_limit(
+    history: StatsHistory,
+    column: str,
+    limit: ObservableLimit,
+    thresholds: typing.Optional[typing.Sequence[float]] = None,
+    badness_incs: typing.Optional[typing.Sequence[int]] = None,
+    badness_thresholds: typing.Optional[typing.Sequence[int]] = None,
+) -> typing.List[ReplayResult]:
+    """Replay a limit on a history column for all combinations of the
+    given parameters (the limit's own values if not given)."""
+    if not thresholds:
+        thresholds = [limit.threshold]
+    if not badness_incs:
+        badness_incs = [limit.badness_inc or DEFAULT_BADNESS_INC]
+    if not badness_thresholds:
+        badness_thresholds = [limit.badness_threshold or DEFAULT_BADNESS_THRESHOLD]
+
+    values = list(history.iter_column(column))
+    results = list()
+    for threshold in thresholds:
+        # evaluated once per threshold, badness parameters only need runs
+        runs, rows = make_runs(values, limit.fn_check, threshold)
+
+        for badness_inc, badness_threshold in itertools.product(
+            badness_incs, badness_thresholds
+        ):
+            results.append(
+                ReplayResult(
+                    column=column,
+                    limit_name=limit.name,
+                    threshold=threshold,
+                    badness_inc=badness_inc,
+                    badness_threshold=badness_threshold,
+                    events=replay_runs(
+                        runs,
+                        rows,
+                        badness_inc=badness_inc,
+                        badness_threshold=badness_threshold,
+                    ),
+                )
+            )
+    return results
+
+
+def match_limits(
+    history: StatsHistory,
+    limits: typing.Dict[str, ObservableLimit],
+    pattern: typing.Optional[str] = None,
+) -> typing.List[typing.Tuple[str, ObservableLimit]]:
+    """Pair history columns with limits. Columns without a limit of
+    their own (e. g. other disks, GPUs) use a limit of the same metric
+    (column name without device) as template."""
+    by_column = {
+        limit.column: limit for limit in limits.values() if limit.column is not None
+    }
+    by_metric = dict()
+    for column, limit in by_column.items():
+        by_metric.setdefault(column.partition(":")[0], limit)
+
+    pairs = list()
+    for column in history.names:
+        if pattern is not None and not fnmatch(column, pattern):
+            continue
+        limit = by_column.get(column) or by_metric.get(column.partition(":")[0])
+        if limit is not None:
+            pairs.append((column, limit))
+    return pairs
+
+
+# ---------------------------------------------------------------------------
+
+
+def format_results(
+    history: StatsHistory,
+    results: typing.Sequence[ReplayResult],
+    with_events: bool = False,
+) -> str:
+    """Summary table of alerts/recoveries per limit and parameters,
+    optionally followed by the event times."""
+
+    def _fmt_row(row):
+        timestamp = next(history.iter_timestamps(row, row + 1))
+        return datetime.datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+
+    rows = [
+        (
+            result.column,
+            result.threshold,
+            result.badness_inc,
+            result.badness_threshold,
+            result.num_alerts,
+            result.num_recoveries,
+            _fmt_row(result.events[0].row) if result.events else "-",
+        )
+        for result in results
+    ]
+    text = make_table(
+        rows,
+        ("column", "threshold", "inc", "badness", "alerts", "recoveries", "first"),
+        alignments=("<", ">", ">", ">", ">", ">", "<"),
+        wrap_markdown=False,
+        header_separator=True,
+        column_separators=False,
+    )
+
+    if with_events:
+        lines = [text, ""]
+        for result in results:
+            if not result.events:
+                continue
+            lines.append(
+                f"{result.column} (threshold: {result.threshold}, "
+                f"inc: {result.badness_inc}, badness: {result.badness_threshold}):"
+            )
+            lines.extend(
+                f"  {_fmt_row(event.row)} {event.kind}" for event in result.events
+            )
+        text = "\n".join(lines)
+
+    return text
+
+
+# ---------------------------------------------------------------------------
@@ -0,0 +1,224 @@
+import datetime
+import html
+import logging
+import os
+import typing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from discord_system_observer_bot.history import StatsHistory
+from discord_system_observer_bot.replay import match_limits, replay_limit
+from discord_system_observer_bot.statsobserver import HEATMAP_METRICS
+from discord_system_observer_bot.statsobserver import LimitEvent, ObservableLimit
+from discord_system_observer_bot.statsobserver import plot_rows
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+_STYLE = """
+body { font-family: sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; font-size: 0.9em; }
+th, td { padding: 0.2em 0.8em; border-bottom: 1px solid #ddd; }
+td.num { text-align: right; font-family: monospace; }
+.alert { color: #b00; }
+.recovery { color: #070; }
+img { max-width: 100%; }
+"""
+
+
+# ---------------------------------------------------------------------------
+
+
+def metric_family(name: str) -> str:
+    """Family of a metric, e. g. ``gpu`` for ``gpu_temp:0``."""
+    return name.partition(":")[0].partition("_")[0]
+
+
+def group_families(names: typing.Iterable[str]) -> typing.Dict[str, typing.List[str]]:
+    """Group metric names by family (in order of first appearance),
+    per-device metrics of :data:`HEATMAP_METRICS` are left out."""
+    families = dict()
+    for name in names:
+        if name.partition(":")[0] in HEATMAP_METRICS:
+            continue
+        families.setdefault(metric_family(name), list()).append(name)
+    return families
+
+
+def _fmt_ts(timestamp: float) -> str:
+    return datetime.datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+
+
+def _fmt_num(value: typing.Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def _render_chart(
+    data_series: typing.Tuple[typing.Tuple[str, typing.List]],
+    ylims: typing.Dict[str, typing.Tuple[float, float]],
+    backend: typing.Optional[str],
+) -> typing.Optional[str]:
+    # module level, to be usable with process pools
+    return plot_rows(data_series, as_data_uri=True, ylims=ylims, backend=backend)
+
+
+def replay_events(
+    history: StatsHistory, limits: typing.Dict[str, ObservableLimit]
+) -> typing.List[LimitEvent]:
+    """Alerts/recoveries the limits would have produced on the recorded
+    stats, for reports without the events of a running observer."""
+    timestamps = list(history.iter_timestamps())
+    events = list()
+    for column, limit in match_limits(history, limits):
+        for result in replay_limit(history, column, limit):
+            for event in result.events:
+                events.append(
+                    LimitEvent(
+                        timestamp=timestamps[event.row],
+                        kind=event.kind,
+                        name=column,
+                        value=history[event.row].get(column),
+                        threshold=limit.threshold,
+                        unit=limit.unit,
+                    )
+                )
+    return sorted(events)
+
+
+# ---------------------------------------------------------------------------
+
+
+def write_report(
+    fp: typing.TextIO,
+    history: StatsHistory,
+    events: typing.Sequence[LimitEvent] = (),
+    title: str = "System report",
+    lo: int = 0,
+    hi: typing.Optional[int] = None,
+    backend: typing.Optional[str] = None,
+    max_workers: typing.Optional[int] = None,
+    use_processes: bool = False,
+) -> None:
+    """Write a self-contained HTML report (summary statistics, alert and
+    recovery timeline, a chart per metric family with embedded data URI
+    images) for the rows ``[lo, hi)``.
+
+    Charts are rendered in parallel (threads, or processes to not be
+    limited by the GIL), the HTML is written incrementally and only a few
+    families are loaded/rendered at the same time.
+    """
+    if hi is None:
+        hi = len(history)
+    names = [name for name in history.names if history.summary(name, lo, hi)]
+    families = group_families(names)
+    start = next(history.iter_timestamps(lo, lo + 1), None) if lo < hi else None
+    end = next(history.iter_timestamps(hi - 1, hi), None) if lo < hi else None
+    events = [
+        event
+        for event in events
+        if (start is None or event.timestamp >= start)
+        and (end is None or event.timestamp <= end)
+    ]
+
+    fp.write(
+        "<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title><style>{_STYLE}</style></head><body>\n"
+        f"<h1>{html.escape(title)}</h1>\n"
+    )
+    if start is not None:
+        fp.write(f"<p>{_fmt_ts(start)} - {_fmt_ts(end)} UTC, {hi - lo} samples</p>\n")
+
+    # summary statistics
+    fp.write(
+        "<h2>Summary</h2>\n<table><tr><th>metric</th><th>min</th>"
+        "<th>avg</th><th>max</th><th>last</th></tr>\n"
+    )
+    for family_names in families.values():
+        for name in family_names:
+            vmin, vmax, vsum, vcount = history.summary(name, lo, hi)
+            last = history.aggregate(name, "last", start, end)
+            fp.write(
+                f"<tr><td>{html.escape(name)}</td>"
+                + "".join(
+                    f"<td class='num'>{_fmt_num(value)}</td>"
+                    for value in (vmin, vsum / vcount, vmax, last)
+                )
+                + "</tr>\n"
+            )
+    fp.write("</table>\n")
+
+    # alert/recovery timeline
+    fp.write("<h2>Alerts</h2>\n")
+    if not events:
+        fp.write("<p>No alerts.</p>\n")
+    else:
+        fp.write(
+            "<table><tr><th>time (UTC)</th><th>event</th><th>limit</th>"
+            "<th>value</th><th>threshold</th></tr>\n"
+        )
+        for event in events:
+            fp.write(
+                f"<tr class='{event.kind}'><td>{_fmt_ts(event.timestamp)}</td>"
+                f"<td>{event.kind}</td><td>{html.escape(event.name)}</td>"
+                f"<td class='num'>{_fmt_num(event.value)}"
+                f" {html.escape(event.unit)}</td>"
+                f"<td class='num'>{_fmt_num(event.threshold)}</td></tr>\n"
+            )
+        fp.write("</table>\n")
+
+    # charts, rendered in parallel and written in order
+    fp.write("<h2>Charts</h2>\n")
+    timestamps = list(history.iter_timestamps(lo, hi))
+    ids = list(history.iter_ids(lo, hi))
+    ylims = history.value_range(lo, hi)
+
+    if not max_workers:
+        max_workers = min(4, os.cpu_count() or 1)
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_cls(max_workers=max_workers) as executor:
+        # bounds the number of loaded/rendered charts
+        max_pending = 2 * max_workers
+        pending = deque()
+
+        def _write_next():
+            family, future = pending.popleft()
+            data_uri = future.result()
+            fp.write(f"<h3>{html.escape(family)}</h3>\n")
+            if data_uri is None:
+                fp.write("<p>N/A (no plotting backend)</p>\n")
+            else:
+                fp.write(f"<img alt='{html.escape(family)}' src='{data_uri}'>\n")
+
+        for family, family_names in families.items():
+            data_series = (
+                ("_datetime", timestamps),
+                ("_id", ids),
+                *(
+                    (name, list(history.iter_column(name, lo, hi)))
+                    for name in family_names
+                ),
+            )
+            future = executor.submit(
+                _render_chart,
+                data_series,
+                {name: ylims[name] for name in family_names if name in ylims},
+                backend,
+            )
+            pending.append((family, future))
+            if len(pending) >= max_pending:
+                _write_next()
+        while pending:
+            _write_next()
+
+    fp.write("</body></html>\n")
+    LOGGER.debug(f"Wrote report with {len(families)} charts, {len(events)} events")
+
+
+def write_report_file(filename: str, history: StatsHistory, **kwargs) -> None:
+    """Write the report to a file, see :func:`write_report`."""
+    with open(filename, "w", encoding="utf-8") as fp:
+        write_report(fp, history, **kwargs)
+
+
+# ---------------------------------------------------------------------------
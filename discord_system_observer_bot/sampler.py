@@ -0,0 +1,196 @@
+import logging
+import math
+import threading
+import time
+import typing
+from array import array
+
+from discord_system_observer_bot.gpuinfo import get_thread_child_cpu_time
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+ProbeType = typing.Callable[[], typing.Dict[str, float]]
+
+#: aggregates emitted per sampled metric, "last" keeps the plain name
+AGGREGATES = ("min", "mean", "max")
+
+
+# ---------------------------------------------------------------------------
+
+
+def make_aggregate_name(name: str, agg: str) -> str:
+    """Insert the aggregate before an optional device suffix,
+    e. g. ``gpu_temp:0`` + ``max`` -> ``gpu_temp_max:0``."""
+    base, sep, device = name.partition(":")
+    return f"{base}_{agg}{sep}{device}"
+
+
+def split_aggregate_name(name: str) -> typing.Tuple[str, typing.Optional[str]]:
+    """Reverse of :func:`make_aggregate_name`, returns the plain name
+    and the aggregate (or ``None`` if not an aggregated name)."""
+    base, sep, device = name.partition(":")
+    for agg in AGGREGATES:
+        if base.endswith(f"_{agg}"):
+            return f"{base[: -len(agg) - 1]}{sep}{device}", agg
+    return name, None
+
+
+# ---------------------------------------------------------------------------
+
+
+def _cpu_time() -> float:
+    """CPU time of the current thread and of the ``nvidia-smi`` processes
+    it ran (not of those of other threads)."""
+    return time.thread_time() + get_thread_child_cpu_time()
+
+
+class _RingBuffer:
+    """Preallocated ring buffer of float samples."""
+
+    __slots__ = ("values", "pos", "count")
+
+    def __init__(self, capacity: int):
+        self.values = array("d", [math.nan]) * capacity
+        self.pos = 0
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def aggregate(self) -> typing.Optional[typing.Tuple[float, float, float, float]]:
+        """Return (min, mean, max, last) of buffered samples."""
+        if not self.count:
+            return None
+        capacity = len(self.values)
+        start = (self.pos - self.count) % capacity
+        if start + self.count <= capacity:
+            values = self.values[start : start + self.count]
+        else:
+            values = self.values[start:] + self.values[: self.pos]
+        return (
+            min(values),
+            sum(values) / self.count,
+            max(values),
+            self.values[(self.pos - 1) % capacity],
+        )
+
+
+class SubSampler(threading.Thread):
+    """Background thread that polls cheap metric probes every few seconds
+    between two collector runs to catch short spikes.
+
+    Samples are written into preallocated ring buffers (one per metric),
+    :meth:`drain` returns min/mean/max/last aggregates and resets them.
+    If the collector interval is longer than ``capacity`` polls, only
+    the most recent samples are aggregated.
+
+    The CPU time of the polls (this thread and the ``nvidia-smi`` processes
+    it runs) is measured, if its share exceeds ``max_cpu_perc`` of
+    one core, the poll interval backs off up to ``max_interval``, and
+    recovers if well below."""
+
+    def __init__(
+        self,
+        probes: typing.Sequence[ProbeType],
+        interval: float = 2.0,
+        min_interval: float = 1.0,
+        max_interval: float = 5.0,
+        capacity: int = 600,
+        max_cpu_perc: float = 1.0,
+    ):
+        super().__init__(name="SubSampler", daemon=True)
+        self.probes = tuple(probes)
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.capacity = capacity
+        self.max_cpu_perc = max_cpu_perc
+
+        self._buffers: typing.Dict[str, _RingBuffer] = dict()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        self.num_polls = 0
+        self.num_errors = 0
+        #: exponentially smoothed CPU usage of polling (% of one core)
+        self.cpu_perc = 0.0
+        self.cpu_time_total = 0.0
+
+    def run(self) -> None:
+        LOGGER.debug("Sub-sampler started ...")
+        while not self._stop_event.is_set():
+            start_cpu = _cpu_time()
+            self.poll()
+            used_cpu = _cpu_time() - start_cpu
+
+            self.cpu_time_total += used_cpu
+            self.cpu_perc = 0.8 * self.cpu_perc + 0.2 * (used_cpu / self.interval * 100)
+            self._adapt_interval()
+
+            self._stop_event.wait(self.interval)
+        LOGGER.debug("Sub-sampler stopped.")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _adapt_interval(self) -> None:
+        if self.cpu_perc > self.max_cpu_perc:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        elif self.cpu_perc < self.max_cpu_perc / 4:
+            self.interval = max(self.min_interval, self.interval / 1.5)
+
+    def poll(self) -> None:
+        """Run all probes once and buffer their values."""
+        values = dict()
+        for probe in self.probes:
+            try:
+                values.update(probe())
+            except Exception as ex:  # pylint: disable=broad-except
+                self.num_errors += 1
+                LOGGER.debug(f"Failed to run sub-sample probe, reason: {ex}")
+
+        with self._lock:
+            for name, value in values.items():
+                buf = self._buffers.get(name)
+                if buf is None:
+                    buf = self._buffers[name] = _RingBuffer(self.capacity)
+                buf.append(value)
+            self.num_polls += 1
+
+    def drain(self) -> typing.Dict[str, float]:
+        """Return aggregates of samples since the last call and reset.
+
+        The last value is stored under the plain metric name, min/mean/max
+        with an inserted suffix, see :func:`make_aggregate_name`."""
+        stats = dict()
+        with self._lock:
+            for name, buf in self._buffers.items():
+                aggs = buf.aggregate()
+                buf.clear()
+                if aggs is None:
+                    continue
+                for agg, value in zip(AGGREGATES, aggs):
+                    stats[make_aggregate_name(name, agg)] = round(value, 1)
+                stats[name] = round(aggs[-1], 1)
+        return stats
+
+    def status(self) -> typing.Dict[str, typing.Union[int, float, str]]:
+        return {
+            "sampler_running": self.is_alive(),
+            "sampler_interval_s": round(self.interval, 2),
+            "sampler_cpu_perc": round(self.cpu_perc, 3),
+            "sampler_cpu_time_s": round(self.cpu_time_total, 2),
+            "sampler_num_polls": self.num_polls,
+            "sampler_num_errors": self.num_errors,
+            "sampler_num_metrics": len(self._buffers),
+        }
+
+
+# ---------------------------------------------------------------------------
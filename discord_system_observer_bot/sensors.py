@@ -0,0 +1,242 @@
+import logging
+import os
+import threading
+import time
+import typing
+
+import psutil
+
+from discord_system_observer_bot.rates import CounterRates
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: sysfs root of the power capping framework (Intel/AMD RAPL zones)
+POWERCAP_ROOT = "/sys/class/powercap"
+
+#: default threshold for temperature sensors without high/critical values
+DEFAULT_TEMP_THRESHOLD = 90.0
+
+SensorReadingType = typing.Dict[str, float]
+
+
+# ---------------------------------------------------------------------------
+
+
+def _make_sensor_key(chip: str, label: str, num: int) -> str:
+    # colons separate the metric from the device in stats names
+    return f"{chip}/{label or num}".replace(":", "_")
+
+
+class _CachedReading:
+    """Keeps the last reading for ``max_age`` seconds, so that multiple
+    limit checks in one round share a single (slow) sensor scan."""
+
+    def __init__(self, fn_read: typing.Callable[[], typing.Any], max_age: float = 1.0):
+        self.fn_read = fn_read
+        self.max_age = max_age
+        self._value = None
+        self._timestamp = None
+        self._lock = threading.Lock()
+
+    def get(self) -> typing.Any:
+        with self._lock:
+            now = time.monotonic()
+            if self._timestamp is None or now - self._timestamp >= self.max_age:
+                self._value = self.fn_read()
+                self._timestamp = now
+            return self._value
+
+
+def _read_temperatures() -> typing.Dict[str, typing.Any]:
+    if not hasattr(psutil, "sensors_temperatures"):
+        return dict()
+    try:
+        chips = psutil.sensors_temperatures()
+    except (OSError, RuntimeError) as ex:
+        LOGGER.debug(f"Failed to read temperatures, reason: {ex}")
+        return dict()
+    return {
+        _make_sensor_key(chip, sensor.label, num): sensor
+        for chip, sensors in chips.items()
+        for num, sensor in enumerate(sensors)
+    }
+
+
+def _read_fans() -> typing.Dict[str, typing.Any]:
+    if not hasattr(psutil, "sensors_fans"):
+        return dict()
+    try:
+        chips = psutil.sensors_fans()
+    except (OSError, RuntimeError) as ex:
+        LOGGER.debug(f"Failed to read fans, reason: {ex}")
+        return dict()
+    return {
+        _make_sensor_key(chip, sensor.label, num): sensor
+        for chip, sensors in chips.items()
+        for num, sensor in enumerate(sensors)
+    }
+
+
+_TEMPERATURES = _CachedReading(_read_temperatures)
+_FANS = _CachedReading(_read_fans)
+
+
+def _get_temperatures() -> SensorReadingType:
+    """Current temperature (°C) per sensor, ``chip/label`` as key."""
+    return {key: sensor.current for key, sensor in _TEMPERATURES.get().items()}
+
+
+def _get_temperature(key: str) -> typing.Optional[float]:
+    sensor = _TEMPERATURES.get().get(key)
+    return sensor.current if sensor is not None else None
+
+
+def _get_temperature_threshold(key: str) -> typing.Optional[float]:
+    """Threshold reported by the sensor (high, else critical)."""
+    sensor = _TEMPERATURES.get().get(key)
+    if sensor is None:
+        return None
+    return sensor.high or sensor.critical or None
+
+
+def _get_fans() -> SensorReadingType:
+    """Current fan speed (RPM) per fan, ``chip/label`` as key."""
+    return {key: sensor.current for key, sensor in _FANS.get().items()}
+
+
+# ---------------------------------------------------------------------------
+
+
+class _EnergyCounter(typing.NamedTuple):
+    energy_uj: float
+
+
+class PowercapReader:
+    """Power draw from RAPL energy counters in the powercap sysfs tree.
+
+    Zones (directories with an ``energy_uj`` file, like ``intel-rapl:0``
+    or ``intel-rapl:0:0``) are discovered once, their counter files are
+    kept open and re-read from the start for each sample. The counters
+    wrap around at ``max_energy_range_uj``, which is used as wrap value
+    for the rate computation.
+
+    If a zone can't be read anymore, all zones are re-discovered on the
+    next call. Zones that can't be read at all (newer kernels restrict
+    ``energy_uj`` to root) are skipped."""
+
+    def __init__(self, root: str = POWERCAP_ROOT, min_interval: float = 1.0):
+        self.root = root
+        self._rates = CounterRates(("energy_uj",), wrap=None, min_interval=min_interval)
+        self._lock = threading.Lock()
+        #: zone name -> open counter file
+        self._handles: typing.Optional[typing.Dict[str, typing.BinaryIO]] = None
+        self._wraps: typing.Dict[str, float] = dict()
+
+    def _discover(self) -> None:
+        self.close()
+        self._handles = dict()
+        self._wraps = dict()
+        try:
+            entries = sorted(os.listdir(self.root))
+        except OSError:
+            LOGGER.debug(f"No powercap zones in {self.root}")
+            return
+
+        for entry in entries:
+            path = os.path.join(self.root, entry)
+            try:
+                with open(os.path.join(path, "name")) as fp:
+                    name = fp.read().strip()
+                with open(os.path.join(path, "max_energy_range_uj")) as fp:
+                    wrap = float(fp.read().strip()) + 1
+                handle = open(os.path.join(path, "energy_uj"), "rb", buffering=0)
+            except (OSError, ValueError) as ex:
+                LOGGER.debug(f"Skip powercap zone {entry}, reason: {ex}")
+                continue
+            try:
+                handle.read()
+            except OSError as ex:
+                handle.close()
+                LOGGER.debug(f"Skip powercap zone {entry}, reason: {ex}")
+                continue
+
+            # sub-zones (e. g. "core") are named per package
+            parts = entry.split(":")
+            if len(parts) > 2:
+                parent = self._zone_name(":".join(parts[:2]))
+                name = f"{parent}/{name}" if parent else name
+            name = name.replace(":", "_")
+            if name in self._handles:
+                name = f"{name}-{entry.replace(':', '_')}"
+
+            self._handles[name] = handle
+            self._wraps[name] = wrap
+
+        LOGGER.debug(f"Found powercap zones: {list(self._handles.keys())}")
+
+    def _zone_name(self, entry: str) -> typing.Optional[str]:
+        try:
+            with open(os.path.join(self.root, entry, "name")) as fp:
+                return fp.read().strip()
+        except OSError:
+            return None
+
+    @property
+    def zones(self) -> typing.List[str]:
+        with self._lock:
+            if self._handles is None:
+                self._discover()
+            return list(self._handles.keys())
+
+    def read_energy(self) -> typing.Dict[str, float]:
+        """Raw energy counters (µJ) per zone."""
+        with self._lock:
+            if self._handles is None:
+                self._discover()
+
+            energy = dict()
+            for name, handle in self._handles.items():
+                try:
+                    handle.seek(0)
+                    energy[name] = float(handle.read())
+                except (OSError, ValueError) as ex:
+                    LOGGER.debug(f"Failed to read powercap zone {name}, reason: {ex}")
+                    # zones may change (e. g. module reload), re-discover
+                    self.close()
+                    break
+            return energy
+
+    def power(self, timestamp: typing.Optional[float] = None) -> SensorReadingType:
+        """Average power draw (W) per zone since the previous call,
+        only available from the second call on."""
+        counters = {
+            name: _EnergyCounter(value) for name, value in self.read_energy().items()
+        }
+        rates = self._rates.update(counters, timestamp=timestamp, wraps=self._wraps)
+        return {name: rate["energy_uj"] / 1e6 for name, rate in rates.items()}
+
+    def close(self) -> None:
+        if self._handles:
+            for handle in self._handles.values():
+                handle.close()
+        self._handles = None
+
+
+_POWERCAP: typing.Optional[PowercapReader] = None
+
+
+def _get_powercap_reader() -> PowercapReader:
+    global _POWERCAP  # pylint: disable=global-statement
+    if _POWERCAP is None:
+        _POWERCAP = PowercapReader()
+    return _POWERCAP
+
+
+def _get_power() -> SensorReadingType:
+    """Power draw (W) per RAPL zone since the last call."""
+    return _get_powercap_reader().power()
+
+
+# ---------------------------------------------------------------------------
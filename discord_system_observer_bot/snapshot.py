@@ -0,0 +1,152 @@
+import asyncio
+import datetime
+import logging
+import time
+import typing
+
+from discord_system_observer_bot.providers import ProvidersSetType, get_providers
+from discord_system_observer_bot.statsobserver import ObservableLimit
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+
+
+class SystemSnapshot(typing.NamedTuple):
+    #: consecutive number, changes with each new probe
+    version: int
+    #: time of probing
+    date: datetime.datetime
+    #: pre-formatted information blocks by provider name,
+    #: (title, text), text None if not available
+    info: typing.Dict[str, typing.Tuple[str, typing.Optional[str]]]
+    #: current values of limits (by limit id), None if failed
+    limit_values: typing.Dict[str, typing.Optional[float]]
+
+
+def take_snapshot(
+    limits: typing.Optional[typing.Dict[str, ObservableLimit]] = None,
+    version: int = 0,
+    providers: ProvidersSetType = None,
+) -> SystemSnapshot:
+    """Probe system information (of the providers) and current limit
+    values (blocking)."""
+
+    def _get_safe_current(limit):
+        try:
+            return limit.fn_retrieve()
+        except:  # pylint: disable=bare-except
+            return None
+
+    def _get_safe_info(provider):
+        try:
+            return provider.info()
+        except Exception as ex:  # pylint: disable=broad-except
+            LOGGER.debug(f"Failed to get info of provider {provider.name}: {ex}")
+            return None
+
+    return SystemSnapshot(
+        version=version,
+        date=datetime.datetime.now(),
+        info={
+            provider.name: (provider.info_title, _get_safe_info(provider))
+            for provider in get_providers(providers)
+            if provider.info_title
+        },
+        limit_values={
+            lid: _get_safe_current(limit) for lid, limit in (limits or {}).items()
+        },
+    )
+
+
+# ---------------------------------------------------------------------------
+
+
+class SnapshotCache:
+    """Short-lived cache for system snapshots with single-flight semantics.
+
+    A snapshot is reused for ``ttl`` seconds. If it is outdated, only one
+    probe is run (in an executor, so the event loop is not blocked), and
+    all concurrent callers await the same in-flight probe.
+
+    State that commands may change while a probe is running (e. g. the
+    limits) is copied with ``fn_state`` on the event loop, before the
+    probe is submitted, and passed as second argument to ``fn_probe``.
+
+    Values derived from a snapshot (e. g. rendered embed fields) can be
+    cached with :meth:`render` until the next snapshot is taken."""
+
+    def __init__(
+        self,
+        fn_probe: typing.Callable[..., SystemSnapshot],
+        ttl: float = 10.0,
+        fn_state: typing.Optional[typing.Callable[[], typing.Any]] = None,
+    ):
+        self.fn_probe = fn_probe
+        self.ttl = ttl
+        self.fn_state = fn_state
+
+        self._snapshot: typing.Optional[SystemSnapshot] = None
+        self._timestamp = 0.0
+        self._pending: typing.Optional[asyncio.Future] = None
+        self._rendered: typing.Dict[str, typing.Any] = dict()
+
+        self.stats = {"num_probes": 0, "num_hits": 0, "num_joined": 0}
+
+    @property
+    def snapshot(self) -> typing.Optional[SystemSnapshot]:
+        """Last snapshot (may be outdated)."""
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        self._timestamp = 0.0
+
+    async def get(self) -> SystemSnapshot:
+        """Return a snapshot not older than ``ttl`` seconds."""
+        if (
+            self._snapshot is not None
+            and time.monotonic() - self._timestamp < self.ttl
+        ):
+            self.stats["num_hits"] += 1
+            return self._snapshot
+
+        if self._pending is None:
+            version = self._snapshot.version + 1 if self._snapshot else 1
+            args = (version,) if self.fn_state is None else (version, self.fn_state())
+            loop = asyncio.get_event_loop()
+            self._pending = loop.run_in_executor(None, self.fn_probe, *args)
+            self._pending.add_done_callback(self._on_probe_done)
+            self.stats["num_probes"] += 1
+        else:
+            self.stats["num_joined"] += 1
+
+        # a cancelled caller must not cancel the probe for the others
+        return await asyncio.shield(self._pending)
+
+    def _on_probe_done(self, future: asyncio.Future) -> None:
+        self._pending = None
+        if future.cancelled() or future.exception() is not None:
+            LOGGER.debug(f"Failed to probe system snapshot: {future!r}")
+            return
+        self._snapshot = future.result()
+        self._timestamp = time.monotonic()
+        self._rendered = dict()
+
+    def render(
+        self,
+        key: str,
+        snapshot: SystemSnapshot,
+        fn_render: typing.Callable[[SystemSnapshot], typing.Any],
+    ) -> typing.Any:
+        """Return ``fn_render(snapshot)``, cached as long as ``snapshot``
+        is the current one."""
+        if snapshot is not self._snapshot:
+            return fn_render(snapshot)
+        if key not in self._rendered:
+            self._rendered[key] = fn_render(snapshot)
+        return self._rendered[key]
+
+
+# ---------------------------------------------------------------------------
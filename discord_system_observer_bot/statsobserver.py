@@ -1,30 +1,26 @@
 import datetime
+import logging
+import time
 import typing
 from base64 import b64encode
 from collections import defaultdict
 from functools import lru_cache, partial
 from io import BytesIO
 
-from discord_system_observer_bot.gpuinfo import get_gpus
-from discord_system_observer_bot.gpuinfo import (
-    _get_gpu_util,
-    _get_gpu_mem_load,
-    _get_gpu_temp,
-)
-from discord_system_observer_bot.sysinfo import (
-    _get_loadavg,
-    _get_mem_util,
-    _get_mem_used,
-)
-from discord_system_observer_bot.sysinfo import (
-    _get_disk_paths,
-    _get_disk_usage,
-    _get_disk_free_gb,
-)
+from discord_system_observer_bot.pngplot import ChartPanel, render_line_charts
+from discord_system_observer_bot.procwatch import ProcessWatch, ProcessWatcher
+from discord_system_observer_bot.providers import ProvidersSetType, get_providers
+from discord_system_observer_bot.sampler import ProbeType, split_aggregate_name
+
+
+LOGGER = logging.getLogger(__name__)
 
 
 LimitTypesSetType = typing.Optional[typing.Tuple[str]]
 
+#: per-device metrics that are plotted as heatmap instead of line plots
+HEATMAP_METRICS = ("cpu_core_perc",)
+
 
 # ---------------------------------------------------------------------------
 
@@ -51,66 +47,114 @@ def has_extra_deps_plot() -> bool:
 
 
 def collect_stats(
-    include: typing.Set[str] = ("cpu", "disk", "gpu")
+    include: ProvidersSetType = None,
 ) -> typing.Dict[str, typing.Union[float, int]]:
+    """Sample the metrics of the (available) providers, all default
+    providers if ``include`` is None."""
     stats = dict()
 
     stats["_id"] = 0
     stats["_datetime"] = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
 
-    if "cpu" in include:
-        (
-            stats["load_avg_1m_perc_percpu"],
-            stats["load_avg_5m_perc_percpu"],
-            stats["load_avg_15m_perc_percpu"],
-        ) = [round(v, 1) for v in _get_loadavg()]
-        stats["mem_util_perc"] = round(_get_mem_util(), 1)
-        stats["mem_used_gb"] = round(_get_mem_used(), 1)
-
-    if "disk" in include:
-        for dpath in _get_disk_paths():
-            stats[f"disk_usage_perc:{dpath}"] = round(_get_disk_usage(dpath), 1)
-            stats[f"disk_free_gb:{dpath}"] = round(_get_disk_free_gb(dpath), 1)
-
-    if "gpu" in include and has_extra_deps_gpu():
-        for gpu in get_gpus():
-            stats[f"gpu_util_perc:{gpu.id}"] = round(gpu.load * 100)
-            stats[f"gpu_mem_perc:{gpu.id}"] = round(gpu.memoryUtil * 100, 1)
-            stats[f"gpu_temp:{gpu.id}"] = round(gpu.temperature, 1)
-            stats[f"gpu_mem_used_mb:{gpu.id}"] = int(gpu.memoryUsed)
-            stats[f"gpu_mem_total_mb:{gpu.id}"] = int(gpu.memoryTotal)
+    for provider in get_providers(include):
+        try:
+            provider.collect(stats)
+        except Exception as ex:  # pylint: disable=broad-except
+            LOGGER.warning(f"Failed to collect stats of provider {provider.name}: {ex}")
 
     return stats
 
 
+def make_subsample_probes(include: ProvidersSetType = None) -> typing.List[ProbeType]:
+    """Cheap probes for the high-frequency :class:`SubSampler`."""
+    probes = list()
+    for provider in get_providers(include):
+        probes.extend(provider.make_probes())
+    return probes
+
+
 def stats2rows(
     stats_list: typing.List[typing.Dict[str, typing.Union[float, int]]]
 ) -> typing.Optional[typing.Tuple[typing.Tuple[str, typing.List]]]:
     if not stats_list:
         return None
-    names = tuple(stats_list[0].keys())
+    # devices (network interfaces, disks, GPUs) may appear or vanish,
+    # so collect the union of all names and fill gaps with None
+    names = tuple(dict.fromkeys(name for s in stats_list for name in s.keys()))
     # TODO: need to order by _id/_datetime values?
     # TODO: filter those values?
-    series = list(zip(*[tuple(s.values()) for s in stats_list]))
+    series = list(zip(*[tuple(s.get(name) for name in names) for s in stats_list]))
     return tuple(zip(names, series))
 
 
 def plot_rows(
-    data_series: typing.Tuple[typing.Tuple[str, typing.List]], as_data_uri: bool = True
+    data_series: typing.Tuple[typing.Tuple[str, typing.List]],
+    as_data_uri: bool = True,
+    ylims: typing.Optional[typing.Dict[str, typing.Tuple[float, float]]] = None,
+    backend: typing.Optional[str] = None,
 ) -> typing.Optional[typing.Union[str, bytes]]:
-    if not has_extra_deps_plot():
+    """Plot each metric into a subplot, with a shared time axis.
+
+    Parameters
+    ----------
+    backend : typing.Optional[str], optional
+        "matplotlib" or "builtin" (:mod:`pngplot`, lower quality but no
+        dependencies and much faster), by default matplotlib if
+        available, else builtin
+    """
+    if backend is None:
+        backend = "matplotlib" if has_extra_deps_plot() else "builtin"
+    if backend == "matplotlib" and not has_extra_deps_plot():
         return None
 
+    meta_series = [ds for ds in data_series if ds[0].startswith("_")]
+    data_series = [ds for ds in data_series if not ds[0].startswith("_")]
+
+    # too many devices for a subplot each, see plot_heatmap
+    data_series = [
+        ds for ds in data_series if ds[0].partition(":")[0] not in HEATMAP_METRICS
+    ]
+
+    # sub-sampled aggregates are drawn into the plot of their plain metric
+    aggregate_series = defaultdict(dict)
+    for name, series in data_series:
+        base_name, agg = split_aggregate_name(name)
+        if agg is not None:
+            aggregate_series[base_name][agg] = series
+    data_series = [ds for ds in data_series if split_aggregate_name(ds[0])[1] is None]
+
+    if backend == "builtin":
+        timestamps = [vs for n, vs in meta_series if n == "_datetime"]
+        plot_bytes = render_line_charts(
+            timestamps[0] if timestamps else (),
+            [
+                ChartPanel(
+                    title=name,
+                    values=series,
+                    ylim=ylims.get(name) if ylims else None,
+                    band=(
+                        (aggregate_series[name]["min"], aggregate_series[name]["max"])
+                        if {"min", "max"} <= aggregate_series.get(name, dict()).keys()
+                        else None
+                    ),
+                    mean=aggregate_series.get(name, dict()).get("mean"),
+                )
+                for name, series in data_series
+            ],
+        )
+        if plot_bytes is None or not as_data_uri:
+            return plot_bytes
+        return f"data:image/png;base64,{b64encode(plot_bytes).decode()}"
+
     # pylint: disable=import-outside-toplevel
 
     # import matplotlib.dates as mdates
-    import matplotlib.pyplot as plt
+    # figures not created with pyplot are not registered globally and are
+    # freed with the last reference (pyplot figures live until closed)
+    from matplotlib.figure import Figure
 
     # pylint: enable=import-outside-toplevel
 
-    meta_series = [ds for ds in data_series if ds[0].startswith("_")]
-    data_series = [ds for ds in data_series if not ds[0].startswith("_")]
-
     # how many subplots
     nrows = len(data_series)
     ncols = 2
@@ -129,7 +173,7 @@ def plot_rows(
     # plt.gca().xaxis.set_major_locator(mdates.DayLocator(interval=1))
 
     # fig, axes = plt.subplots(int((nrows + ncols - 1) / ncols), ncols, sharex=True, figsize=(8, 10))
-    fig = plt.figure(figsize=(8, 10))
+    fig = Figure(figsize=(8, 10))
     # how many rows / columns, round up
     plt_layout_fmt = (int((nrows + ncols - 1) / ncols), ncols)
 
@@ -139,6 +183,16 @@ def plot_rows(
         ax = fig.add_subplot(*(plt_layout_fmt + (axis_nr,)))
         # plot
         ax.plot(x, series)
+        # sub-sampled min/max band and mean
+        aggs = aggregate_series.get(name)
+        if aggs:
+            if "min" in aggs and "max" in aggs:
+                ax.fill_between(x, aggs["min"], aggs["max"], alpha=0.3)
+            if "mean" in aggs:
+                ax.plot(x, aggs["mean"], linestyle="--", linewidth=0.8)
+        # precomputed y-axis range (saves autoscaling)
+        if ylims and name in ylims:
+            ax.set_ylim(*ylims[name])
         # set plot title
         ax.set_title(name)
 
@@ -157,9 +211,9 @@ def plot_rows(
         #    ax.set_xlabel("")
         pass
 
-    plt.gcf().autofmt_xdate()
+    fig.autofmt_xdate()
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     # serialize result
     bbuf = BytesIO()
@@ -172,6 +226,60 @@ def plot_rows(
     return bbuf.getvalue()
 
 
+def plot_heatmap(
+    timestamps: typing.Sequence[int],
+    labels: typing.Sequence[str],
+    matrix: typing.Sequence[typing.Sequence[float]],
+    title: str = "",
+    as_data_uri: bool = True,
+    vmin: float = 0.0,
+    vmax: float = 100.0,
+) -> typing.Optional[typing.Union[str, bytes]]:
+    """Plot a (device x time) matrix, e. g. utilisation per CPU core, as
+    heatmap with a single ``imshow`` call. Samples are assumed to be
+    (roughly) equidistant, missing values (``NaN``) stay blank."""
+    if not has_extra_deps_plot() or not timestamps or not matrix:
+        return None
+
+    # pylint: disable=import-outside-toplevel
+    import matplotlib.dates as mdates
+    from matplotlib.figure import Figure
+
+    # pylint: enable=import-outside-toplevel
+
+    start = mdates.date2num(datetime.datetime.utcfromtimestamp(timestamps[0]))
+    end = mdates.date2num(datetime.datetime.utcfromtimestamp(timestamps[-1]))
+    if end <= start:
+        end = start + 1 / 24 / 60
+
+    fig = Figure(figsize=(10, min(12, max(4, len(labels) * 0.1 + 2))))
+    ax = fig.add_subplot(1, 1, 1)
+    image = ax.imshow(
+        matrix,
+        aspect="auto",
+        interpolation="nearest",
+        extent=(start, end, len(labels) - 0.5, -0.5),
+        vmin=vmin,
+        vmax=vmax,
+        cmap="inferno",
+    )
+    ax.xaxis_date()
+    if len(labels) <= 32:
+        ax.set_yticks(range(len(labels)))
+        ax.set_yticklabels(labels)
+    ax.set_title(title)
+    fig.colorbar(image, ax=ax)
+    fig.autofmt_xdate()
+    fig.tight_layout()
+
+    bbuf = BytesIO()
+    fig.savefig(bbuf, format="png")
+
+    if as_data_uri:
+        return f"data:image/png;base64,{b64encode(bbuf.getvalue()).decode()}"
+    return bbuf.getvalue()
+
+
 # ---------------------------------------------------------------------------
 
 
@@ -199,11 +307,34 @@ class ObservableLimit(typing.NamedTuple):
     #: badness threshold if reached, a message is sent, None for default
     #: allows for fluctuations until message is sent
     badness_threshold: typing.Optional[int] = None
+    #: name of the collected stats (history column) with the same values,
+    #: used to replay recorded stats, None if not collected
+    column: typing.Optional[str] = None
+    #: check faster near the threshold and less often if far from it,
+    #: False to check in every observer run (e. g. event-like checks)
+    adaptive: bool = True
+
+
+class LimitEvent(typing.NamedTuple):
+    #: UTC timestamp
+    timestamp: float
+    #: "alert" or "recovery"
+    kind: str
+    #: name of the limit
+    name: str
+    #: value that triggered the event
+    value: typing.Optional[float] = None
+    threshold: typing.Optional[float] = None
+    unit: str = ""
 
 
 class BadCounterManager:
     """Manager that gathers badness values for keys with
-    individual thresholds and increments."""
+    individual thresholds and increments.
+
+    Increments and decrements can be weighted (fraction of a step), e. g.
+    by the time since the last check, so that alerts take the same time
+    independent of how often limits are checked."""
 
     def __init__(
         self,
@@ -224,8 +355,12 @@ class BadCounterManager:
             for name_ in self.bad_counters.keys():
                 self.bad_counters[name_] = 0
 
-    def increase_counter(self, name: str, limit: ObservableLimit) -> bool:
-        """Increse the badness level and return True if threshold reached."""
+    def increase_counter(
+        self, name: str, limit: ObservableLimit, weight: float = 1.0
+    ) -> bool:
+        """Increse the badness level and return True if threshold reached.
+        Limits that notify on the first failed check (increment not below
+        threshold) are not weighted."""
         bad_threshold = (
             limit.badness_threshold
             if limit.badness_threshold is not None
@@ -237,13 +372,21 @@ class BadCounterManager:
             else self.default_increase
         )
 
-        # increse value
-        self.bad_counters[name] = min(bad_threshold, self.bad_counters[name] + bad_inc)
+        if bad_inc < bad_threshold:
+            bad_inc *= weight
+
+        # increse value (rounded, weighted steps should add up exactly)
+        self.bad_counters[name] = round(
+            min(bad_threshold, self.bad_counters[name] + bad_inc), 6
+        )
 
         return self.threshold_reached(name, limit)
 
     def decrease_counter(
-        self, name: str, limit: typing.Optional[ObservableLimit] = None
+        self,
+        name: str,
+        limit: typing.Optional[ObservableLimit] = None,
+        weight: float = 1.0,
     ) -> bool:
         """Decrease the badness counter and return True if normal."""
         if self.bad_counters[name] > 0:
@@ -253,7 +396,9 @@ class BadCounterManager:
                 else self.default_decrease
             )
 
-            self.bad_counters[name] = max(0, self.bad_counters[name] - bad_dec)
+            self.bad_counters[name] = round(
+                max(0, self.bad_counters[name] - bad_dec * weight), 6
+            )
 
         return self.is_normal(name)
 
@@ -298,7 +443,10 @@ class NotifyBadCounterManager(BadCounterManager):
                 self.notified[name_] = False
 
     def decrease_counter(
-        self, name: str, limit: typing.Optional[ObservableLimit] = None
+        self,
+        name: str,
+        limit: typing.Optional[ObservableLimit] = None,
+        weight: float = 1.0,
     ) -> bool:
         """Decrease the counter and reset the notification flag
         if the normal level has been reached.
@@ -306,7 +454,7 @@ class NotifyBadCounterManager(BadCounterManager):
         (for a one-time notification setup)."""
         was_normal_before = self.is_normal(name)
         has_notified_before = self.notified[name]
-        is_normal = super().decrease_counter(name, limit=limit)
+        is_normal = super().decrease_counter(name, limit=limit, weight=weight)
         if is_normal:
             self.notified[name] = False
         # return True if changed, else False if it was already normal
@@ -328,6 +476,111 @@ class NotifyBadCounterManager(BadCounterManager):
         self.notified[name] = True
 
 
+class _CheckState(typing.NamedTuple):
+    value: typing.Optional[float]
+    timestamp: float
+    interval: float
+    next_due: float
+
+
+class AdaptiveCheckScheduler:
+    """Per-limit check intervals, driven by the distance to the threshold.
+
+    Limits that are exceeded or close to their threshold (relative
+    distance ``near``) are checked every ``min_interval`` seconds. Limits
+    that move towards their threshold are checked so that the estimated
+    time until it is reached spans at least ``lookahead`` checks. Far away
+    and stable limits back off exponentially (factor ``backoff``), up to
+    ``max_interval`` seconds.
+
+    Badness values were tuned for a check every ``period`` seconds,
+    :meth:`weight` scales them to the actual time between checks."""
+
+    def __init__(
+        self,
+        min_interval: float = 60.0,
+        max_interval: float = 600.0,
+        near: float = 0.1,
+        lookahead: float = 4.0,
+        backoff: float = 2.0,
+        period: float = 300.0,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.near = near
+        self.lookahead = lookahead
+        self.backoff = backoff
+        self.period = period
+        self._states: typing.Dict[str, _CheckState] = dict()
+
+    def reset(self, name: typing.Optional[str] = None) -> None:
+        """Check (all) limits again in the next run."""
+        if name is not None:
+            self._states.pop(name, None)
+        else:
+            self._states.clear()
+
+    def interval(self, name: str) -> float:
+        """Current check interval (seconds) of a limit."""
+        state = self._states.get(name)
+        return state.interval if state is not None else self.min_interval
+
+    def is_due(self, name: str, now: typing.Optional[float] = None) -> bool:
+        """Return True if the limit should be checked now."""
+        state = self._states.get(name)
+        if state is None:
+            return True
+        if now is None:
+            now = time.monotonic()
+        # observer runs are not exactly on time, do not skip a whole run
+        return now + self.min_interval / 2 >= state.next_due
+
+    def weight(self, name: str, now: typing.Optional[float] = None) -> float:
+        """Time since the last check of the limit, as fraction of
+        ``period`` (at most 1), to weight badness changes. Call before
+        :meth:`update`."""
+        state = self._states.get(name)
+        if state is None:
+            return 1.0
+        if now is None:
+            now = time.monotonic()
+        return min(1.0, max(0.0, now - state.timestamp) / self.period)
+
+    def update(
+        self,
+        name: str,
+        value: typing.Optional[float],
+        limit: ObservableLimit,
+        is_ok: bool,
+        now: typing.Optional[float] = None,
+    ) -> float:
+        """Record a check result and return the next check interval."""
+        if now is None:
+            now = time.monotonic()
+        state = self._states.get(name)
+
+        interval = self.min_interval
+        if limit.adaptive and is_ok and value is not None:
+            distance = abs(limit.threshold - value)
+            if distance > self.near * max(abs(limit.threshold), 1e-9):
+                # far away, back off
+                if state is not None:
+                    interval = state.interval * self.backoff
+                # but not beyond the (estimated) time to reach the threshold
+                if state is not None and state.value is not None:
+                    elapsed = now - state.timestamp
+                    # signed, moving away from the threshold is no hurry
+                    direction = 1.0 if limit.threshold > value else -1.0
+                    change = (value - state.value) * direction
+                    if elapsed > 0 and change > 0:
+                        time_left = distance / (change / elapsed)
+                        interval = min(interval, time_left / self.lookahead)
+
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        self._states[name] = _CheckState(value, now, interval, now + interval)
+        return interval
+
+
 # ---------------------------------------------------------------------------
 
 
@@ -339,127 +592,72 @@ def make_observable_limits(
         "disk_gb",
         "gpu_load",
         "gpu_temp",
-    )
+        "net",
+        "diskio",
+        "temp",
+    ),
+    providers: ProvidersSetType = None,
 ) -> typing.Dict[str, ObservableLimit]:
+    """Limits of the given types, from all (available) ``providers``.
+    If ``include`` is None, each provider's default limit types are used
+    (critical ones, more for early warnings)."""
     limits = dict()
 
-    if include is None:
-        # critical: more for early warnings
-        include = ("disk", "disk_gb", "gpu_temp")
+    for provider in get_providers(providers):
+        if include is None:
+            limit_types = provider.default_limit_types
+        else:
+            limit_types = [name for name in include if name in provider.limit_types]
+        if not limit_types:
+            continue
+        limits.update(provider.make_limits(limit_types))
+
+    return limits
 
-        # more for notification purposes (if free or not)
-        # include += ("cpu", "ram", "gpu_load")
 
-    if "cpu" in include:
-        limits["cpu_load_5min"] = ObservableLimit(
-            name="CPU Load Avg [5min]",
-            fn_retrieve=lambda: round(_get_loadavg()[1], 1),
-            fn_check=lambda cur, thres: cur < thres,
-            unit="%",
-            threshold=95.0,
-            message="**CPU Load Avg [5min]** is too high! (value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`",
-            # increase badness level by 2
-            badness_inc=2,
-            # notify, when badness counter reached 6
-            badness_threshold=6,
-        )
+def make_watch_limits(
+    watcher: ProcessWatcher, watch: ProcessWatch
+) -> typing.Dict[str, ObservableLimit]:
+    """Limits for a watched process: notify when it exited (or never
+    started) and, if ``watch.max_rss_gb`` is set, when it grows past it."""
+    limits = dict()
+
+    limits[f"proc_count:{watch.key}"] = ObservableLimit(
+        name=f"Process: {watch.target}",
+        fn_retrieve=partial(watcher.get, watch.target, "proc_count"),
+        # only alert for processes that have been running before
+        fn_check=lambda cur, thres: cur > thres or not watch.seen,
+        unit="",
+        threshold=0,
+        message=(
+            f"**Process `{watch.target}`** is not running (anymore)! "
+            "(processes: `{cur_value:.0f}`)"
+        ),
+        # notify immediately
+        badness_inc=1,
+        badness_threshold=1,
+        column=f"proc_count:{watch.key}",
+        # exits are events, there is no distance to the threshold
+        adaptive=False,
+    )
 
-    if "ram" in include:
-        limits["mem_util"] = ObservableLimit(
-            name="Memory Utilisation",
-            fn_retrieve=lambda: round(_get_mem_util(), 1),
+    if watch.max_rss_gb:
+        limits[f"proc_rss_mb:{watch.key}"] = ObservableLimit(
+            name=f"Process Memory: {watch.target}",
+            fn_retrieve=partial(watcher.get, watch.target, "proc_rss_mb"),
             fn_check=lambda cur, thres: cur < thres,
-            unit="%",
-            threshold=85.0,
-            message="**Memory Usage** is too high! (value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`",
-            # increase badness level by 1
+            unit="MB",
+            threshold=watch.max_rss_gb * 1024,
+            message=(
+                f"**Process `{watch.target}`** uses too much memory! "
+                "(value: `{cur_value:.0f}{unit}`, threshold: `{threshold:.0f}{unit})`"
+            ),
+            # notify immediately
             badness_inc=1,
-            # notify, when badness counter reached 3
-            badness_threshold=3,
+            badness_threshold=1,
+            column=f"proc_rss_mb:{watch.key}",
         )
 
-    if "disk" in include or "disk_gb" in include:
-        for i, path in enumerate(_get_disk_paths()):
-            if "disk" in include:
-                limits[f"disk_util_perc{i}"] = ObservableLimit(
-                    name=f"Disk Usage: {path}",
-                    fn_retrieve=partial(_get_disk_usage, path),
-                    fn_check=lambda cur, thres: cur < thres,
-                    unit="%",
-                    threshold=95.0,
-                    message=(
-                        f"**Disk Usage for `{path}`** is too high! "
-                        "(value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`"
-                    ),
-                    # use default increment amount
-                    badness_inc=None,
-                    # notify immediately
-                    badness_threshold=None,
-                )
-
-            # TODO: disable the static values test if system has less or not significantly more total disk space
-            if "disk_gb" in include:
-
-                def _round_get_disk_gree_gb(path):
-                    return round(_get_disk_free_gb(path), 1)
-
-                limits[f"disk_util_gb{i}"] = ObservableLimit(
-                    name=f"Disk Space (Free): {path}",
-                    fn_retrieve=partial(_round_get_disk_gree_gb, path),
-                    fn_check=lambda cur, thres: cur > thres,
-                    unit="GB",
-                    # currently a hard-coded limit of 30GB (for smaller systems (non-servers) unneccessary?)
-                    threshold=30.0,
-                    message=(
-                        "No more **Disk Space for `{path}`**! "
-                        "(value: `{cur_value:.1f}GB`, threshold: `{threshold:.1f})`"
-                    ),
-                    # use default increment amount
-                    badness_inc=None,
-                    # notify immediately
-                    badness_threshold=None,
-                )
-
-    if ("gpu_load" in include or "gpu_temp" in include) and has_extra_deps_gpu():
-        for gpu in get_gpus():
-            # NOTE: may be useful if you just want to know when GPU is free for new stuff ...
-            if "gpu_load" in include:
-                limits[f"gpu_util_perc:{gpu.id}"] = ObservableLimit(
-                    name=f"GPU {gpu.id} Utilisation",
-                    fn_retrieve=partial(_get_gpu_util, gpu.id),
-                    fn_check=lambda cur, thres: cur < thres,
-                    unit="%",
-                    threshold=85,
-                    message="**GPU {gpu.id} Utilisation** is working! (value: `{cur_value}%`, threshold: `{threshold})`",
-                    # increase by 2, decrease by 1
-                    badness_inc=2,
-                    badness_threshold=6,
-                )
-                limits[f"gpu_mem_perc:{gpu.id}"] = ObservableLimit(
-                    name=f"GPU {gpu.id} Memory Utilisation",
-                    fn_retrieve=partial(_get_gpu_mem_load, gpu.id),
-                    fn_check=lambda cur, thres: cur < thres,
-                    unit="%",
-                    threshold=85.0,
-                    message="**GPU {gpu.id} Memory** is full! (value: `{cur_value:.1f}%`, threshold: `{threshold:.1f})`",
-                    # increase by 2, decrease by 1
-                    badness_inc=2,
-                    badness_threshold=6,
-                )
-
-            if "gpu_temp" in include:
-                limits[f"gpu_util_perc:{gpu.id}"] = ObservableLimit(
-                    name=f"GPU {gpu.id} Temperature",
-                    fn_retrieve=partial(_get_gpu_temp, gpu.id),
-                    fn_check=lambda cur, thres: cur < thres,
-                    unit="°C",
-                    threshold=90,
-                    message="**GPU {gpu.id} Temperature** too high! (value: `{cur_value:.1f}{unit}`, threshold: `{threshold:.1f}{unit})`",
-                    # 3 times the charm
-                    badness_inc=1,
-                    badness_threshold=3,
-                )
-
     return limits
 
 
@@ -6,11 +6,13 @@ from datetime import timedelta
 import psutil
 from psutil._common import bytes2human
 
+from discord_system_observer_bot.rates import CounterRates
 from discord_system_observer_bot.utils import make_table
 
 
 Percentage100Type = float
 SizeGBType = float
+RateType = float
 
 
 # ---------------------------------------------------------------------------
@@ -20,6 +22,27 @@ def _get_loadavg() -> typing.List[Percentage100Type]:
     return [x / psutil.cpu_count() * 100 for x in psutil.getloadavg()]
 
 
+def _get_cpu_util() -> Percentage100Type:
+    """CPU utilisation since the last call (non-blocking)."""
+    return psutil.cpu_percent(interval=None)
+
+
+def _get_cpu_util_percpu() -> typing.List[Percentage100Type]:
+    """Utilisation per logical core since the last call (non-blocking)."""
+    return psutil.cpu_percent(interval=None, percpu=True)
+
+
+def _get_cpu_times_perc() -> typing.Dict[str, Percentage100Type]:
+    """Share of time spent waiting for I/O and stolen by the hypervisor
+    since the last call (non-blocking), only available on Linux."""
+    times = psutil.cpu_times_percent(interval=None)
+    return {
+        field: getattr(times, field)
+        for field in ("iowait", "steal")
+        if hasattr(times, field)
+    }
+
+
 def _get_mem_util() -> Percentage100Type:
     mem = psutil.virtual_memory()
     return mem.used / mem.total * 100
@@ -55,6 +78,99 @@ def _get_disk_free_gb(path: str) -> SizeGBType:
 # ---------------------------------------------------------------------------
 
 
+def make_net_rates(min_interval: float = 1.0) -> CounterRates:
+    """Rates for :func:`_get_net_rates`, one per consumer (the baseline
+    moves with each update)."""
+    return CounterRates(("bytes_recv", "bytes_sent"), min_interval=min_interval)
+
+
+def make_disk_io_rates(min_interval: float = 1.0) -> CounterRates:
+    """Rates for :func:`_get_disk_io_rates`, one per consumer."""
+    return CounterRates(
+        ("read_count", "write_count", "read_bytes", "write_bytes", "busy_time"),
+        min_interval=min_interval,
+    )
+
+
+def _get_nic_list() -> typing.List[str]:
+    return [
+        nic
+        for nic, stats in psutil.net_if_stats().items()
+        if stats.isup and nic != "lo"
+    ]
+
+
+def _get_nic_speed(nic: str) -> int:
+    """Link speed in Mbit/s, zero if unknown (e. g. virtual interfaces)."""
+    stats = psutil.net_if_stats().get(nic)
+    return stats.speed if stats is not None else 0
+
+
+def _get_disk_io_list() -> typing.List[str]:
+    return [
+        disk
+        for disk in (psutil.disk_io_counters(perdisk=True) or {}).keys()
+        if not disk.startswith(("loop", "ram"))
+    ]
+
+
+def _get_net_rates(
+    counter_rates: CounterRates,
+) -> typing.Dict[str, typing.Dict[str, RateType]]:
+    """Per-interface network throughput rates in bytes/s, since the last
+    update of ``counter_rates`` (see :func:`make_net_rates`)."""
+    nics = set(_get_nic_list())
+    counters = psutil.net_io_counters(pernic=True)
+    return counter_rates.update({k: v for k, v in counters.items() if k in nics})
+
+
+def _get_disk_io_rates(
+    counter_rates: CounterRates,
+) -> typing.Dict[str, typing.Dict[str, RateType]]:
+    """Per-device disk operation (1/s), byte (bytes/s) and busy time
+    (ms/s) rates, since the last update of ``counter_rates`` (see
+    :func:`make_disk_io_rates`)."""
+    disks = set(_get_disk_io_list())
+    counters = psutil.disk_io_counters(perdisk=True) or {}
+    return counter_rates.update({k: v for k, v in counters.items() if k in disks})
+
+
+def _net_util(
+    nic: str, rates: typing.Dict[str, typing.Dict[str, RateType]]
+) -> Percentage100Type:
+    """Link utilisation of the busier direction (full duplex) from the
+    rates of :func:`_get_net_rates`. Zero until a rate is available."""
+    speed = _get_nic_speed(nic)
+    nic_rates = rates.get(nic)
+    if not speed or not nic_rates:
+        return 0.0
+    bits = max(nic_rates["bytes_recv"], nic_rates["bytes_sent"]) * 8
+    return bits / (speed * 1000 ** 2) * 100
+
+
+def _disk_busy(
+    disk: str, rates: typing.Dict[str, typing.Dict[str, RateType]]
+) -> Percentage100Type:
+    """Percentage of time the device was busy with I/O from the rates of
+    :func:`_get_disk_io_rates`. Zero until a rate is available."""
+    disk_rates = rates.get(disk)
+    if not disk_rates:
+        return 0.0
+    # busy_time is in ms, so ms/s divided by 1000 ms/s times 100 %
+    return min(100.0, disk_rates["busy_time"] / 10)
+
+
+def _get_net_util(nic: str, counter_rates: CounterRates) -> Percentage100Type:
+    return _net_util(nic, _get_net_rates(counter_rates))
+
+
+def _get_disk_busy(disk: str, counter_rates: CounterRates) -> Percentage100Type:
+    return _disk_busy(disk, _get_disk_io_rates(counter_rates))
+
+
+# ---------------------------------------------------------------------------
+
+
 def get_cpu_info() -> str:
     meminfo = psutil.virtual_memory()
     GB_div = 1024 ** 3  # pylint: disable=invalid-name
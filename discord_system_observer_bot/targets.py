@@ -0,0 +1,148 @@
+import logging
+import typing
+from collections import defaultdict, deque
+
+from discord_system_observer_bot.cgroups import CgroupProvider
+from discord_system_observer_bot.history import StatsHistory
+from discord_system_observer_bot.providers import ProvidersSetType, get_providers
+from discord_system_observer_bot.sampler import ProbeType
+from discord_system_observer_bot.snapshot import SnapshotCache, take_snapshot
+from discord_system_observer_bot.statsobserver import collect_stats
+from discord_system_observer_bot.statsobserver import make_observable_limits
+from discord_system_observer_bot.statsobserver import make_subsample_probes
+from discord_system_observer_bot.statsobserver import (
+    AdaptiveCheckScheduler,
+    LimitEvent,
+    LimitTypesSetType,
+    NotifyBadCounterManager,
+    ObservableLimit,
+)
+from discord_system_observer_bot.windowrules import WindowRule, WindowRuleEvaluator
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: number of alert/recovery events kept per target (for reports)
+MAX_LIMIT_EVENTS = 1000
+
+
+# ---------------------------------------------------------------------------
+
+
+def make_history(
+    compress: bool = False, budget_mb: typing.Optional[float] = None
+) -> StatsHistory:
+    """History for collected stats, bounded by memory or (by default) to
+    the samples of a week."""
+    if budget_mb:
+        # retention by memory, older samples are down-sampled/evicted
+        return StatsHistory(compress=compress, max_bytes=int(budget_mb * 1024 ** 2))
+
+    # for a total of a week
+    #   10 / 60 how often per minute,
+    #     times minutes in hour, hours in day, days in week
+    num = 10 / 60 * 60 * 24 * 7
+    return StatsHistory(maxlen=round(num), compress=compress)
+
+
+class ObservationTarget:
+    """An observed system, e. g. the host or a container (cgroup), with
+    its own metric providers, limits, badness state, alert events and
+    history. All targets of a bot share the gateway connection and are
+    sampled/checked in the same task loop runs, limits are only checked
+    when due (see :class:`AdaptiveCheckScheduler`)."""
+
+    def __init__(
+        self,
+        name: str,
+        providers: ProvidersSetType = None,
+        history: typing.Optional[StatsHistory] = None,
+        snapshot_ttl: float = 10.0,
+        min_check_interval: float = 60.0,
+        max_check_interval: float = 600.0,
+    ):
+        self.name = name
+        #: resolved once, providers may keep state (e. g. counter rates)
+        self.providers = get_providers(providers)
+        self.history = history if history is not None else make_history()
+
+        self.limits: typing.Dict[str, ObservableLimit] = dict()
+        self.bad_checker = NotifyBadCounterManager()
+        #: when to check which limit
+        self.scheduler = AdaptiveCheckScheduler(
+            min_interval=min_check_interval, max_interval=max_check_interval
+        )
+        #: notification counters
+        self.counters: typing.Dict[str, int] = defaultdict(int)
+        #: sustained conditions, evaluated over the collected stats
+        self.window_rules = WindowRuleEvaluator()
+        #: alerts and recoveries (for reports)
+        self.events: typing.Deque[LimitEvent] = deque(maxlen=MAX_LIMIT_EVENTS)
+
+        # shared by on-demand commands, to avoid probing for each command
+        self.snapshots = SnapshotCache(
+            lambda version, limits: take_snapshot(
+                limits, version, providers=self.providers
+            ),
+            ttl=snapshot_ttl,
+            # copied on the event loop, commands may add/remove limits
+            fn_state=lambda: dict(self.limits),
+        )
+
+    def __repr__(self) -> str:
+        providers = ", ".join(provider.name for provider in self.providers)
+        return f"<{type(self).__name__} {self.name!r} [{providers}]>"
+
+    def init_limits(self, limits_types: LimitTypesSetType = None) -> None:
+        self.limits.update(
+            make_observable_limits(include=limits_types, providers=self.providers)
+        )
+
+    def add_window_rules(self, rules: typing.Iterable[WindowRule]) -> None:
+        for rule in rules:
+            self.window_rules.add(rule)
+        self.limits.update(self.window_rules.make_limits())
+
+    def collect_stats(self) -> typing.Dict[str, typing.Union[float, int]]:
+        return collect_stats(include=self.providers)
+
+    def append_stats(self, stats: typing.Dict[str, typing.Union[float, int]]) -> None:
+        """Store collected stats in the history and update window rules."""
+        self.history.append(stats)
+        self.window_rules.update(stats)
+
+    def make_probes(self) -> typing.List[ProbeType]:
+        return make_subsample_probes(include=self.providers)
+
+
+def make_cgroup_target(name: str, path: str, **kwargs) -> ObservationTarget:
+    """Target for a control group (container, systemd unit, ...), see
+    :class:`~discord_system_observer_bot.cgroups.CgroupReader` for the path."""
+    provider = CgroupProvider(path)
+    if not provider.is_available():
+        # e. g. container not (yet) started, values are missing until then
+        LOGGER.warning(f"Cgroup of target {name} not found: {provider.reader.path}")
+    return ObservationTarget(name, providers=[provider], **kwargs)
+
+
+def parse_target_specs(specs: typing.Iterable[str]) -> typing.Dict[str, str]:
+    """Parse ``name=cgroup-path`` target specifications.
+
+    Raises
+    ------
+    ValueError
+        on invalid or duplicate specifications
+    """
+    targets = dict()
+    for spec in specs:
+        name, sep, path = (part.strip() for part in spec.partition("="))
+        if not sep or not name or not path:
+            raise ValueError(f"Invalid target (expected name=cgroup-path): {spec}")
+        if name in targets or name == "*":
+            raise ValueError(f"Invalid or duplicate target name: {name}")
+        targets[name] = path
+    return targets
+
+
+# ---------------------------------------------------------------------------
@@ -1,3 +1,7 @@
+import datetime
+import math
+import re
+import time
 import typing
 
 
@@ -127,6 +131,39 @@ def make_table(
     return table_str
 
 
+#: eight levels of block elements, lowest to highest
+SPARK_CHARS = "\u2581\u2582\u2583\u2584\u2585\u2586\u2587\u2588"
+
+
+def make_sparkline(
+    values: typing.Sequence[typing.Optional[float]],
+    vmin: typing.Optional[float] = None,
+    vmax: typing.Optional[float] = None,
+) -> str:
+    """Render values as a line of Unicode block characters, one per
+    value, scaled between ``vmin`` and ``vmax`` (default: range of the
+    values). Missing values (``None``, ``NaN``) are blank."""
+    present = [v for v in values if v is not None and not math.isnan(v)]
+    if not present:
+        return " " * len(values)
+    if vmin is None:
+        vmin = min(present)
+    if vmax is None:
+        vmax = max(present)
+    span = vmax - vmin
+
+    chars = list()
+    for value in values:
+        if value is None or math.isnan(value):
+            chars.append(" ")
+        elif span <= 0:
+            chars.append(SPARK_CHARS[len(SPARK_CHARS) // 2])
+        else:
+            level = int((value - vmin) / span * (len(SPARK_CHARS) - 1) + 0.5)
+            chars.append(SPARK_CHARS[min(max(level, 0), len(SPARK_CHARS) - 1)])
+    return "".join(chars)
+
+
 def dump_dict_kv(
     dict_kv: typing.Dict[str, typing.Any], wrap_markdown: bool = True
 ) -> typing.Optional[str]:
@@ -152,3 +189,127 @@ def dump_dict_kv(
     )
 
     return text
+
+
+# ---------------------------------------------------------------------------
+
+
+_DURATION_UNITS = {
+    "s": 1,
+    "m": 60,
+    "h": 60 * 60,
+    "d": 60 * 60 * 24,
+    "w": 60 * 60 * 24 * 7,
+}
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)([smhdw])")
+_DATETIME_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+)
+
+
+def parse_duration(text: str) -> typing.Optional[float]:
+    """Parse durations like ``90s``, ``15m``, ``6h``, ``1d12h`` or ``2w``
+    into seconds. Returns ``None`` if not a duration."""
+    text = text.strip().lower()
+    if not text or _DURATION_PATTERN.sub("", text):
+        return None
+    return sum(
+        float(num) * _DURATION_UNITS[unit]
+        for num, unit in _DURATION_PATTERN.findall(text)
+    )
+
+
+def parse_datetime(
+    text: str, now: typing.Optional[float] = None, after: typing.Optional[float] = None
+) -> float:
+    """Parse a date/time in UTC (like the collected stats are labelled)
+    into a timestamp. A bare ``HH:MM`` refers to the most recent
+    occurrence of that time of day, or, if ``after`` is given, to the
+    first occurrence at or after it (e. g. the end of a range)."""
+    if now is None:
+        now = time.time()
+    text = text.strip()
+    utc = datetime.timezone.utc
+
+    for fmt in ("%H:%M", "%H:%M:%S"):
+        try:
+            clock = datetime.datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+        if after is not None:
+            ref = datetime.datetime.fromtimestamp(after, tz=utc)
+            value = datetime.datetime.combine(ref.date(), clock, tzinfo=utc)
+            if value < ref:
+                value += datetime.timedelta(days=1)
+            return value.timestamp()
+        today = datetime.datetime.fromtimestamp(now, tz=utc)
+        value = datetime.datetime.combine(today.date(), clock, tzinfo=utc)
+        if value > today:
+            value -= datetime.timedelta(days=1)
+        return value.timestamp()
+
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).replace(tzinfo=utc).timestamp()
+        except ValueError:
+            continue
+
+    raise ValueError(f"Invalid date/time: {text!r}")
+
+
+def parse_timerange(
+    text: typing.Optional[str], now: typing.Optional[float] = None
+) -> typing.Tuple[typing.Optional[float], typing.Optional[float]]:
+    """Parse a time range into ``(start, end)`` UTC timestamps,
+    ``None`` for open ends.
+
+    Supported forms:
+
+    * empty or ``all``: everything
+    * ``6h`` (duration): the last six hours
+    * ``@03:00``: up to that time (e. g. for the ``last`` value then)
+    * ``03:00..05:00``, ``2020-05-01..``, ``..12:00``: explicit range,
+      each end can also be a duration (ago), like ``2d..1d``, a bare
+      time as end is the first one at or after the start
+
+    Dates and times are in UTC, like the collected stats are displayed.
+
+    Raises
+    ------
+    ValueError
+        if the range can't be parsed or its start is after its end
+    """
+    if now is None:
+        now = time.time()
+    text = (text or "").strip()
+
+    if not text or text.lower() == "all":
+        return None, None
+
+    if text.startswith("@"):
+        return None, parse_datetime(text[1:], now=now)
+
+    def _parse_point(value, after=None):
+        if not value:
+            return None
+        duration = parse_duration(value)
+        if duration is not None:
+            return now - duration
+        return parse_datetime(value, now=now, after=after)
+
+    if ".." in text:
+        start, _, end = text.partition("..")
+        start = _parse_point(start)
+        end = _parse_point(end, after=start)
+        if start is not None and end is not None and start > end:
+            raise ValueError(f"Start of time range is after its end: {text!r}")
+        return start, end
+
+    duration = parse_duration(text)
+    if duration is None:
+        raise ValueError(f"Invalid time range: {text!r}")
+    return now - duration, None
@@ -0,0 +1,150 @@
+import asyncio
+import datetime
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import typing
+from collections import deque
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: frames from this package are preferred as "offending" function
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class StallRecord(typing.NamedTuple):
+    #: (local) time the stall was detected
+    date: datetime.datetime
+    #: duration (seconds), updated once the loop responds again
+    lag: float
+    #: offending function, ``file:line in function``
+    function: str
+    #: formatted (innermost) stack frames of the loop thread
+    stack: str
+
+
+# ---------------------------------------------------------------------------
+
+
+def _format_frame(frame_summary: traceback.FrameSummary) -> str:
+    filename = os.path.relpath(frame_summary.filename, os.path.dirname(_PACKAGE_DIR))
+    if filename.startswith(".."):
+        filename = os.path.basename(frame_summary.filename)
+    return f"{filename}:{frame_summary.lineno} in {frame_summary.name}"
+
+
+def _find_offender(frames: typing.List[traceback.FrameSummary]) -> str:
+    """Innermost frame of this package, else the innermost frame."""
+    for frame_summary in reversed(frames):
+        if frame_summary.filename.startswith(_PACKAGE_DIR):
+            return _format_frame(frame_summary)
+    return _format_frame(frames[-1]) if frames else "?"
+
+
+class LoopWatchdog(threading.Thread):
+    """Background thread that measures the event loop lag.
+
+    Every ``interval`` seconds, a heartbeat callback is scheduled on the
+    loop (thread-safe). If it did not run within ``threshold`` seconds,
+    the loop is blocked (e. g. by a slow probe or chart rendering) and
+    the stack of the loop thread is captured with
+    ``sys._current_frames()``. The last ``capacity`` stalls are kept."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        interval: float = 0.5,
+        threshold: float = 1.0,
+        capacity: int = 20,
+        max_frames: int = 12,
+    ):
+        super().__init__(name="LoopWatchdog", daemon=True)
+        self.loop = loop
+        self.interval = interval
+        self.threshold = threshold
+        self.max_frames = max_frames
+
+        self.stalls: typing.Deque[StallRecord] = deque(maxlen=capacity)
+        self.num_heartbeats = 0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+
+        self._loop_thread_id: typing.Optional[int] = None
+        self._pending_since: typing.Optional[float] = None
+        self._captured = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        LOGGER.debug("Loop watchdog started ...")
+        while not self._stop_event.wait(self.interval):
+            now = time.monotonic()
+            with self._lock:
+                pending_since = self._pending_since
+                if pending_since is None:
+                    self._pending_since = now
+            if pending_since is None:
+                try:
+                    self.loop.call_soon_threadsafe(self._heartbeat, now)
+                except RuntimeError:
+                    # loop closed
+                    break
+            elif now - pending_since >= self.threshold and not self._captured:
+                self._capture(now - pending_since)
+        LOGGER.debug("Loop watchdog stopped.")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _heartbeat(self, sent: float) -> None:
+        # runs on the event loop
+        lag = time.monotonic() - sent
+        with self._lock:
+            self._loop_thread_id = threading.get_ident()
+            self._pending_since = None
+            self.num_heartbeats += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            if self._captured:
+                # final duration of the stall
+                self.stalls[-1] = self.stalls[-1]._replace(lag=lag)
+                self._captured = False
+
+    def _capture(self, lag: float) -> None:
+        frame = (
+            sys._current_frames().get(  # pylint: disable=protected-access
+                self._loop_thread_id
+            )
+            if self._loop_thread_id is not None
+            else None
+        )
+        frames = traceback.extract_stack(frame) if frame is not None else list()
+        frames = frames[-self.max_frames :]
+        record = StallRecord(
+            date=datetime.datetime.now(),
+            lag=lag,
+            function=_find_offender(frames),
+            stack="\n".join(_format_frame(fs) for fs in frames),
+        )
+        with self._lock:
+            self.stalls.append(record)
+            self._captured = True
+        LOGGER.debug(f"Event loop stalled for {lag:.1f}s in {record.function}")
+
+    def status(self) -> typing.Dict[str, typing.Union[int, float, str]]:
+        return {
+            "watchdog_running": self.is_alive(),
+            "watchdog_threshold_s": self.threshold,
+            "watchdog_num_heartbeats": self.num_heartbeats,
+            "watchdog_last_lag_ms": round(self.last_lag * 1000, 1),
+            "watchdog_max_lag_ms": round(self.max_lag * 1000, 1),
+            "watchdog_num_stalls": len(self.stalls),
+        }
+
+
+# ---------------------------------------------------------------------------
@@ -0,0 +1,322 @@
+import logging
+import re
+import threading
+import time
+import typing
+from collections import deque
+
+from discord_system_observer_bot.statsobserver import ObservableLimit
+from discord_system_observer_bot.utils import parse_duration
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+#: ``mean(cpu_util_perc, 10m) > 90``, ``rise(mem_used_gb, 5m) > 4``
+_AGGREGATE_PATTERN = re.compile(
+    r"^(?P<kind>mean|rise|fall)\(\s*(?P<column>[^,\s]+)\s*,\s*(?P<window>\w+)\s*\)"
+    r"\s*(?P<op>[<>])\s*(?P<threshold>[-+.\deE]+)$"
+)
+#: ``cpu_util_perc > 95 for 90% of 15m``
+_FRACTION_PATTERN = re.compile(
+    r"^(?P<column>\S+)\s*(?P<op>[<>])\s*(?P<threshold>[-+.\deE]+)"
+    r"\s+for\s+(?P<fraction>[.\d]+)\s*%\s+of\s+(?P<window>\w+)$"
+)
+
+
+# ---------------------------------------------------------------------------
+
+
+class WindowRule(typing.NamedTuple):
+    #: rule as written, used as name
+    text: str
+    #: name of the collected stats (history column)
+    column: str
+    #: "mean", "rise", "fall" or "fraction"
+    kind: str
+    #: window length in seconds
+    window: float
+    #: ">" or "<", for "fraction" the comparison of single samples
+    op: str
+    threshold: float
+    #: percent of samples in the window, only for "fraction"
+    fraction: typing.Optional[float] = None
+
+
+def parse_window_rule(text: str) -> WindowRule:
+    """Parse a window rule, forms are:
+
+    * ``mean(<column>, <window>) > <value>`` (or ``<``)
+    * ``rise(<column>, <window>) > <value>``, the increase of the last
+      sample over the minimum in the window, ``fall`` for the decrease
+    * ``<column> > <value> for <percent>% of <window>`` (or ``<``)
+
+    Windows are durations like ``90s``, ``15m`` or ``1h``.
+
+    Raises
+    ------
+    ValueError
+        if the rule can't be parsed
+    """
+    text = " ".join(text.split())
+    match = _AGGREGATE_PATTERN.match(text) or _FRACTION_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"Invalid window rule: {text}")
+    parts = match.groupdict()
+
+    window = parse_duration(parts["window"])
+    if not window:
+        raise ValueError(f"Invalid window in rule: {text}")
+    try:
+        threshold = float(parts["threshold"])
+        fraction = float(parts["fraction"]) if "fraction" in parts else None
+    except ValueError:
+        raise ValueError(f"Invalid number in rule: {text}") from None
+    if fraction is not None and not 0 < fraction <= 100:
+        raise ValueError(f"Invalid percentage in rule: {text}")
+
+    return WindowRule(
+        text=text,
+        column=parts["column"],
+        kind=parts.get("kind", "fraction"),
+        window=window,
+        op=parts["op"],
+        threshold=threshold,
+        fraction=fraction,
+    )
+
+
+def parse_window_rules(specs: typing.Iterable[str]) -> typing.List[WindowRule]:
+    """Parse multiple rules (empty ones are skipped), see
+    :func:`parse_window_rule`."""
+    return [parse_window_rule(spec) for spec in specs if spec.strip()]
+
+
+# ---------------------------------------------------------------------------
+
+
+class SlidingWindow:
+    """Incremental aggregates over the samples of the last ``window``
+    seconds. Each sample is added and evicted once, and the aggregates
+    are updated on both, so adding a sample is (amortized) O(1),
+    independent of the number of samples in the window.
+
+    Samples are expected in chronological order. Aggregates are as of
+    the last sample, reading them does not change the window."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self.samples: typing.Deque[typing.Tuple[float, float]] = deque()
+        #: timestamp of the first sample since the window was empty (e. g.
+        #: after a gap in collecting), to know if the window is covered
+        self.first_timestamp: typing.Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, timestamp: float, value: float) -> None:
+        self.evict(timestamp)
+        if not self.samples:
+            self.first_timestamp = timestamp
+        self.samples.append((timestamp, value))
+        self._on_add(timestamp, value)
+
+    def evict(self, now: float) -> None:
+        """Drop samples that are older than the window."""
+        start = now - self.window
+        while self.samples and self.samples[0][0] <= start:
+            timestamp, value = self.samples.popleft()
+            self._on_evict(timestamp, value)
+
+    def is_covered(self, now: float) -> bool:
+        """Whether samples have been recorded for (about) the whole window,
+        up to now."""
+        return (
+            bool(self.samples)
+            and self.first_timestamp is not None
+            # one sample may still be missing
+            and now - self.first_timestamp >= self.window * 0.9
+            # not if collecting stopped
+            and now - self.samples[-1][0] < self.window
+        )
+
+    def _on_add(self, timestamp: float, value: float) -> None:
+        raise NotImplementedError
+
+    def _on_evict(self, timestamp: float, value: float) -> None:
+        raise NotImplementedError
+
+    def value(self) -> typing.Optional[float]:
+        """Aggregate of the samples in the window, None if empty."""
+        raise NotImplementedError
+
+
+class MeanWindow(SlidingWindow):
+    def __init__(self, window: float):
+        super().__init__(window)
+        self._sum = 0.0
+
+    def _on_add(self, timestamp: float, value: float) -> None:
+        self._sum += value
+
+    def _on_evict(self, timestamp: float, value: float) -> None:
+        # start from scratch once empty, avoids accumulating float errors
+        self._sum = self._sum - value if self.samples else 0.0
+
+    def value(self) -> typing.Optional[float]:
+        if not self.samples:
+            return None
+        return self._sum / len(self.samples)
+
+
+class FractionWindow(SlidingWindow):
+    """Percentage of samples that are above (``op=">"``) or below the
+    threshold."""
+
+    def __init__(self, window: float, threshold: float, op: str = ">"):
+        super().__init__(window)
+        self.threshold = threshold
+        self.op = op
+        self._hits = 0
+
+    def _is_hit(self, value: float) -> bool:
+        if self.op == ">":
+            return value > self.threshold
+        return value < self.threshold
+
+    def _on_add(self, timestamp: float, value: float) -> None:
+        self._hits += self._is_hit(value)
+
+    def _on_evict(self, timestamp: float, value: float) -> None:
+        self._hits -= self._is_hit(value)
+
+    def value(self) -> typing.Optional[float]:
+        if not self.samples:
+            return None
+        return self._hits / len(self.samples) * 100
+
+
+class ChangeWindow(SlidingWindow):
+    """Increase of the last sample over the minimum in the window (or,
+    with ``falling``, the decrease from the maximum). The extreme values
+    are kept in a monotonic queue (candidates only)."""
+
+    def __init__(self, window: float, falling: bool = False):
+        super().__init__(window)
+        self.falling = falling
+        self._extremes: typing.Deque[typing.Tuple[float, float]] = deque()
+
+    def _dominates(self, new: float, old: float) -> bool:
+        return new >= old if self.falling else new <= old
+
+    def _on_add(self, timestamp: float, value: float) -> None:
+        # older candidates that are not more extreme can never be the extreme
+        while self._extremes and self._dominates(value, self._extremes[-1][1]):
+            self._extremes.pop()
+        self._extremes.append((timestamp, value))
+
+    def _on_evict(self, timestamp: float, value: float) -> None:
+        if self._extremes and self._extremes[0][0] <= timestamp:
+            self._extremes.popleft()
+
+    def value(self) -> typing.Optional[float]:
+        if not self.samples:
+            return None
+        last, extreme = self.samples[-1][1], self._extremes[0][1]
+        return extreme - last if self.falling else last - extreme
+
+
+def make_window(rule: WindowRule) -> SlidingWindow:
+    if rule.kind == "mean":
+        return MeanWindow(rule.window)
+    if rule.kind == "fraction":
+        return FractionWindow(rule.window, rule.threshold, op=rule.op)
+    if rule.kind in ("rise", "fall"):
+        return ChangeWindow(rule.window, falling=rule.kind == "fall")
+    raise ValueError(f"Unknown window rule kind: {rule.kind}")
+
+
+# ---------------------------------------------------------------------------
+
+
+class WindowRuleEvaluator:
+    """Feeds collected stats into the windows of a set of rules and
+    provides their current values (as limits). Values may be read from
+    other threads (snapshots) while stats are added."""
+
+    def __init__(self, rules: typing.Iterable[WindowRule] = ()):
+        self.windows: typing.Dict[WindowRule, SlidingWindow] = dict()
+        #: short, updates and reads are O(1) per rule
+        self._lock = threading.Lock()
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: WindowRule) -> None:
+        with self._lock:
+            if rule not in self.windows:
+                self.windows[rule] = make_window(rule)
+
+    def update(self, stats: typing.Dict[str, typing.Union[float, int]]) -> None:
+        """Add a sample of collected stats, O(1) per rule."""
+        timestamp = stats.get("_datetime", time.time())
+        with self._lock:
+            for rule, window in self.windows.items():
+                value = stats.get(rule.column)
+                if value is not None:
+                    window.add(timestamp, value)
+
+    def value(
+        self, rule: WindowRule, now: typing.Optional[float] = None
+    ) -> typing.Optional[float]:
+        """Current aggregate of the rule, None until its window is
+        covered (or if no samples are recorded anymore)."""
+        if now is None:
+            now = time.time()
+        window = self.windows[rule]
+        with self._lock:
+            if not window.is_covered(now):
+                return None
+            return window.value()
+
+    def make_limits(self) -> typing.Dict[str, ObservableLimit]:
+        """Limits for all rules, alerts are sent for the first violation
+        as the window already requires the condition to be sustained."""
+        return {
+            f"rule:{rule.text}": make_window_limit(rule, self.value)
+            for rule in self.windows.keys()
+        }
+
+
+def make_window_limit(
+    rule: WindowRule,
+    fn_value: typing.Callable[[WindowRule], typing.Optional[float]],
+) -> ObservableLimit:
+    if rule.kind == "fraction":
+        threshold = rule.fraction
+        fn_check = lambda cur, thres: cur is None or cur < thres
+        unit = "%"
+    else:
+        threshold = rule.threshold
+        if rule.op == ">":
+            fn_check = lambda cur, thres: cur is None or cur <= thres
+        else:
+            fn_check = lambda cur, thres: cur is None or cur >= thres
+        unit = ""
+    # the value is formatted when sending the alert
+    message = f"**Rule `{rule.text}`** is violated! "
+    message += "(value: `{cur_value:.1f}{unit}`)"
+
+    return ObservableLimit(
+        name=f"Rule: {rule.text}",
+        fn_retrieve=lambda: fn_value(rule),
+        fn_check=fn_check,
+        unit=unit,
+        threshold=threshold,
+        message=message,
+        # the window already requires the condition to hold for a while
+        badness_inc=1,
+        badness_threshold=1,
+    )
+
+
+# ---------------------------------------------------------------------------
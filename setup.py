@@ -33,7 +33,8 @@ setup(
     install_requires=["discord.py", "psutil"],
     extras_require={
         "gpu": ["gputil"],
-        "plot": ["matplotlib"],
+        "plot": ["matplotlib>=3.1"],
+        "export": ["numpy", "zstandard"],
         "dev": ["black", "pylint", "wheel", "twine"],
         "doc": ["pdoc3"],
     },
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from discord_system_observer_bot.sensors import PowercapReader
+
+
+def make_powercap_tree(root: str, zones: dict) -> None:
+    """Fake ``/sys/class/powercap`` tree below ``root``, ``zones`` maps
+    entries (e. g. ``intel-rapl:0``) to ``(name, energy_uj, max_energy_range_uj)``."""
+    for entry, (name, energy, max_range) in zones.items():
+        path = os.path.join(root, entry)
+        os.makedirs(path)
+        with open(os.path.join(path, "name"), "w") as fp:
+            fp.write(f"{name}\n")
+        with open(os.path.join(path, "max_energy_range_uj"), "w") as fp:
+            fp.write(f"{max_range}\n")
+        set_energy(root, entry, energy)
+
+
+def set_energy(root: str, entry: str, energy: int) -> None:
+    # rewritten in place, the reader keeps the file open
+    with open(os.path.join(root, entry, "energy_uj"), "w") as fp:
+        fp.write(f"{energy}\n")
+
+
+class PowercapReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        make_powercap_tree(
+            self.root,
+            {
+                "intel-rapl:0": ("package-0", 9_000_000, 9_999_999),
+                "intel-rapl:0:0": ("core", 1_000_000, 9_999_999),
+            },
+        )
+        self.reader = PowercapReader(root=self.root, min_interval=0.0)
+
+    def tearDown(self):
+        self.reader.close()
+        self.tmpdir.cleanup()
+
+    def test_zones(self):
+        self.assertEqual(self.reader.zones, ["package-0", "package-0/core"])
+
+    def test_power(self):
+        self.assertEqual(self.reader.power(timestamp=100.0), dict())
+
+        set_energy(self.root, "intel-rapl:0:0", 5_000_000)
+        power = self.reader.power(timestamp=102.0)
+        self.assertAlmostEqual(power["package-0/core"], 2.0)
+        self.assertAlmostEqual(power["package-0"], 0.0)
+
+    def test_power_wrap_around(self):
+        self.reader.power(timestamp=100.0)
+
+        # counter wraps at max_energy_range_uj + 1 = 10 J
+        set_energy(self.root, "intel-rapl:0", 1_000_000)
+        power = self.reader.power(timestamp=102.0)
+        self.assertAlmostEqual(power["package-0"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()